@@ -0,0 +1,188 @@
+"""
+Compares serial and process-pool creation of the summary dashboard
+components (playlist summary, artist summary table and feature plots) on a
+synthetic 5,000-song playlist, feature plot size/creation time for each
+render mode as playlists grow, and artist summary table aggregation with and
+without per-group Python lambdas.
+
+Run from the repo root:
+    python -m benchmarks.playlist_analytics_dashboard_bench
+"""
+
+import os
+import tempfile
+import time
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.playlist_analytics import (
+    PlaylistGenOutputs, analyze_feature_trends, create_feature_plot,
+    get_artist_color_map, get_artist_summary_table,
+)
+
+
+def make_synthetic_playlist(
+    num_songs: int = 5000,
+    num_artists: int = 500,
+    seed: int = 0
+) -> pd.DataFrame:
+    """Creates random songs in the format returned by get_top_tracks."""
+
+    rng = np.random.default_rng(seed)
+    artist_nums = rng.integers(0, num_artists, num_songs)
+    genres = ["EDM", "House", "Pop Dance", "Dubstep", "Tech House", "UK Dance"]
+    artist_genres = [
+        list(rng.choice(genres, rng.integers(0, 4), replace=False))
+        for _ in range(num_artists)
+    ]
+    artist_popularity = rng.integers(1, 101, num_artists)
+    return pd.DataFrame({
+        "Song": [f"Song {i}" for i in range(num_songs)],
+        "Artist": [f"Artist {n}" for n in artist_nums],
+        "Song Popularity": rng.integers(1, 101, num_songs),
+        "Danceability": rng.random(num_songs),
+        "Energy": rng.beta(5, 2, num_songs),
+        "Tempo": rng.normal(126, 8, num_songs),
+        "Speechiness": rng.beta(1, 10, num_songs),
+        "Song Duration": rng.integers(120_000, 360_000, num_songs),
+        "Artist Genres": [artist_genres[n] for n in artist_nums],
+        "Artist Popularity": artist_popularity[artist_nums],
+        "Song uri": [f"uri{i}" for i in range(num_songs)],
+    })
+
+
+def time_components(
+    df_songs: pd.DataFrame,
+    max_workers: Optional[int]
+) -> float:
+    """Returns the best of 3 wall times for creating all components, in s."""
+
+    outputs = PlaylistGenOutputs(
+        df_songs, [], "Benchmark", "spotify:playlist:benchmark"
+    )
+    times = []
+    for _ in range(3):
+        start_time = time.perf_counter()
+        outputs.create_dashboard_components(max_workers=max_workers)
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def run_benchmarks(
+    worker_counts: List[Optional[int]] = [1, 2, None],
+    num_songs: int = 5000
+) -> pd.DataFrame:
+    """Times dashboard component creation for each worker count."""
+
+    df_songs = make_synthetic_playlist(num_songs)
+    repo_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as output_dir:
+        os.chdir(output_dir) # Write components outside the repo
+        try:
+            results = [
+                {
+                    "songs": num_songs,
+                    "max_workers": (
+                        "auto" if max_workers is None else max_workers
+                    ),
+                    "seconds": round(time_components(df_songs, max_workers), 2),
+                }
+                for max_workers in worker_counts
+            ]
+        finally:
+            os.chdir(repo_dir)
+
+    return pd.DataFrame(results)
+
+
+def run_plot_benchmarks(
+    sizes: List[int] = [1_000, 3_000, 20_000, 100_000],
+    max_svg_songs: int = 20_000
+) -> pd.DataFrame:
+    """Times one feature plot, and measures its JSON size, per render mode."""
+
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for num_songs in sizes:
+            df_songs = make_synthetic_playlist(num_songs, num_songs // 10)
+            tempo_trend = analyze_feature_trends(df_songs, ["Tempo"])["Tempo"]
+            color_map = get_artist_color_map(df_songs)
+            for render_mode in ("svg", "webgl", "density"):
+                if render_mode == "svg" and num_songs > max_svg_songs:
+                    continue
+                start_time = time.perf_counter()
+                fig_json = create_feature_plot(
+                    df_songs,
+                    tempo_trend,
+                    "Song Popularity",
+                    color_map,
+                    os.path.join(output_dir, "tempo_plot.html"),
+                    render_mode=render_mode
+                )
+                results.append({
+                    "songs": num_songs,
+                    "render_mode": render_mode,
+                    "seconds": round(time.perf_counter() - start_time, 2),
+                    "figure JSON (kB)": len(fig_json) // 1000,
+                })
+
+    return pd.DataFrame(results)
+
+
+def get_artist_summary_table_with_lambdas(
+    df_songs: pd.DataFrame
+) -> pd.DataFrame:
+    """Previous artist summary aggregation, for comparison."""
+
+    return df_songs.groupby("Artist").agg(
+        Total_Songs=("Artist", "count"),
+        Total_Runtime=(
+            "Song Duration",
+            lambda ms: (
+                f"{ms.sum() // 60000} min "
+                f"{ms.sum() % 60000 // 1000} sec"
+            )
+        ),
+        Artist_Popularity=("Artist Popularity", "first"),
+        Artist_Genres=("Artist Genres", lambda x: ", ".join(x.iloc[0])),
+        Average_Tempo=("Tempo", lambda x: round(x.mean())),
+        Average_Danceability=(
+            "Danceability",
+            lambda x: round(x.mean(), 2)
+        ),
+        Average_Energy=("Energy", lambda x: round(x.mean(), 2)),
+        Average_Speechiness=("Speechiness", lambda x: round(x.mean(), 2))
+    ).reset_index()
+
+
+def run_artist_table_benchmarks(
+    artist_counts: List[int] = [100, 1_000, 10_000],
+    songs_per_artist: int = 5
+) -> pd.DataFrame:
+    """Times artist summary table aggregation, with and without lambdas."""
+
+    results = []
+    for num_artists in artist_counts:
+        df_songs = make_synthetic_playlist(
+            num_artists * songs_per_artist, num_artists
+        )
+        row = {"artists": num_artists}
+        for name, func in (
+            ("lambdas (s)", get_artist_summary_table_with_lambdas),
+            ("vectorized (s)", get_artist_summary_table),
+        ):
+            start_time = time.perf_counter()
+            func(df_songs)
+            row[name] = round(time.perf_counter() - start_time, 3)
+        row["speedup"] = round(row["lambdas (s)"] / row["vectorized (s)"], 1)
+        results.append(row)
+
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    print(run_benchmarks())
+    print(run_plot_benchmarks())
+    print(run_artist_table_benchmarks())
@@ -0,0 +1,88 @@
+"""
+Compares loading df_songs and df_artists from .csv (parsing genres with
+eval, as the readers used to, or with playlist_io.load_csv) and from typed
+Parquet files (playlist_io.load_df), on the sample data scaled up 1,000x.
+
+Run from the repo root:
+    python -m benchmarks.playlist_io_bench
+"""
+
+import os
+import tempfile
+import time
+from typing import Callable
+
+import pandas as pd
+
+from src.playlist_io import (
+    load_csv, load_df, save_artists, save_songs,
+)
+
+
+SAMPLE_FILES = {
+    "songs": "output/sample_data/EdcOrlando2023SampleSongs.csv",
+    "artists": "output/sample_data/EdcOrlando2023Artists.csv",
+}
+
+
+def load_csv_with_eval(file_path: str) -> pd.DataFrame:
+    """Loads a .csv file the way readers did before playlist_io."""
+
+    df = pd.read_csv(file_path)
+    df["Artist Genres"] = df["Artist Genres"].apply(eval)
+    return df
+
+
+def time_load(load_func: Callable, file_path: str, repeats: int = 3) -> float:
+    """Best-of-repeats time (seconds) to load file_path."""
+
+    times = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        load_func(file_path)
+        times.append(time.perf_counter() - start_time)
+    return min(times)
+
+
+def run_benchmarks(scale: int = 1_000) -> pd.DataFrame:
+    """
+    Saves each sample file repeated scale times as .csv and .parquet, then
+    times loading it each way.
+    """
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for kind, sample_path in SAMPLE_FILES.items():
+            df = load_csv(sample_path)
+            df = pd.concat([df] * scale, ignore_index=True)
+
+            csv_path = os.path.join(temp_dir, f"{kind}.csv")
+            parquet_path = os.path.join(temp_dir, f"{kind}.parquet")
+            df.to_csv(csv_path, index=False)
+            save_func = save_songs if kind == "songs" else save_artists
+            save_func(df, parquet_path)
+
+            for method, load_func, file_path in [
+                ("csv + eval", load_csv_with_eval, csv_path),
+                ("csv + load_csv", load_csv, csv_path),
+                ("parquet + load_df", load_df, parquet_path),
+            ]:
+                results.append({
+                    "data": kind,
+                    "rows": len(df),
+                    "method": method,
+                    "file_mb": round(os.path.getsize(file_path) / 1024**2, 2),
+                    "load_s": round(time_load(load_func, file_path), 3),
+                })
+
+    df_results = pd.DataFrame(results)
+    df_results["speedup"] = (
+        df_results.groupby("data")["load_s"].transform("first")
+        / df_results["load_s"]
+    ).round(1)
+
+    return df_results
+
+
+if __name__ == "__main__":
+    print(run_benchmarks())
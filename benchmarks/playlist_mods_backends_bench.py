@@ -0,0 +1,100 @@
+"""
+Compares the playlist_mods execution backends (pandas, Arrow-backed pandas
+and Polars frames) on the EDC Orlando 2023 sample songs scaled up to
+multi-festival sizes.
+
+Run from the repo root:
+    python -m benchmarks.playlist_mods_backends_bench
+"""
+
+import time
+from typing import Any, Callable, Dict, List
+
+import pandas as pd
+
+from src.playlist_mods import (
+    convert_df_backend, create_df_playlist_artists,
+    filter_songs_by_artist_popularity, pl, remove_duplicates,
+    remove_remixes_and_edits,
+)
+
+
+def make_synthetic_songs(num_copies: int) -> pd.DataFrame:
+    """Stacks num_copies of the sample songs with unique URIs and titles."""
+
+    df_songs = pd.read_csv("output/sample_data/EdcOrlando2023FullSongs.csv")
+    df_songs["Artist Genres"] = df_songs["Artist Genres"].apply(eval)
+    return pd.concat(
+        [
+            df_songs.assign(**{
+                "Song uri": df_songs["Song uri"] + str(i),
+                "Song": df_songs["Song"] + f" {i % 100}",
+                "Artist": df_songs["Artist"] + f" {i}",
+            })
+            for i in range(num_copies)
+        ],
+        ignore_index=True,
+    )
+
+
+def time_call(func: Callable[..., Any], *args: Any, **kwargs: Any) -> float:
+    """Returns the best of 3 wall times for func(*args, **kwargs), in ms."""
+
+    times = []
+    for _ in range(3):
+        start_time = time.perf_counter()
+        func(*args, **kwargs)
+        times.append((time.perf_counter() - start_time) * 1000)
+    return min(times)
+
+
+def run_benchmarks(sizes: List[int] = [10, 100, 400]) -> pd.DataFrame:
+    """Times each public playlist_mods function for each backend and size."""
+
+    results = []
+    for num_copies in sizes:
+        df_pandas = make_synthetic_songs(num_copies)
+        inputs: Dict[str, Any] = {
+            "pandas": df_pandas,
+            "arrow": convert_df_backend(df_pandas, "arrow"),
+        }
+        if pl is not None:
+            inputs["polars"] = pl.from_pandas(inputs["arrow"])
+
+        df_artists = df_pandas.drop_duplicates("Artist")
+        selected_artist_names = df_artists["Artist"].tolist()[::2]
+
+        for input_name, df_input in inputs.items():
+            backend = "pandas" if input_name == "pandas" else "arrow"
+            memory_mb = (
+                df_input.estimated_size() if input_name == "polars"
+                else df_input.memory_usage(deep=True).sum()
+            ) / 1e6
+            row = {
+                "rows": len(df_pandas),
+                "input": input_name,
+                "memory (MB)": round(memory_mb, 1),
+            }
+            for func in (
+                remove_duplicates,
+                remove_remixes_and_edits,
+                filter_songs_by_artist_popularity,
+            ):
+                row[f"{func.__name__} (ms)"] = round(
+                    time_call(func, df_input, backend=backend), 1
+                )
+            row["create_df_playlist_artists (ms)"] = round(time_call(
+                create_df_playlist_artists,
+                df_input,
+                df_input.head(10),
+                selected_artist_names,
+                backend=backend,
+            ), 1)
+            results.append(row)
+
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    with pd.option_context("display.width", 200, "display.max_columns", 20):
+        print(run_benchmarks())
@@ -0,0 +1,157 @@
+/* artist_table.js */
+
+/*
+Virtual-scrolling artist summary table, used by dashboards of large playlists.
+
+Table data is embedded in the dashboard as JSON:
+  {"columns": [...], "decimals": [...], "rows": [[...], ...]}
+where decimals holds the number of decimals shown for each float column (null
+for other columns). Only rows in view (plus a small buffer) are DOM nodes.
+Clicking a header sorts by that column (click again to reverse), and the
+filter box keeps rows containing the filter text in any column.
+*/
+
+var ROW_HEIGHT = 22; // px, must match .virtual-table .vt-row height
+var ROW_BUFFER = 10; // Rows rendered above and below the visible rows
+
+function createArtistTable(container, table) {
+    var collator = new Intl.Collator(undefined, {numeric: true, sensitivity: "base"});
+    var sortColumn = null;
+    var sortAscending = true;
+    var viewRows = table.rows.slice();
+
+    // Format cells once, for display and filtering
+    var cellText = table.rows.map(function (row) {
+        return row.map(function (value, i) {
+            if (value === null) {
+                return table.decimals[i] === null ? "" : "NaN";
+            }
+            if (table.decimals[i] !== null) {
+                return value.toFixed(table.decimals[i]);
+            }
+            return String(value);
+        });
+    });
+    var rowIndex = new Map(table.rows.map(function (row, i) { return [row, i]; }));
+    var searchText = cellText.map(function (cells) {
+        return cells.join("\u0000").toLowerCase();
+    });
+
+    // Filter box and row count
+    var toolbar = document.createElement("div");
+    toolbar.className = "vt-toolbar";
+    var filterInput = document.createElement("input");
+    filterInput.type = "search";
+    filterInput.placeholder = "Filter artists, genres...";
+    var rowCount = document.createElement("span");
+    toolbar.appendChild(filterInput);
+    toolbar.appendChild(rowCount);
+
+    // Header
+    var header = document.createElement("div");
+    header.className = "vt-row vt-header";
+    var headerCells = table.columns.map(function (column, i) {
+        var cell = document.createElement("div");
+        cell.className = "vt-cell";
+        cell.textContent = column;
+        cell.title = "Sort by " + column;
+        cell.addEventListener("click", function () { sortBy(i); });
+        header.appendChild(cell);
+        return cell;
+    });
+
+    // Scrolling body: a spacer sized for all rows, holding the visible rows
+    var viewport = document.createElement("div");
+    viewport.className = "vt-viewport";
+    var spacer = document.createElement("div");
+    spacer.className = "vt-spacer";
+    var body = document.createElement("div");
+    body.className = "vt-body";
+    spacer.appendChild(body);
+    viewport.appendChild(spacer);
+
+    container.appendChild(toolbar);
+    container.appendChild(header);
+    container.appendChild(viewport);
+
+    var renderedStart = -1;
+    var renderedEnd = -1;
+
+    function render(force) {
+        var start = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - ROW_BUFFER);
+        var end = Math.min(
+            viewRows.length,
+            Math.ceil((viewport.scrollTop + viewport.clientHeight) / ROW_HEIGHT) + ROW_BUFFER
+        );
+        if (!force && start === renderedStart && end === renderedEnd) {
+            return;
+        }
+        renderedStart = start;
+        renderedEnd = end;
+
+        var fragment = document.createDocumentFragment();
+        for (var r = start; r < end; r++) {
+            var cells = cellText[rowIndex.get(viewRows[r])];
+            var row = document.createElement("div");
+            row.className = "vt-row";
+            for (var c = 0; c < cells.length; c++) {
+                var cell = document.createElement("div");
+                cell.className = "vt-cell";
+                cell.textContent = cells[c];
+                cell.title = cells[c];
+                row.appendChild(cell);
+            }
+            fragment.appendChild(row);
+        }
+        body.style.transform = "translateY(" + start * ROW_HEIGHT + "px)";
+        body.replaceChildren(fragment);
+    }
+
+    function refresh() {
+        spacer.style.height = viewRows.length * ROW_HEIGHT + "px";
+        rowCount.textContent = viewRows.length + " of " + table.rows.length + " artists";
+        render(true);
+    }
+
+    function compareValues(a, b) {
+        if (typeof a === "number" && typeof b === "number") return a - b;
+        return collator.compare(String(a), String(b));
+    }
+
+    function sortBy(column) {
+        sortAscending = column === sortColumn ? !sortAscending : true;
+        sortColumn = column;
+        viewRows.sort(function (a, b) {
+            var x = a[column], y = b[column];
+            if (x === y) return 0;
+            if (x === null) return 1; // Missing values last in either direction
+            if (y === null) return -1;
+            var order = compareValues(x, y);
+            return sortAscending ? order : -order;
+        });
+        headerCells.forEach(function (cell, i) {
+            cell.classList.toggle("vt-sort-asc", i === column && sortAscending);
+            cell.classList.toggle("vt-sort-desc", i === column && !sortAscending);
+        });
+        refresh();
+    }
+
+    function applyFilter() {
+        var filterText = filterInput.value.trim().toLowerCase();
+        viewRows = table.rows.filter(function (row) {
+            return searchText[rowIndex.get(row)].indexOf(filterText) !== -1;
+        });
+        if (sortColumn !== null) {
+            sortAscending = !sortAscending; // sortBy re-toggles it
+            sortBy(sortColumn);
+        } else {
+            refresh();
+        }
+        viewport.scrollTop = 0;
+    }
+
+    filterInput.addEventListener("input", applyFilter);
+    viewport.addEventListener("scroll", function () { render(false); });
+    window.addEventListener("resize", function () { render(false); });
+    refresh();
+}
@@ -0,0 +1,334 @@
+###############################################################################
+#
+# This file contains functions for merging the playlists of many festivals
+# into a single, season-wide playlist:
+#   - FestivalPlaylistMerger streams festival song sets (DataFrames or
+#      playlist_songs files) into one deduplicated union, counting how many
+#      festivals each artist plays
+#   - get_festival_name gets a festival's name from its output folder
+#   - find_festival_song_files finds playlist_songs files in
+#      output/created_playlists
+#   - merge_festival_playlists is a one-call wrapper around the merger
+#
+###############################################################################
+
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Relative when imported as src.festival_merge, by name when run from src
+try:
+    from .playlist_io import find_song_file, iter_df_chunks
+    from .playlist_mods import TrackDedupeIndex
+except ImportError:
+    from playlist_io import find_song_file, iter_df_chunks
+    from playlist_mods import TrackDedupeIndex
+
+
+CREATED_PLAYLISTS_DIR = "output/created_playlists"
+MERGE_CHUNK_SIZE = 10_000
+
+
+class FestivalPlaylistMerger():
+    """
+    Merges song DataFrames from any number of festivals, one chunk at a time.
+
+    Songs are deduplicated across festivals by 'Song uri' and by track
+    signature (see playlist_mods.TrackDedupeIndex), keeping the first
+    occurrence. Only kept rows are held in memory, so festival files can be
+    streamed in chunks instead of loaded and concatenated up front.
+
+    Artists are reconciled by 'Artist uri' (or name, for DataFrames without
+    one). merged() adds an 'Artist Festival Count' column and, by default,
+    ranks songs by artists playing the most festivals first.
+    """
+
+    def __init__(self, duration_tolerance_ms: int = 5000) -> None:
+        """
+        Initialize the FestivalPlaylistMerger class.
+
+        Parameters:
+            duration_tolerance_ms (int): Max 'Song Duration' difference for
+                two songs with the same title and artists to be considered
+                the same song (default is 5 seconds).
+        """
+
+        self.dedupe_index = TrackDedupeIndex(duration_tolerance_ms)
+        self.song_uris = set()
+        self.artist_festivals = {} # artist key -> set of festival names
+        self.festivals = set()
+        self.removed_songs = []
+        self._kept_chunks = []
+
+    def __len__(self) -> int:
+        """Number of songs kept so far."""
+        return len(self.song_uris)
+
+    def add(
+        self,
+        df_songs: pd.DataFrame,
+        festival: Optional[str] = None
+    ) -> "FestivalPlaylistMerger":
+        """
+        Adds a festival's songs, or one chunk of them, to the merge.
+
+        Parameters:
+            df_songs (pd.DataFrame): Songs in the format returned by
+                spotipy_utils.get_top_tracks, or loaded by playlist_io.load_df
+                (list columns as lists).
+            festival (str, optional): Festival name. Chunks of the same
+                festival must share a name. Defaults to a new name per call.
+
+        Returns:
+            FestivalPlaylistMerger: self, for chaining.
+        """
+
+        if festival is None:
+            festival = f"Festival {len(self.festivals) + 1}"
+        self.festivals.add(festival)
+
+        # Count festivals per artist before deduping, since an artist's songs
+        # may all have been kept from an earlier festival
+        for artist_key in get_artist_keys(df_songs).unique():
+            self.artist_festivals.setdefault(artist_key, set()).add(festival)
+
+        keep = self.get_new_song_mask(df_songs)
+        self.removed_songs.extend(
+            f"{song} - {artist}" for song, artist in zip(
+                df_songs.loc[~keep, "Song"], df_songs.loc[~keep, "Artist"]
+            )
+        )
+        if keep.any():
+            self._kept_chunks.append(df_songs[keep])
+
+        return self
+
+    def add_file(
+        self,
+        file_path: str,
+        festival: Optional[str] = None,
+        chunksize: int = MERGE_CHUNK_SIZE,
+    ) -> "FestivalPlaylistMerger":
+        """
+        Streams a playlist_songs.parquet (or .csv) file into the merge,
+        chunksize rows at a time (see playlist_io.iter_df_chunks).
+
+        Parameters:
+            file_path (str): Path to the .parquet or .csv file.
+            festival (str, optional): Festival name. Defaults to the name of
+                the file's output folder (see get_festival_name).
+            chunksize (int): Rows read per chunk.
+
+        Returns:
+            FestivalPlaylistMerger: self, for chaining.
+        """
+
+        if festival is None:
+            festival = get_festival_name(file_path)
+        for df_chunk in iter_df_chunks(file_path, chunksize):
+            self.add(df_chunk, festival)
+
+        return self
+
+    def get_new_song_mask(self, df_songs: pd.DataFrame) -> np.ndarray:
+        """
+        Flags songs not yet in the merge and adds them to the dedupe indexes,
+        in one pass.
+
+        Parameters:
+            df_songs (pd.DataFrame): Songs to check.
+
+        Returns:
+            np.ndarray[bool]: True for songs to keep.
+        """
+
+        if "Song isrc" in df_songs.columns:
+            isrcs = df_songs["Song isrc"].astype(object).where(
+                df_songs["Song isrc"].notna(), None
+            )
+        else:
+            isrcs = [None] * len(df_songs)
+        if "Song Artists" in df_songs.columns:
+            song_artists = [
+                artists if isinstance(artists, (list, tuple, np.ndarray))
+                and len(artists)
+                else artist
+                for artists, artist in zip(
+                    df_songs["Song Artists"], df_songs["Artist"]
+                )
+            ]
+        else:
+            song_artists = df_songs["Artist"]
+
+        keep = np.zeros(len(df_songs), dtype=bool)
+        for i, (uri, song, artists, duration, isrc) in enumerate(zip(
+            df_songs["Song uri"],
+            df_songs["Song"],
+            song_artists,
+            df_songs["Song Duration"],
+            isrcs,
+        )):
+            if uri in self.song_uris:
+                continue
+            if self.dedupe_index.find_or_add(
+                song, artists, duration, isrc, uri
+            ) is None:
+                self.song_uris.add(uri)
+                keep[i] = True
+
+        return keep
+
+    def get_artist_festival_counts(self) -> Dict[str, int]:
+        """
+        Gets the number of festivals each artist plays.
+
+        Returns:
+            Dict[str, int]: Artist key ('Artist uri', or name) -> count.
+        """
+
+        return {
+            artist_key: len(festivals)
+            for artist_key, festivals in self.artist_festivals.items()
+        }
+
+    def merged(self, rank_by_festival_count: bool = True) -> pd.DataFrame:
+        """
+        Gets the merged songs, ready for spotipy_utils.create_playlist.
+
+        Parameters:
+            rank_by_festival_count (bool): If True, sort songs by 'Artist
+                Festival Count' (descending), then 'Song Popularity'
+                (descending), so truncating the playlist keeps the songs of
+                artists playing the most festivals. If False, keep the order
+                songs were added in.
+
+        Returns:
+            pd.DataFrame: Merged songs, with an 'Artist Festival Count'
+                column.
+        """
+
+        if not self._kept_chunks:
+            return pd.DataFrame(columns=["Artist Festival Count"])
+
+        df_merged = pd.concat(self._kept_chunks, ignore_index=True)
+        self._kept_chunks = [df_merged] # Avoid re-concatenating next call
+
+        festival_counts = self.get_artist_festival_counts()
+        df_merged = df_merged.assign(**{
+            "Artist Festival Count": get_artist_keys(df_merged).map(
+                festival_counts
+            ).to_numpy()
+        })
+
+        if rank_by_festival_count:
+            df_merged = df_merged.sort_values(
+                ["Artist Festival Count", "Song Popularity"],
+                ascending=[False, False],
+                kind="stable",
+            ).reset_index(drop=True)
+
+        return df_merged
+
+    def iter_uri_batches(self, batch_size: int = 100) -> Iterator[List[str]]:
+        """
+        Yields merged 'Song uri' values in batches sized for Spotify's
+        playlist_add_items (100 per call), in merged() order.
+
+        Parameters:
+            batch_size (int): URIs per batch.
+
+        Yields:
+            List[str]: One batch of song URIs.
+        """
+
+        song_uris = self.merged()["Song uri"].tolist()
+        for i in range(0, len(song_uris), batch_size):
+            yield song_uris[i : i + batch_size]
+
+
+def get_artist_keys(df_songs: pd.DataFrame) -> pd.Series:
+    """
+    Gets the key used to reconcile artists across festivals: 'Artist uri'
+    when available, otherwise the case-folded 'Artist' name.
+    """
+
+    if "Artist uri" in df_songs.columns:
+        return df_songs["Artist uri"].where(
+            df_songs["Artist uri"].notna(), df_songs["Artist"].str.casefold()
+        )
+    return df_songs["Artist"].str.casefold()
+
+
+def get_festival_name(file_path: str) -> str:
+    """
+    Gets a festival's name from its output folder.
+
+    Ex: 'output/created_playlists/EdcOrlando2023Summary_Created2024-01-10/
+    playlist_songs.csv' -> 'EdcOrlando2023'
+    """
+
+    folder_name = os.path.basename(os.path.dirname(os.path.abspath(file_path)))
+    return re.sub(r"Summary_Created[\d-]+$", "", folder_name) or folder_name
+
+
+def find_festival_song_files(
+    created_playlists_dir: str = CREATED_PLAYLISTS_DIR
+) -> List[str]:
+    """
+    Finds the songs file of every created playlist (see
+    playlist_io.find_song_file).
+
+    Parameters:
+        created_playlists_dir (str): Folder containing one output folder per
+            created playlist.
+
+    Returns:
+        List[str]: Paths of playlist_songs.parquet (or .csv) files, sorted by
+            folder name.
+    """
+
+    song_files = [
+        find_song_file(os.path.join(created_playlists_dir, folder_name))
+        for folder_name in sorted(os.listdir(created_playlists_dir))
+    ]
+    return [song_file for song_file in song_files if song_file is not None]
+
+
+def merge_festival_playlists(
+    festival_songs: Iterable,
+    duration_tolerance_ms: int = 5000,
+    rank_by_festival_count: bool = True,
+    chunksize: int = MERGE_CHUNK_SIZE,
+) -> pd.DataFrame:
+    """
+    Merges festival song sets into one deduplicated DataFrame.
+
+    Parameters:
+        festival_songs (Iterable): playlist_songs file paths and/or song
+            DataFrames. A generator can be passed to load DataFrames lazily.
+        duration_tolerance_ms (int): See FestivalPlaylistMerger.
+        rank_by_festival_count (bool): See FestivalPlaylistMerger.merged.
+        chunksize (int): Rows read per chunk from files.
+
+    Returns:
+        pd.DataFrame: Merged songs, with an 'Artist Festival Count' column.
+    """
+
+    merger = FestivalPlaylistMerger(duration_tolerance_ms)
+    for songs in festival_songs:
+        if isinstance(songs, pd.DataFrame):
+            merger.add(songs)
+        else:
+            merger.add_file(songs, chunksize=chunksize)
+
+    return merger.merged(rank_by_festival_count)
+
+
+if __name__ == "__main__":
+    song_files = find_festival_song_files()
+    df_merged = merge_festival_playlists(song_files)
+    print(f"Merged {len(song_files)} festivals into {len(df_merged)} songs")
+    print(df_merged[["Song", "Artist", "Artist Festival Count"]].head(20))
@@ -12,23 +12,36 @@ from PyQt5.QtWidgets import (
 from gui.gui_components import (
     ArtistSelectionButton, ColorScheme, CustomProceedButton
 )
+from playlist_io import load_df
+from playlist_mods import ArtistGenreIndex, parse_genre_query
 
 
 class PlaylistGenArtistSelection(QWidget):
     """Artist Selection screen GUI class."""
 
-    def __init__(self, df_artists: pd.DataFrame, festival_name: bool) -> None:
+    def __init__(
+        self,
+        df_artists: pd.DataFrame,
+        festival_name: bool,
+        genre_index: ArtistGenreIndex = None
+    ) -> None:
         """
         Initialize the GUI
 
         Parameters:
             df_artists (pd.DataFrame): DataFrame containing artist info.
             festival_name (str): Name of the festival for the title label.
+            genre_index (ArtistGenreIndex, optional): Genre index of
+                df_artists, used for selecting artists by genre. Built from
+                df_artists if not provided.
         """
 
         super().__init__()
         self.df_artists = df_artists
         self.festival_name = festival_name
+        if genre_index is None:
+            genre_index = ArtistGenreIndex(df_artists)
+        self.genre_index = genre_index
 
         # Set extra_artists_display to False on GUI launch
         self.extra_artists_displaying = False
@@ -127,6 +140,25 @@ class PlaylistGenArtistSelection(QWidget):
         select_all_button.clicked.connect(self.select_all_artists)
         select_all_button_layout.addSpacing(10)
         select_all_button_layout.addWidget(select_all_button)
+
+        # QLineEdit to select artists by genre
+        self.genre_query_lineedit = QLineEdit()
+        self.genre_query_lineedit.setPlaceholderText(
+            "Select by genre (Ex: house, techno, -dubstep) then press Enter"
+        )
+        self.genre_query_lineedit.setStyleSheet(
+            f"background-color: {color.mid_grey};"
+            f"border: 2px solid {color.lighter_grey};"
+            f"border-radius: 10px;"
+            f"padding: 8px 15px 8px 15px;"
+            f"font-size: 11pt;"
+        )
+        self.genre_query_lineedit.setFixedWidth(445)
+        self.genre_query_lineedit.returnPressed.connect(
+            self.select_artists_by_genre
+        ) # Select matching artists when Enter is pressed
+        select_all_button_layout.addSpacing(10)
+        select_all_button_layout.addWidget(self.genre_query_lineedit)
         
         # QLabel - Add notes on popularity and genres
         notes_label = QLabel(
@@ -386,6 +418,35 @@ class PlaylistGenArtistSelection(QWidget):
         ]
 
 
+    def select_artists_by_genre(self) -> None:
+        """
+        Selects the artists matching the genre query typed in the QLineEdit
+        and deselects all others. Comma-separated genres are included and
+        genres starting with '-' are excluded. Genre families are matched,
+        so 'house' also selects Tech House and Deep House artists.
+        """
+
+        include_genres, exclude_genres = parse_genre_query(
+            self.genre_query_lineedit.text()
+        )
+        if not include_genres and not exclude_genres:
+            return
+
+        matching_artists = set(
+            self.genre_index.query(include_genres, exclude_genres)
+        )
+        for button in self.findChildren(ArtistSelectionButton):
+            button.is_selected = button.name in matching_artists
+            button.update_style()
+
+        # Update list of selected artist names based on selected buttons
+        self.selected_artist_names = [
+            button.name
+            for button in self.findChildren(ArtistSelectionButton)
+            if button.is_selected
+        ]
+
+
     def add_extra_artist_name(self) -> None:
         """
         Adds QLineEdit's input to extra artist names list on Enter press.
@@ -450,7 +511,8 @@ class PlaylistGenArtistSelection(QWidget):
 
 def launch_gui_artist_selection(
     df_artists: pd.DataFrame,
-    festival_name: str
+    festival_name: str,
+    genre_index: ArtistGenreIndex = None
 ) -> Tuple[List[str], List[str]]:
     """
     Launches the GUI for artist selection.
@@ -462,6 +524,7 @@ def launch_gui_artist_selection(
     Parameters:
         df_artists (pd.DataFrame): DataFrame containing artist information.
         festival_name (str): Name of the festival for the title label.
+        genre_index (ArtistGenreIndex, optional): Genre index of df_artists.
 
     Returns:
         Tuple[List[str], List[str]]: Tuple containing the selected artist
@@ -470,7 +533,7 @@ def launch_gui_artist_selection(
 
     # Initialize the QApplication and the PlaylistGenFestivalLink GUI instance
     app = QApplication(sys.argv)
-    gui = PlaylistGenArtistSelection(df_artists, festival_name)
+    gui = PlaylistGenArtistSelection(df_artists, festival_name, genre_index)
 
     # Center the window on the screen. Hard code size for this 1 screen.
     screen_geometry = QDesktopWidget().screenGeometry()
@@ -491,8 +554,7 @@ def launch_gui_artist_selection(
 
 
 if __name__ == "__main__":
-    df_artists = pd.read_csv("output/sample_data/ElectricZoo2023Artists.csv")
-    df_artists['Artist Genres'] = df_artists['Artist Genres'].apply(eval)
+    df_artists = load_df("output/sample_data/ElectricZoo2023Artists.csv")
     print(f"df_artists loaded with len: {len(df_artists)}")
 
     festival_name = "Electric Zoo 2023"
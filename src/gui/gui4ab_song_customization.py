@@ -12,6 +12,7 @@ from PyQt5.QtWidgets import (
 from gui.gui_components import (
     ColorScheme, CustomProceedButton, YesNoRadioButtons
 )
+from playlist_io import load_df
 
 
 class PlaylistGenSongCustomizationGui(QWidget):
@@ -505,11 +506,8 @@ def launch_gui_song_customization(
 # Automatically launch GUI if this file executed as main script
 if __name__ == "__main__":
 
-    # Import df then change string representation (from .csv) of genres to list
-    df_artists = pd.read_csv(
-        "output/sample_data/EdcOrlando2023Artists.csv"
-    )
-    df_artists['Artist Genres'] = df_artists['Artist Genres'].apply(eval)
+    # Import df (parsing string representation (from .csv) of genres to list)
+    df_artists = load_df("output/sample_data/EdcOrlando2023Artists.csv")
     festival_name = "Edc Orlando 2023"
     print(
         f"df_artists loaded for '{festival_name}' with len: {len(df_artists)}"
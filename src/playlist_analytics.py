@@ -1,11 +1,71 @@
+import base64
 from collections import Counter
+import colorsys
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
+from functools import lru_cache
+import gzip
+import hashlib
+import html
+import json
 import os
-from typing import List
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+import warnings
 import webbrowser
 
+from jinja2 import Environment, FileSystemLoader
+import numpy as np
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs, get_plotlyjs_version
+
+
+STYLES_DIR = "output/created_playlists/styles/"
+TEMPLATES_DIR = "output/created_playlists/templates/"
+MANIFEST_FILE_NAME = "manifest.json"
+METADATA_FILE_NAME = "playlist_metadata.json"
+PROFILE_FILE_NAME = "profile.json"
+
+# Included in every component hash. Increment when component outputs change
+# so existing dashboards regenerate their components.
+DASHBOARD_COMPONENTS_VERSION = 1
+
+# Width of the range centered on the feature mean used to identify trends.
+# 30 BPM for Tempo, as most genres are characterized by ranges of 20-30 BPM
+# (based on genre norms research). 0.3 for the 3 features whose values are
+# b/w 0-1 (based mainly on Exploratory Data Analysis (EDA) with multiple
+# datasets). Other features default to 0.
+FEATURE_RANGE_WIDTHS = {
+    "Tempo": 30,
+    "Danceability": 0.3,
+    "Energy": 0.3,
+    "Speechiness": 0.3,
+}
+UNIT_INTERVAL_FEATURES = {"Danceability", "Energy", "Speechiness"}
+TREND_PERCENT_THRESHOLD = 79
+
+# Feature plot render modes (see get_render_mode). Above WEBGL_MIN_SONGS, all
+# songs are drawn by a single WebGL trace instead of one SVG trace per artist.
+# Above DENSITY_MIN_SONGS, a song density heatmap is drawn with a sample of
+# MAX_PLOT_POINTS songs on top, so plot size stays bounded.
+RENDER_MODES = ("auto", "svg", "webgl", "density")
+WEBGL_MIN_SONGS = 1_000
+DENSITY_MIN_SONGS = 10_000
+MAX_PLOT_POINTS = 5_000
+DENSITY_BINS = 50
+
+# Artist summary tables with at least VIRTUAL_TABLE_MIN_ARTISTS rows are
+# embedded as JSON and rendered by a virtual-scrolling, sortable table, so
+# only visible rows become DOM nodes. Smaller tables are static HTML.
+VIRTUAL_TABLE_MIN_ARTISTS = 200
+
+# Exported (single-file) dashboards store figure arrays with at least
+# EXPORT_MIN_SHARED_ARRAY_LENGTH items once, shared by all feature plots
+# (Ex: each artist's Song Popularity and song names)
+EXPORT_FILE_NAME = "summary_dashboard_export.html"
+EXPORT_MIN_SHARED_ARRAY_LENGTH = 4
 
 
 class PlaylistGenOutputs():
@@ -26,15 +86,24 @@ class PlaylistGenOutputs():
         |-- created_playlists
             |-- <playlist_name>Summary_Created<creation_date>   # CREATED
                 |-- summary_dashboard_components                # CREATED
-                        |-- artist_summary_table.html           # CREATED
+                        |-- artist_summary_table.json           # CREATED
                         |-- danceability_plot.html              # CREATED
+                        |-- danceability_plot.json              # CREATED
                         |-- energy_plot.html                    # CREATED
+                        |-- energy_plot.json                    # CREATED
+                        |-- manifest.json                       # CREATED
                         |-- speechiness_plot.html               # CREATED
+                        |-- speechiness_plot.json               # CREATED
                         |-- tempo_plot.html                     # CREATED
+                        |-- tempo_plot.json                     # CREATED
+                |-- playlist_metadata.json                      # CREATED
+                |-- profile.json                                # CREATED
+                |-- summary_dashboard_export.html               # CREATED
                 |-- Playlist_Songs.csv                          # CREATED
                 |-- Summary_Dashboard                           # CREATED
             |-- ExistingPlaylistSummary_Created2024-01-02
             |-- styles
+                |-- plotly-<version>.min.js                     # CREATED
             |-- templates
         |-- sample_data
             |-- <.csv files>
@@ -47,6 +116,7 @@ class PlaylistGenOutputs():
         playlist_name: str,
         playlist_uri: str = "",
         playlist_created_on: str = None,
+        profiler: Optional[Any] = None,
     ) -> None:
         """
         Initialize the PlaylistGenOutputs class.
@@ -58,14 +128,20 @@ class PlaylistGenOutputs():
             playlist_uri (str): Spotify URI of the playlist.
             playlist_created_on (str): Date when the playlist was created in
                 month-day-year (default is the current date).
+            profiler (run_profiler.RunProfiler, optional): Profiler of the
+                current run, recording dashboard stages. Its profile is shown
+                in the dashboard and saved by save_profile.
         """
 
         self.df_songs = df_songs
+        self.profiler = profiler
+        self.recommended_artists = recommended_artists
         self.recommended_artists_msg = ", ".join(recommended_artists)
         self.playlist_name = playlist_name
 
-        # spotify:playlist:URI -> playlist/URI
-        self.playlist_uri = playlist_uri.replace(":", "/").split("spotify/")[1]
+        # spotify:playlist:URI -> playlist/URI ("" if no URI, Ex: when
+        # regenerating a dashboard whose playlist URI wasn't saved)
+        self.playlist_uri = playlist_uri.replace(":", "/").split("spotify/")[-1]
 
         # Optional creation date parameter, if analyzing an existing playlist
         if playlist_created_on:
@@ -74,38 +150,205 @@ class PlaylistGenOutputs():
             self.playlist_created_on = datetime.now().strftime("%m-%d-%Y")
 
 
-    def create_dashboard(self) -> None:
-        """Generate and save the playlist summary dashboard."""
+    def create_dashboard(
+        self,
+        max_workers: Optional[int] = None,
+        force: bool = False
+    ) -> None:
+        """
+        Generate and save the playlist summary dashboard.
 
-        self.create_output_folders()
-        self.create_playlist_summary()
-        self.create_artist_summary_table()
-        self.create_feature_plots()
-
-        # Import HTML dashboard template from file
-        print(f"CWD: {os.getcwd()}")
-        dashboard_template_file_name = (
-            "output/created_playlists/templates/dashboard_template.html"
-        )
-        with open(dashboard_template_file_name, "r") as template_file:
-            dashboard_html = template_file.read()
-
-        # Replace placeholders in the template with actual HTML content
-        dashboard_html = dashboard_html.format(
-            playlist_name=self.playlist_name,
-            playlist_created_on=self.playlist_created_on,
-            num_dur_songs_msg=self.num_dur_songs_msg,
-            top_genres_msg=self.top_genres_msg,
-            recommended_artists_msg=self.recommended_artists_msg,
-            trend_msg_line1_html=self.trend_msg_line1_html,
-            trend_msg_line2_html=self.trend_msg_line2_html,
-            artist_summary_table_html=self.artist_summary_table_html
+        Parameters:
+            max_workers (int): Max processes used to create dashboard
+                components (see create_dashboard_components).
+            force (bool): If True, regenerate all dashboard components, even
+                if their inputs are unchanged.
+        """
+
+        with self.profile_stage("dashboard"):
+            self.create_dashboard_components(
+                max_workers=max_workers, force=force
+            )
+            self.save_playlist_metadata()
+
+            with self.profile_stage("render dashboard"):
+                # Get the compiled HTML dashboard template (loaded once per
+                # process)
+                dashboard_template = get_template_environment().get_template(
+                    "dashboard_template.html"
+                )
+
+                if (
+                    len(self.df_artist_summary_table)
+                    >= VIRTUAL_TABLE_MIN_ARTISTS
+                ):
+                    artist_summary_table_json = get_artist_summary_table_json(
+                        self.df_artist_summary_table
+                    )
+                else:
+                    artist_summary_table_json = None
+
+                # Render the template with actual HTML content, streaming it
+                # to file so large artist tables are never built as one string
+                file_name = "summary_dashboard.html"
+                with open(
+                    f"{self.dashboard_dir}{file_name}", "w", encoding="utf-8"
+                ) as dashboard_file:
+                    dashboard_template.stream(
+                        **self.get_dashboard_context(),
+                        artist_summary_table_json=artist_summary_table_json,
+                        plotlyjs_file_name=self.plotlyjs_file_name,
+                        feature_plots_json=self.feature_plots_json
+                    ).dump(dashboard_file)
+
+
+    def get_dashboard_context(self) -> Dict[str, Any]:
+        """
+        Gets the template variables shared by the dashboard and its
+        single-file export: summary messages, artist table rows (formatted
+        lazily) and the run profile.
+        """
+
+        return {
+            "playlist_name": self.playlist_name,
+            "playlist_created_on": self.playlist_created_on,
+            "num_dur_songs_msg": self.num_dur_songs_msg,
+            "top_genres_msg": self.top_genres_msg,
+            "recommended_artists_msg": self.recommended_artists_msg,
+            "features_with_trends": self.features_with_trends,
+            "trend_details_msgs": self.trend_details_msgs,
+            "artist_summary_table_columns": self.df_artist_summary_table.columns,
+            "artist_summary_table_rows": iter_html_table_rows(
+                self.df_artist_summary_table
+            ),
+            "run_profile": self.get_run_profile(),
+        }
+
+
+    def export_dashboard(
+        self,
+        file_path: Optional[str] = None,
+        include_plotlyjs: bool = True,
+        max_workers: Optional[int] = None,
+        force: bool = False
+    ) -> str:
+        """
+        Generate and save the playlist summary dashboard as one self-contained
+        HTML file, small enough to email or serve statically: CSS and scripts
+        are inlined, and figure data shared by the feature plots is stored
+        once, gzipped, then expanded by the browser.
+
+        Parameters:
+            file_path (str): Path of the exported file (default is
+                summary_dashboard_export.html in the dashboard folder).
+            include_plotlyjs (bool): If True, embed (gzipped) plotly.js, so
+                the file renders offline. If False, load it from the CDN,
+                making the file ~1.4 MB smaller.
+            max_workers (int): See create_dashboard.
+            force (bool): See create_dashboard.
+
+        Returns:
+            str: Path of the exported file.
+        """
+
+        self.create_dashboard_components(max_workers=max_workers, force=force)
+        if file_path is None:
+            file_path = f"{self.dashboard_dir}{EXPORT_FILE_NAME}"
+
+        with open(
+            f"{STYLES_DIR}dashboard_style.css", encoding="utf-8"
+        ) as css_file:
+            dashboard_css = css_file.read()
+        if len(self.df_artist_summary_table) >= VIRTUAL_TABLE_MIN_ARTISTS:
+            artist_summary_table_json = get_artist_summary_table_json(
+                self.df_artist_summary_table
+            )
+            with open(
+                f"{STYLES_DIR}artist_table.js", encoding="utf-8"
+            ) as js_file:
+                artist_table_js = js_file.read()
+        else:
+            artist_summary_table_json = None
+            artist_table_js = None
+        dashboard_data = compress_to_base64(create_dashboard_data_json(
+            self.feature_plots_json, artist_summary_table_json
+        ))
+
+        export_template = get_template_environment().get_template(
+            "dashboard_export_template.html"
         )
+        with open(file_path, "w", encoding="utf-8") as export_file:
+            export_template.stream(
+                **self.get_dashboard_context(),
+                artist_table_js=artist_table_js,
+                dashboard_css=dashboard_css,
+                dashboard_data=dashboard_data,
+                plotlyjs_data=(
+                    get_compressed_plotlyjs() if include_plotlyjs else None
+                ),
+                plotlyjs_version=get_plotlyjs_version()
+            ).dump(export_file)
+
+        return file_path
+
+
+    def profile_stage(self, name: str) -> Any:
+        """
+        Gets a context recording a stage in the run profile (a no-op if there
+        is no profiler).
+        """
+
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.stage(name)
+
+
+    def get_run_profile(self) -> Optional[Dict[str, Any]]:
+        """
+        Gets the profile of the run that created the playlist: the current
+        run's, or the one saved in profile.json when regenerating a
+        dashboard. None if neither exists.
+        """
+
+        if self.profiler is not None:
+            return self.profiler.to_dict()
 
-        # Create file
-        file_name = "summary_dashboard.html"
-        with open(f"{self.dashboard_dir}{file_name}", "w") as dashboard_file:
-            dashboard_file.write(dashboard_html)
+        profile_path = f"{self.dashboard_dir}{PROFILE_FILE_NAME}"
+        if not os.path.isfile(profile_path):
+            return None
+        with open(profile_path, encoding="utf-8") as profile_file:
+            return json.load(profile_file)
+
+
+    def save_profile(self) -> None:
+        """Saves the current run's profile to the dashboard folder."""
+
+        if self.profiler is not None:
+            self.create_output_folders() # Create folder if DNE yet
+            self.profiler.save(f"{self.dashboard_dir}{PROFILE_FILE_NAME}")
+
+
+    def save_playlist_metadata(self) -> None:
+        """
+        Saves the dashboard inputs not found in playlist_songs.csv (name, URI,
+        creation date and recommended artists), so the dashboard can be
+        regenerated later (see regenerate_dashboards.py).
+        """
+
+        self.create_output_folders() # Create folder if DNE yet
+        playlist_metadata = {
+            "playlist_name": self.playlist_name,
+            "playlist_uri": (
+                f"spotify:{self.playlist_uri.replace('/', ':')}"
+                if self.playlist_uri else ""
+            ),
+            "playlist_created_on": self.playlist_created_on,
+            "recommended_artists": self.recommended_artists,
+        }
+        with open(
+            f"{self.dashboard_dir}{METADATA_FILE_NAME}", "w", encoding="utf-8"
+        ) as file:
+            json.dump(playlist_metadata, file, indent=2)
 
 
     def save_df_as_csv(self, df: pd.DataFrame, file_name: str) -> None:
@@ -136,13 +379,8 @@ class PlaylistGenOutputs():
                     |-- summary_dashboard_components                # CREATED
         """
 
-        # Re-format to year-month-day so folders can be sorted by date
-        month, day, year = self.playlist_created_on.split('-')
-        formatted_creation_date = f"{year}-{month}-{day}"
-        
-        self.dashboard_dir = (
-            f"output/created_playlists/{self.playlist_name.replace(' ','')}"
-            f"Summary_Created{formatted_creation_date}/"
+        self.dashboard_dir = get_dashboard_dir(
+            self.playlist_name, self.playlist_created_on
         )
         self.dashboard_components_dir = (
             f"{self.dashboard_dir}summary_dashboard_components/"
@@ -151,114 +389,267 @@ class PlaylistGenOutputs():
             os.makedirs(self.dashboard_components_dir) # Create dir if DNE yet
 
 
-    def create_playlist_summary(self) -> None:
+    def create_dashboard_components(
+        self,
+        x_axis: str="Song Popularity",
+        y_axis: List[str]=["Tempo", "Danceability", "Energy", "Speechiness"],
+        max_workers: Optional[int] = None,
+        render_mode: str = "auto",
+        force: bool = False
+    ) -> None:
         """
-        Creates a summary of playlist information.
+        Create the playlist summary, artist summary table and feature plots in
+        a process pool, with one task per component, then merge the results.
 
-        Example output for Playlist Summary section of dashboard:
+        Components are regenerated incrementally: each is tagged in
+        summary_dashboard_components/manifest.json with a hash of the input
+        columns and parameters it depends on, and only components whose hash
+        changed (or whose files are missing) are created again.
 
-        Spotipy Playlist - Edc Orlando 2023
-        Public playlist created on 01-02-2024
+        Parameters:
+            x_axis (str): Feature to be plotted on the x-axis.
+            y_axis (List[str]): List of features to be plotted on the y-axis.
+            max_workers (int): Max processes used. 1 creates all components
+                in this process. None uses one process per component, up to
+                the number of CPUs.
+            render_mode (str): Feature plot render mode (see
+                get_render_mode).
+            force (bool): If True, regenerate all components.
+        """
 
-        94 songs, 5 hr 22 min
-        Total song runtime
+        self.create_output_folders()
+        self.plotlyjs_file_name = write_plotlyjs_asset()
+        if isinstance(y_axis, str):
+            y_axis = [y_axis]
 
-        Pop Dance, EDM, House, UK Dance, Dance Pop
-        Top 5 genres
+        # Feature trends are always computed (single cheap pass), since plots
+        # depend on them
+        color_map = get_artist_color_map(self.df_songs)
+        feature_trends = analyze_feature_trends(self.df_songs, y_axis)
+        plotlyjs_src = f"../../styles/{self.plotlyjs_file_name}"
+
+        # Each component's function, arguments and input hash
+        summary_columns = ["Song Duration", "Artist", "Artist Genres"]
+        table_columns = [
+            "Artist", "Song Duration", "Artist Popularity", "Artist Genres",
+            "Tempo", "Danceability", "Energy", "Speechiness"
+        ]
+        components = {
+            "playlist_summary": (
+                create_playlist_summary_msgs,
+                (self.df_songs[summary_columns],),
+                get_content_hash(self.df_songs, summary_columns),
+            ),
+            "artist_summary_table": (
+                get_artist_summary_table,
+                (self.df_songs[table_columns],),
+                get_content_hash(self.df_songs, table_columns),
+            ),
+        }
+        for feature in y_axis:
+            plot_columns = [x_axis, feature, "Artist", "Song"]
+            plot_color_map = {
+                artist: color_map[artist]
+                for artist in self.df_songs["Artist"].unique()
+                if artist in color_map
+            }
+            components[f"{feature}_plot"] = (
+                create_feature_plot,
+                (
+                    self.df_songs[plot_columns],
+                    feature_trends[feature],
+                    x_axis,
+                    plot_color_map,
+                    self.get_feature_plot_path(feature),
+                    plotlyjs_src,
+                    render_mode
+                ),
+                get_content_hash(
+                    self.df_songs,
+                    plot_columns,
+                    trend=feature_trends[feature][:6], # Excludes histograms
+                    color_map=plot_color_map,
+                    plotlyjs_src=plotlyjs_src,
+                    render_mode=render_mode,
+                ),
+            )
 
-        Nicky Romero, Sebastian Ingrosso, Hardwell
-        Similar artists you may want to add
+        # Reuse results of components whose inputs are unchanged
+        manifest = {} if force else self.load_components_manifest()
+        results = {}
+        for name, (_, _, content_hash) in components.items():
+            if manifest.get(name, {}).get("hash") == content_hash:
+                results[name] = self.load_component_result(name, manifest)
+        self.regenerated_components = [
+            name for name in components if results.get(name) is None
+        ]
 
-        Energy, Speechiness have strong trends
-        82% of songs within 0.66 - 0.96 Energy range
-        96% of songs within 0 - 0.23 Speechiness range
+        # Create changed components, in this process if only one needs
+        # creating or max_workers is 1 (avoiding pool start-up overhead)
+        if max_workers is None:
+            max_workers = min(
+                len(self.regenerated_components), os.cpu_count() or 1
+            )
+        if max_workers <= 1:
+            for name in self.regenerated_components:
+                func, args, _ = components[name]
+                with self.profile_stage(name):
+                    results[name] = func(*args)
+        elif self.profiler is not None:
+            # Profile each component in its worker process
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    name: executor.submit(
+                        self.profiler.profile_call,
+                        self.profiler.trace_memory,
+                        components[name][0],
+                        *components[name][1]
+                    )
+                    for name in self.regenerated_components
+                }
+                for name, future in futures.items():
+                    results[name], *measurements = future.result()
+                    self.profiler.add_stage(name, *measurements)
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {
+                    name: executor.submit(
+                        components[name][0], *components[name][1]
+                    )
+                    for name in self.regenerated_components
+                }
+                for name, future in futures.items():
+                    results[name] = future.result()
+
+        # Save changed components' results and the updated manifest
+        for name in self.regenerated_components:
+            manifest[name] = self.save_component_result(name, results[name])
+            manifest[name]["hash"] = components[name][2]
+        self.save_components_manifest(manifest)
+
+        # Merge results, keeping plots in y_axis order
+        self.num_dur_songs_msg, self.top_genres_msg = (
+            results["playlist_summary"]
+        )
+        self.df_artist_summary_table = results["artist_summary_table"]
+        feature_plots_json = {
+            feature: results[f"{feature}_plot"] for feature in y_axis
+        }
+        self.set_feature_plot_outputs(feature_trends, feature_plots_json)
+
+
+    def load_components_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Loads the dashboard components manifest: component name -> input hash
+        and cached results. Returns an empty manifest if none exists yet.
         """
 
-        # Calculate playlist total # of songs and duration
-        # Format: "# songs, # hr # min"
-        # Edge case (<60min) format: "# songs, # min # sec"
-        playlist_total_songs = len(self.df_songs)
-        playlist_duration_secs = (
-            self.df_songs["Song Duration"].sum() // 1000
-        )  # Convert ms to seconds
-        if playlist_duration_secs // 3600 > 0:
-            self.num_dur_songs_msg = (
-                f"{playlist_total_songs} songs, "
-                f"{playlist_duration_secs // 3600} hr "
-                f"{(playlist_duration_secs % 3600) // 60} min"
-            )
-        else: # Playlist duration < 60 min
-            self.num_dur_songs_msg = (
-                f"{playlist_total_songs} songs, "
-                f"{playlist_duration_secs // 60} min "
-                f"{playlist_duration_secs % 60} sec"
+        manifest_path = f"{self.dashboard_components_dir}{MANIFEST_FILE_NAME}"
+        if not os.path.exists(manifest_path):
+            return {}
+        with open(manifest_path, "r", encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+
+
+    def save_components_manifest(
+        self,
+        manifest: Dict[str, Dict[str, Any]]
+    ) -> None:
+        """Saves the dashboard components manifest."""
+
+        manifest_path = f"{self.dashboard_components_dir}{MANIFEST_FILE_NAME}"
+        with open(manifest_path, "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=2)
+
+
+    def save_component_result(self, name: str, result: Any) -> Dict[str, Any]:
+        """
+        Saves a created component's result so it can be reused while its
+        inputs are unchanged.
+
+        Parameters:
+            name (str): Component name (Ex: 'Tempo_plot').
+            result (Any): Result of the component's function.
+
+        Returns:
+            Dict[str, Any]: Manifest entry for the component.
+        """
+
+        if name == "playlist_summary":
+            return {"result": list(result)}
+
+        if name == "artist_summary_table":
+            file_name = "artist_summary_table.json"
+            result.to_json(
+                f"{self.dashboard_components_dir}{file_name}", orient="table",
+                index=False
             )
+        else:
+            file_name = f"{name.lower().replace(' ', '_')}.json"
+            with open(
+                f"{self.dashboard_components_dir}{file_name}", "w",
+                encoding="utf-8"
+            ) as fig_json_file:
+                fig_json_file.write(result)
+
+        return {"files": [file_name]}
 
-        # Get top 5 recurring genres in the playlist based on artists (not
-        # accounting for # songs by each artist, which was a design choice)
-        df_unique_artists = self.df_songs.drop_duplicates(
-            subset="Artist",
-            keep="first"
+
+    def load_component_result(
+        self,
+        name: str,
+        manifest: Dict[str, Dict[str, Any]]
+    ) -> Any:
+        """
+        Loads a component's saved result (see save_component_result).
+
+        Parameters:
+            name (str): Component name (Ex: 'Tempo_plot').
+            manifest (Dict[str, Dict[str, Any]]): Components manifest.
+
+        Returns:
+            Any: The saved result, or None if any of its files are missing.
+        """
+
+        if name == "playlist_summary":
+            return tuple(manifest[name]["result"])
+
+        file_path = f"{self.dashboard_components_dir}{manifest[name]['files'][0]}"
+        if not os.path.exists(file_path):
+            return None
+        if name == "artist_summary_table":
+            return pd.read_json(file_path, orient="table")
+
+        # Feature plots also need their .html file
+        feature = name[:-len("_plot")]
+        if not os.path.exists(self.get_feature_plot_path(feature)):
+            return None
+        with open(file_path, "r", encoding="utf-8") as fig_json_file:
+            return fig_json_file.read()
+
+
+    def create_playlist_summary(self) -> None:
+        """
+        Creates a summary of playlist information (see
+        create_playlist_summary_msgs).
+        """
+
+        self.num_dur_songs_msg, self.top_genres_msg = (
+            create_playlist_summary_msgs(self.df_songs)
         )
-        all_genres = [
-            genre
-            for genres in df_unique_artists["Artist Genres"]
-            for genre in genres
-        ] # Flattened list of all artists' genres, including repeats
-        top_genres = Counter(all_genres).most_common(5) # List of 5 tuples
-        self.top_genres_msg = ", ".join(genre for genre, _ in top_genres)
 
     
     def create_artist_summary_table(self) -> None:
         """Create an html artist summary table."""
 
-        # Apply aggregation functions for each artist to create data summary
-        df_artist_summary_table = self.df_songs.groupby("Artist").agg(
-            Total_Songs=("Artist", "count"),
-            Total_Runtime=(
-                "Song Duration",
-                lambda ms: (
-                    f"{ms.sum() // 60000} min "
-                    f"{ms.sum() % 60000 // 1000} sec"
-                )
-            ),
-            Artist_Popularity=("Artist Popularity", "first"),
-            Artist_Genres=("Artist Genres", lambda x: ", ".join(x.iloc[0])),
-            Average_Tempo=("Tempo", lambda x: round(x.mean())),
-            Average_Danceability=(
-                "Danceability",
-                lambda x: round(x.mean(), 2)
-            ),
-            Average_Energy=("Energy", lambda x: round(x.mean(), 2)),
-            Average_Speechiness=("Speechiness", lambda x: round(x.mean(), 2))
-        ).reset_index()
-
-        # Rename columns (these will be displayed in html dashboard table)
-        df_artist_summary_table.columns = [
-            "Artist",
-            "Total Songs",
-            "Total Runtime",
-            "Artist Popularity (0-100)",
-            "Genres",
-            "Average Tempo (BPM)",
-            "Average Danceability (0-1)",
-            "Average Energy (0-1)",
-            "Average Speechiness (0-1)"
-        ]
-
-        # Convert table to html to later be added into dashboard
-        self.artist_summary_table_html = df_artist_summary_table.to_html(
-            header=True,
-            justify="center",
-            classes="table",
-            index=False
-        )
+        self.df_artist_summary_table = get_artist_summary_table(self.df_songs)
 
 
     def create_feature_plots(
         self,
         x_axis: str="Song Popularity",
-        y_axis: List[str]=["Tempo", "Danceability", "Energy", "Speechiness"]
+        y_axis: List[str]=["Tempo", "Danceability", "Energy", "Speechiness"],
+        render_mode: str = "auto"
     ) -> None:
         """
         Generate scatter plots, perform feature analysis, and save plots as
@@ -269,185 +660,83 @@ class PlaylistGenOutputs():
             y_axis (List[str]): List of features to be plotted on the y-axis.
                 Creates a new plot for each y-axis feature provided in list.
                 Can also be a single string.
+            render_mode (str): 'auto', 'svg', 'webgl' or 'density' (see
+                get_render_mode).
         """
 
         # Create a custom color map to be used in plots' legends
-        unique_artists = self.df_songs["Artist"].unique()
-        colors = [
-            0x00FF00, 0xFF0000, 0x0000FF, 0xFFA500, 0x800080, 0x8B0000,
-            0x008080, 0x008000, 0x9ACD32, 0x000080, 0x808080, 0x8000FF,
-            0xFF00FF, 0x00FFFF, 0xFFFF00, 0xFF6347, 0x4682B4, 0x800000,
-            0x556B2F, 0xFF69B4, 0x9932CC, 0x483D8B, 0x32CD32, 0xFF4500,
-            0x9400D3, 0x00CED1, 0x2E8B57, 0x7FFF00, 0x6A5ACD, 0xDC143C,
-            0x8A2BE2, 0xFF8C00, 0xFFD700, 0x000000, 0xB22222, 0x8B4513,  
-            0xADFF2F, 0x8B008B, 0xFF1493, 0x228B22
-        ] # A bunch of custom colors for plotting
-        color_map = {
-            artist: f"#{i:06x}" for artist, i in zip(unique_artists, colors)
-        } # Dictionary mapping each unique artist to a different color
+        color_map = get_artist_color_map(self.df_songs)
 
         # Edge case to handle a single string to be used for y-axis
         if isinstance(y_axis, str):
             y_axis = [y_axis]
 
-        # Empty dict for adding identified feature trends based on analysis
-        feature_trends = {}
-
-        # Perform analysis and generate plots for each y-axis feature
-        for feature in y_axis:
+        # Write the shared plotly.js file used by plots, if not yet written
+        self.plotlyjs_file_name = write_plotlyjs_asset()
 
-            # Create feature plot with interacative hover capability
-            fig = px.scatter(
+        # Perform analysis for all features, then generate plots for each
+        # y-axis feature
+        feature_trends = analyze_feature_trends(self.df_songs, y_axis)
+        feature_plots_json = {
+            feature: create_feature_plot(
                 self.df_songs,
-                x=x_axis,
-                y=feature,
-                color="Artist",
-                hover_data=["Song"],
-                color_discrete_map=color_map,
+                feature_trends[feature],
+                x_axis,
+                color_map,
+                self.get_feature_plot_path(feature),
+                f"../../styles/{self.plotlyjs_file_name}",
+                render_mode
             )
+            for feature in y_axis
+        }
 
-            # Define a 30 BPM range, as most genres are characterized by ranges
-            # of 20-30 BPM. This design decision based on genre norms research.
-            if feature == "Tempo":
-                feature_range = 30
-
-            # Define a 0.3 range for the 3 features whose values are b/w 0-1.
-            # This design decision based mainly on Exploratory Data
-            # Analysis (EDA) with multiple datasets.
-            elif feature in {"Danceability", "Energy", "Speechiness"}:
-                feature_range = 0.3
-
-            # Edge case: If this function gets used in the future for another
-            # feature before function is updated.
-            else:
-                feature_range = 0
-
-            # Calculate feature mean and range upper/lower bounds
-            feature_mean = self.df_songs[feature].mean()
-            lower_bound = feature_mean - feature_range / 2
-            upper_bound = feature_mean + feature_range / 2
+        self.set_feature_plot_outputs(feature_trends, feature_plots_json)
 
-            # Edge cases for if calculated upper/lower bounds are out of range
-            if lower_bound < 0: # Apply this edge case to all features
-                lower_bound = 0
-            if (
-                feature in {"Danceability", "Energy", "Speechiness"}
-                and upper_bound > 1
-            ): # Don't apply this edge case to Tempo (BPM)
-                upper_bound = 1
-
-            # Identify songs within feature range
-            within_range = self.df_songs[
-                (self.df_songs[feature] >= lower_bound) &
-                (self.df_songs[feature] <= upper_bound)
-            ]
-
-            # Calculate the percentage of songs within the feature range
-            percent_within_range = round(
-                (len(within_range) / len(self.df_songs)) * 100
-            )
 
-            # Determine if there is a trend based on if 79% (z within +-1.25)
-            # of songs are within defined feature range
-            if percent_within_range >= 79:
+    def get_feature_plot_path(self, feature: str) -> str:
+        """Gets the path of a feature's plot .html file."""
 
-                # Process lower/upper bounds into desired message format
-                if feature == "Tempo":
-                    within_range_msg = (
-                        f"{round(lower_bound)} - {round(upper_bound)} BPM"
-                    )
-                elif feature in {"Danceability", "Energy", "Speechiness"}:
-                    within_range_msg = (
-                        f"{round(lower_bound, 2)} - {round(upper_bound, 2)}"
-                    )
+        file_name = f"{feature.lower().replace(' ', '_')}_plot.html"
+        return f"{self.dashboard_components_dir}{file_name}"
 
-                # Create messages and add to dict to add to summary dashboard
-                trend_details_msg = (
-                    f"{percent_within_range}% of songs "
-                    f"within {within_range_msg} {feature} range"
-                )
-                feature_trends[feature] = trend_details_msg
-
-                # Add uppper and lower bound lines to the plot
-                fig.add_shape(
-                    type="line",
-                    x0=self.df_songs[x_axis].min(),
-                    x1=self.df_songs[x_axis].max(),
-                    y0=lower_bound,
-                    y1=lower_bound,
-                    line=dict(color="red", width=2),
-                )
 
-                fig.add_shape(
-                    type="line",
-                    x0=self.df_songs[x_axis].min(),
-                    x1=self.df_songs[x_axis].max(),
-                    y0=upper_bound,
-                    y1=upper_bound,
-                    line=dict(color="red", width=2),
-                )
+    def set_feature_plot_outputs(
+        self,
+        feature_trends: Dict[str, "FeatureTrend"],
+        feature_plots_json: Dict[str, str]
+    ) -> None:
+        """
+        Process feature trends for Playlist Summary section of dashboard, and
+        embed each plot's figure JSON for the Song Feature Plots section.
 
-            # For adding units to plot y-axis
-            if feature == "Tempo":
-                y_units = "BPM"
-
-            elif feature in {"Danceability", "Energy", "Speechiness"}:
-                y_units = "0-1"
-
-            # Create and center plot title. Define spacing/margins and colors
-            fig.update_layout(
-                title=f"{feature} vs. Song Popularity",
-                title_x=0.5,
-                xaxis_title=f"Song Popularity (1-100)",
-                yaxis_title=f"{feature} ({y_units})",
-                paper_bgcolor="rgba(200, 200, 200, 0)", # Transparent, as...
-                # ... part of a work-around for rounding the plot corners.
-                # plot_bgcolor="rgb(200, 200, 200)",
-                margin=dict(l=25, r=20, t=40, b=5),
-                legend=dict(
-                    x=1,
-                    y=1,
-                    traceorder="normal",
-                    orientation="v",
-                    xanchor="left",
-                    yanchor="top",
-                ),
-                title_font=dict(color="black"),
-                xaxis=dict(
-                    title_font=dict(color="black"),
-                    tickfont=dict(color="black")
-                ),
-                yaxis=dict(
-                    title_font=dict(color="black"),
-                    tickfont=dict(color="black")
-                ),
-                font=dict(color="black"),
-            )
+        Parameters:
+            feature_trends (Dict[str, FeatureTrend]): Each feature's trend,
+                as returned by analyze_feature_trends.
+            feature_plots_json (Dict[str, str]): Each feature's figure JSON,
+                as returned by create_feature_plot.
+        """
 
-            # Save each plot to an HTML file
-            file_name = f"{feature.lower().replace(' ', '_')}_plot.html"
-            fig.write_html(
-                f"{self.dashboard_components_dir}{file_name}",
-                full_html=False,
-                include_plotlyjs="cdn",
-                default_width=605,
-                default_height=335
+        # Figures are rendered by the dashboard from these JSON data blobs
+        # ("</" is escaped so figure text can't close the script tag)
+        self.feature_plots_json = {
+            f"{feature.lower().replace(' ', '_')}_plot": (
+                fig_json.replace("</", "<\\/")
             )
-
-        # Process feature trends for Playlist Summary section of dashboard
-        if len(feature_trends) == 4:
-            features_with_trends = "All song features"
-        elif len(feature_trends) == 0:
-            features_with_trends = "No song features"
+            for feature, fig_json in feature_plots_json.items()
+        }
+
+        trend_details_msgs = {
+            feature: feature_trend.trend_details_msg
+            for feature, feature_trend in feature_trends.items()
+            if feature_trend.has_trend
+        }
+        if len(trend_details_msgs) == 4:
+            self.features_with_trends = "All song features"
+        elif len(trend_details_msgs) == 0:
+            self.features_with_trends = "No song features"
         else:
-            features_with_trends = ", ".join(feature_trends.keys())
-        self.trend_msg_line1_html = (
-            f'<div id="line1">{features_with_trends} have strong trends</div>'
-        )
-        self.trend_msg_line2_html = "\n".join(
-            f'<div id="line2">{trend_details_msg}</span></div>'
-            for trend_details_msg in feature_trends.values()
-        )
+            self.features_with_trends = ", ".join(trend_details_msgs.keys())
+        self.trend_details_msgs = list(trend_details_msgs.values())
 
 
     def open_dashboard_and_playlist(self) -> None:
@@ -462,16 +751,845 @@ class PlaylistGenOutputs():
         webbrowser.open(full_dashboard_path, new=1)
 
         # Open playlist in Spotify web browser
-        playlist_link = f"https://open.spotify.com/{self.playlist_uri}"
-        webbrowser.open(playlist_link, new=2)
+        if self.playlist_uri:
+            playlist_link = f"https://open.spotify.com/{self.playlist_uri}"
+            webbrowser.open(playlist_link, new=2)
 
 
-if __name__ == "__main__":
-    # Import df from .csv then change string representation of genres to list
-    df_songs = pd.read_csv(
-        "output/sample_data/EdcOrlando2023SampleSongs.csv"
+def get_dashboard_dir(
+    playlist_name: str,
+    playlist_created_on: Optional[str] = None
+) -> str:
+    """
+    Gets the output folder of a playlist (see PlaylistGenOutputs).
+
+    Parameters:
+        playlist_name (str): Name of the playlist.
+        playlist_created_on (str): Date when the playlist was created in
+            month-day-year (default is the current date).
+
+    Returns:
+        str: Folder path, ending in '/'.
+    """
+
+    if not playlist_created_on:
+        playlist_created_on = datetime.now().strftime("%m-%d-%Y")
+
+    # Re-format to year-month-day so folders can be sorted by date
+    month, day, year = playlist_created_on.split('-')
+    formatted_creation_date = f"{year}-{month}-{day}"
+
+    return (
+        f"output/created_playlists/{playlist_name.replace(' ','')}"
+        f"Summary_Created{formatted_creation_date}/"
+    )
+
+
+# Dashboard components are created by module-level functions, rather than
+# PlaylistGenOutputs methods, so they can run in worker processes.
+def create_playlist_summary_msgs(df_songs: pd.DataFrame) -> Tuple[str, str]:
+    """
+    Creates a summary of playlist information.
+
+    Example output for Playlist Summary section of dashboard:
+
+    Spotipy Playlist - Edc Orlando 2023
+    Public playlist created on 01-02-2024
+
+    94 songs, 5 hr 22 min
+    Total song runtime
+
+    Pop Dance, EDM, House, UK Dance, Dance Pop
+    Top 5 genres
+
+    Nicky Romero, Sebastian Ingrosso, Hardwell
+    Similar artists you may want to add
+
+    Energy, Speechiness have strong trends
+    82% of songs within 0.66 - 0.96 Energy range
+    96% of songs within 0 - 0.23 Speechiness range
+
+    Parameters:
+        df_songs (pd.DataFrame): DataFrame containing song info.
+
+    Returns:
+        Tuple[str, str]: Number of songs/duration message and top genres
+            message.
+    """
+
+    # Calculate playlist total # of songs and duration
+    # Format: "# songs, # hr # min"
+    # Edge case (<60min) format: "# songs, # min # sec"
+    playlist_total_songs = len(df_songs)
+    playlist_duration_secs = (
+        df_songs["Song Duration"].sum() // 1000
+    )  # Convert ms to seconds
+    if playlist_duration_secs // 3600 > 0:
+        num_dur_songs_msg = (
+            f"{playlist_total_songs} songs, "
+            f"{playlist_duration_secs // 3600} hr "
+            f"{(playlist_duration_secs % 3600) // 60} min"
+        )
+    else: # Playlist duration < 60 min
+        num_dur_songs_msg = (
+            f"{playlist_total_songs} songs, "
+            f"{playlist_duration_secs // 60} min "
+            f"{playlist_duration_secs % 60} sec"
+        )
+
+    # Get top 5 recurring genres in the playlist based on artists (not
+    # accounting for # songs by each artist, which was a design choice)
+    df_unique_artists = df_songs.drop_duplicates(
+        subset="Artist",
+        keep="first"
+    )
+    all_genres = [
+        genre
+        for genres in df_unique_artists["Artist Genres"]
+        for genre in genres
+    ] # Flattened list of all artists' genres, including repeats
+    top_genres = Counter(all_genres).most_common(5) # List of 5 tuples
+    top_genres_msg = ", ".join(genre for genre, _ in top_genres)
+
+    return num_dur_songs_msg, top_genres_msg
+
+
+def create_artist_summary_table_html(df_songs: pd.DataFrame) -> str:
+    """
+    Create an html artist summary table.
+
+    Parameters:
+        df_songs (pd.DataFrame): DataFrame containing song info.
+
+    Returns:
+        str: html table, to later be added into dashboard.
+    """
+
+    # Convert table to html to later be added into dashboard
+    return get_artist_summary_table(df_songs).to_html(
+        header=True,
+        justify="center",
+        classes="table",
+        index=False
+    )
+
+
+def get_artist_summary_table(df_songs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Create an artist summary table: one row per artist, sorted by artist,
+    with formatted runtime, joined genres and rounded feature averages.
+
+    Parameters:
+        df_songs (pd.DataFrame): DataFrame containing song info.
+
+    Returns:
+        pd.DataFrame: Artist summary table, with display column names.
+    """
+
+    # Aggregate each artist's songs using only built-in reductions, then
+    # round and format the final columns once
+    df_artist_summary_table = df_songs.groupby("Artist").agg(
+        Total_Songs=("Artist", "count"),
+        Total_Runtime=("Song Duration", "sum"),
+        Artist_Popularity=("Artist Popularity", "first"),
+        Average_Tempo=("Tempo", "mean"),
+        Average_Danceability=("Danceability", "mean"),
+        Average_Energy=("Energy", "mean"),
+        Average_Speechiness=("Speechiness", "mean")
+    )
+    runtime_ms = df_artist_summary_table["Total_Runtime"]
+    df_artist_summary_table["Total_Runtime"] = (
+        (runtime_ms // 60000).astype(str) + " min "
+        + (runtime_ms % 60000 // 1000).astype(str) + " sec"
+    )
+    df_artist_summary_table["Average_Tempo"] = (
+        df_artist_summary_table["Average_Tempo"].round().astype(int)
+    )
+    for feature in ["Danceability", "Energy", "Speechiness"]:
+        df_artist_summary_table[f"Average_{feature}"] = (
+            df_artist_summary_table[f"Average_{feature}"].round(2)
+        )
+
+    # Join each artist's genres (from their first song), joining each
+    # distinct genre list only once
+    first_genres = df_songs.drop_duplicates("Artist").set_index("Artist")[
+        "Artist Genres"
+    ].reindex(df_artist_summary_table.index)
+    joined_genres = {} # Genre list (as tuple) -> joined genres
+    artist_genres = []
+    for genres in first_genres:
+        genres_key = genres if isinstance(genres, str) else tuple(genres)
+        if genres_key not in joined_genres:
+            joined_genres[genres_key] = ", ".join(genres)
+        artist_genres.append(joined_genres[genres_key])
+    df_artist_summary_table.insert(3, "Artist_Genres", artist_genres)
+    df_artist_summary_table = df_artist_summary_table.reset_index()
+
+    # Rename columns (these will be displayed in html dashboard table)
+    df_artist_summary_table.columns = [
+        "Artist",
+        "Total Songs",
+        "Total Runtime",
+        "Artist Popularity (0-100)",
+        "Genres",
+        "Average Tempo (BPM)",
+        "Average Danceability (0-1)",
+        "Average Energy (0-1)",
+        "Average Speechiness (0-1)"
+    ]
+
+    return df_artist_summary_table
+
+
+def get_content_hash(
+    df: pd.DataFrame,
+    columns: List[str],
+    **params: Any
+) -> str:
+    """
+    Hashes the columns and parameters a dashboard component depends on.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame containing song info.
+        columns (List[str]): Columns the component reads.
+        **params: Other inputs of the component (must be JSON-serializable,
+            or have a str representation stable across runs).
+
+    Returns:
+        str: Hex digest of the hash.
+    """
+
+    content_hash = hashlib.sha256()
+    content_hash.update(json.dumps(
+        [DASHBOARD_COMPONENTS_VERSION, columns, params],
+        sort_keys=True,
+        default=str
+    ).encode())
+
+    # Hash values row-wise. Object columns (Ex: genre lists) are hashed by
+    # their str representation, since lists aren't hashable.
+    df_inputs = df[columns]
+    for column, values in df_inputs.items():
+        if values.dtype == object:
+            values = values.astype(str)
+        content_hash.update(
+            pd.util.hash_pandas_object(values, index=False).to_numpy().tobytes()
+        )
+        content_hash.update(str(values.dtype).encode())
+
+    return content_hash.hexdigest()
+
+
+def iter_html_table_rows(df: pd.DataFrame) -> Iterator[List[str]]:
+    """
+    Lazily formats a DataFrame's rows as HTML table cells, matching
+    DataFrame.to_html: HTML-escaped strings, and floats with the same number
+    of decimals throughout each column (Ex: 0.5 and 0.12 -> '0.50', '0.12').
+
+    Parameters:
+        df (pd.DataFrame): Table to format.
+
+    Yields:
+        List[str]: Formatted cells of one row.
+    """
+
+    # Choose each column's formatter once
+    column_formatters = []
+    for _, values in df.items():
+        if pd.api.types.is_float_dtype(values):
+            decimals = get_float_column_decimals(values)
+            column_formatters.append(
+                lambda value, decimals=decimals: (
+                    "NaN" if np.isnan(value) else f"{value:.{decimals}f}"
+                )
+            )
+        else:
+            column_formatters.append(
+                lambda value: html.escape(str(value), quote=False)
+            )
+
+    for row in df.itertuples(index=False, name=None):
+        yield [
+            format_cell(value)
+            for format_cell, value in zip(column_formatters, row)
+        ]
+
+
+def get_float_column_decimals(values: pd.Series) -> int:
+    """
+    Gets the number of decimals DataFrame.to_html shows for a float column:
+    enough for its most precise value (up to 6), and at least 1.
+    """
+
+    finite_values = values[np.isfinite(values)]
+    return max([1] + [
+        len(np.format_float_positional(
+            value, precision=6, trim="-"
+        ).partition(".")[2])
+        for value in finite_values.unique()
+    ])
+
+
+def get_artist_summary_table_json(df_artist_summary_table: pd.DataFrame) -> str:
+    """
+    Gets the artist summary table as compact JSON for the dashboard's
+    virtual-scrolling table (see styles/artist_table.js): column names, the
+    decimals shown for each float column (null for other columns), and rows
+    of raw values, so the table can sort numeric columns numerically.
+
+    Parameters:
+        df_artist_summary_table (pd.DataFrame): See get_artist_summary_table.
+
+    Returns:
+        str: Table JSON, safe to embed in a <script> tag.
+    """
+
+    decimals = [
+        get_float_column_decimals(values)
+        if pd.api.types.is_float_dtype(values) else None
+        for _, values in df_artist_summary_table.items()
+    ]
+    table_json = (
+        '{"columns":'
+        + json.dumps(list(map(str, df_artist_summary_table.columns)))
+        + ',"decimals":' + json.dumps(decimals)
+        + ',"rows":' + df_artist_summary_table.to_json(orient="values")
+        + "}"
+    )
+
+    return table_json.replace("</", "<\\/")
+
+
+def create_dashboard_data_json(
+    feature_plots_json: Dict[str, str],
+    artist_summary_table_json: Optional[str] = None
+) -> str:
+    """
+    Combines an exported dashboard's data into one JSON document, storing
+    each distinct figure array once. Arrays with at least
+    EXPORT_MIN_SHARED_ARRAY_LENGTH items are moved to a shared "arrays" list
+    and replaced by {"$ref": index} (expanded by the exported dashboard).
+
+    Parameters:
+        feature_plots_json (Dict[str, str]): Plot id -> figure JSON (see
+            PlaylistGenOutputs.set_feature_plot_outputs).
+        artist_summary_table_json (str): See get_artist_summary_table_json.
+            None if the artist table is static.
+
+    Returns:
+        str: JSON with "plots", "arrays" and "artist_table" keys.
+    """
+
+    shared_arrays = []
+    array_indexes = {} # Array JSON -> index in shared_arrays
+
+    def share_arrays(value: Any) -> Any:
+        if isinstance(value, list):
+            # Only share arrays of values (Ex: not the list of traces)
+            if (
+                len(value) < EXPORT_MIN_SHARED_ARRAY_LENGTH
+                or any(isinstance(item, dict) for item in value)
+            ):
+                return [share_arrays(item) for item in value]
+            array_json = json.dumps(value, separators=(",", ":"))
+            if array_json not in array_indexes:
+                array_indexes[array_json] = len(shared_arrays)
+                shared_arrays.append(array_json)
+            return {"$ref": array_indexes[array_json]}
+        if isinstance(value, dict):
+            return {key: share_arrays(item) for key, item in value.items()}
+        return value
+
+    plots = {
+        plot_id: {
+            "data": share_arrays(fig["data"]),
+            "layout": fig["layout"],
+        }
+        for plot_id, fig in (
+            (plot_id, json.loads(fig_json))
+            for plot_id, fig_json in feature_plots_json.items()
+        )
+    }
+
+    return (
+        '{"plots":' + json.dumps(plots, separators=(",", ":"))
+        + ',"arrays":[' + ",".join(shared_arrays) + "]"
+        + ',"artist_table":' + (artist_summary_table_json or "null")
+        + "}"
+    )
+
+
+def compress_to_base64(text: str) -> str:
+    """
+    Gzips text (reproducibly, without a timestamp) and base64-encodes it, to
+    embed in HTML and expand in the browser with DecompressionStream.
+    """
+
+    return base64.b64encode(
+        gzip.compress(text.encode("utf-8"), compresslevel=9, mtime=0)
+    ).decode("ascii")
+
+
+@lru_cache(maxsize=None)
+def get_compressed_plotlyjs() -> str:
+    """
+    Gets the plotly.js bundled with the plotly package, gzipped and
+    base64-encoded (see compress_to_base64). Compressed once per process.
+    """
+
+    return compress_to_base64(get_plotlyjs())
+
+
+@lru_cache(maxsize=None)
+def get_template_environment(templates_dir: str = TEMPLATES_DIR) -> Environment:
+    """
+    Gets the Jinja2 environment for dashboard templates. Created once per
+    process, so each template is read and compiled once, then reused for
+    every dashboard built (Ex: by a batch job regenerating many dashboards).
+
+    Parameters:
+        templates_dir (str): Folder containing the templates.
+
+    Returns:
+        Environment: Jinja2 environment.
+    """
+
+    return Environment(
+        loader=FileSystemLoader(templates_dir),
+        auto_reload=False, # Don't re-check template files on every build
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True,
+    )
+
+
+def get_artist_color_map(df_songs: pd.DataFrame) -> Dict[str, str]:
+    """
+    Create a custom color map to be used in plots' legends.
+
+    Parameters:
+        df_songs (pd.DataFrame): DataFrame containing song info.
+
+    Returns:
+        Dict[str, str]: Dictionary mapping each unique artist to a different
+            color.
+    """
+
+    unique_artists = df_songs["Artist"].unique()
+    colors = [
+        0x00FF00, 0xFF0000, 0x0000FF, 0xFFA500, 0x800080, 0x8B0000,
+        0x008080, 0x008000, 0x9ACD32, 0x000080, 0x808080, 0x8000FF,
+        0xFF00FF, 0x00FFFF, 0xFFFF00, 0xFF6347, 0x4682B4, 0x800000,
+        0x556B2F, 0xFF69B4, 0x9932CC, 0x483D8B, 0x32CD32, 0xFF4500,
+        0x9400D3, 0x00CED1, 0x2E8B57, 0x7FFF00, 0x6A5ACD, 0xDC143C,
+        0x8A2BE2, 0xFF8C00, 0xFFD700, 0x000000, 0xB22222, 0x8B4513,  
+        0xADFF2F, 0x8B008B, 0xFF1493, 0x228B22
+    ] # A bunch of custom colors for plotting
+    color_map = {
+        artist: f"#{i:06x}" for artist, i in zip(unique_artists, colors)
+    }
+
+    # Past the custom colors, step hues by the golden ratio so consecutive
+    # artists get well-separated colors, cycling saturation and lightness
+    for i, artist in enumerate(unique_artists[len(colors):]):
+        hue = (i * 0.618033988749895) % 1
+        lightness = (0.35, 0.5, 0.65)[i % 3]
+        saturation = (0.9, 0.6)[i // 3 % 2]
+        red, green, blue = colorsys.hls_to_rgb(hue, lightness, saturation)
+        color_map[artist] = (
+            f"#{round(red * 255):02x}{round(green * 255):02x}"
+            f"{round(blue * 255):02x}"
+        )
+
+    return color_map
+
+
+class FeatureTrend(NamedTuple):
+    """
+    Statistics of one song feature, as computed by analyze_feature_trends.
+
+    A feature has a strong trend if at least TREND_PERCENT_THRESHOLD % of
+    songs are within a range of FEATURE_RANGE_WIDTHS[feature] centered on the
+    feature mean.
+    """
+    feature: str
+    mean: float
+    lower_bound: float
+    upper_bound: float
+    percent_within_range: int
+    has_trend: bool
+    trend_details_msg: Optional[str] # None if no strong trend
+    quantiles: Dict[float, float]
+    histogram_counts: np.ndarray
+    histogram_bin_edges: np.ndarray
+
+
+def analyze_feature_trends(
+    df_songs: pd.DataFrame,
+    features: List[str] = ["Tempo", "Danceability", "Energy", "Speechiness"],
+    quantiles: Tuple[float, ...] = (0.05, 0.25, 0.5, 0.75, 0.95),
+    num_bins: int = 20
+) -> Dict[str, FeatureTrend]:
+    """
+    Identify feature trends for the Playlist Summary section of dashboard and
+    the feature plots' range lines, for all features in one NumPy pass over a
+    songs x features matrix. Creates no plots, so can be used on full
+    catalogs (Ex: 1M+ songs).
+
+    Parameters:
+        df_songs (pd.DataFrame): DataFrame containing song info.
+        features (List[str]): Features to analyze.
+        quantiles (Tuple[float, ...]): Quantiles to compute per feature.
+        num_bins (int): Number of equal-width histogram bins per feature.
+
+    Returns:
+        Dict[str, FeatureTrend]: Statistics of each feature, in features
+            order.
+    """
+
+    if isinstance(features, str):
+        features = [features]
+    feature_matrix = df_songs[features].to_numpy(dtype=float, na_value=np.nan)
+    num_songs = len(feature_matrix)
+
+    # Feature ranges (see FEATURE_RANGE_WIDTHS), clipped to valid values
+    range_widths = np.array([
+        FEATURE_RANGE_WIDTHS.get(feature, 0) for feature in features
+    ])
+    is_unit_interval = np.array([
+        feature in UNIT_INTERVAL_FEATURES for feature in features
+    ])
+    with warnings.catch_warnings(): # All-NaN or empty features give NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        means = np.nanmean(feature_matrix, axis=0)
+    lower_bounds = means - range_widths / 2
+    upper_bounds = means + range_widths / 2
+    is_lower_clipped = lower_bounds < 0 # Apply this edge case to all features
+    is_upper_clipped = is_unit_interval & (upper_bounds > 1)
+    lower_bounds[is_lower_clipped] = 0
+    upper_bounds[is_upper_clipped] = 1
+
+    # Percentage of songs within each feature range
+    is_within_range = (
+        (feature_matrix >= lower_bounds) & (feature_matrix <= upper_bounds)
+    )
+    percents_within_range = np.round(
+        is_within_range.sum(axis=0) / max(num_songs, 1) * 100
+    ).astype(int)
+
+    # Quantiles and histograms. Histogram bin indexes are offset per feature
+    # so all features are counted with a single bincount.
+    if num_songs:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            quantile_values = np.nanquantile(
+                feature_matrix, quantiles, axis=0
+            ).reshape(len(quantiles), len(features))
+            mins = np.nanmin(feature_matrix, axis=0)
+            maxs = np.nanmax(feature_matrix, axis=0)
+    else:
+        quantile_values = np.full((len(quantiles), len(features)), np.nan)
+        mins = maxs = np.zeros(len(features))
+    mins = np.nan_to_num(mins)
+    maxs = np.maximum(np.nan_to_num(maxs), mins + 1e-9)
+    bin_edges = np.linspace(mins, maxs, num_bins + 1, axis=1)
+    bin_indexes = np.clip(
+        np.nan_to_num((feature_matrix - mins) / (maxs - mins) * num_bins)
+        .astype(int),
+        0,
+        num_bins - 1
+    )
+    is_valid = ~np.isnan(feature_matrix)
+    histogram_counts = np.bincount(
+        (bin_indexes + np.arange(len(features)) * num_bins)[is_valid],
+        minlength=len(features) * num_bins
+    ).reshape(len(features), num_bins)
+
+    feature_trends = {}
+    for i, feature in enumerate(features):
+
+        # Determine if there is a trend based on if 79% (z within +-1.25)
+        # of songs are within defined feature range
+        has_trend = bool(percents_within_range[i] >= TREND_PERCENT_THRESHOLD)
+        trend_details_msg = None
+        if has_trend:
+
+            # Process lower/upper bounds into desired message format. Clipped
+            # bounds are shown as ints (Ex: '0 - 0.23', not '0.0 - 0.23')
+            lower_bound = 0 if is_lower_clipped[i] else float(lower_bounds[i])
+            upper_bound = 1 if is_upper_clipped[i] else float(upper_bounds[i])
+            if feature == "Tempo":
+                within_range_msg = (
+                    f"{round(lower_bound)} - {round(upper_bound)} BPM"
+                )
+            else:
+                within_range_msg = (
+                    f"{round(lower_bound, 2)} - {round(upper_bound, 2)}"
+                )
+            trend_details_msg = (
+                f"{percents_within_range[i]}% of songs "
+                f"within {within_range_msg} {feature} range"
+            )
+
+        feature_trends[feature] = FeatureTrend(
+            feature=feature,
+            mean=float(means[i]),
+            lower_bound=float(lower_bounds[i]),
+            upper_bound=float(upper_bounds[i]),
+            percent_within_range=int(percents_within_range[i]),
+            has_trend=has_trend,
+            trend_details_msg=trend_details_msg,
+            quantiles={
+                q: float(value)
+                for q, value in zip(quantiles, quantile_values[:, i])
+            },
+            histogram_counts=histogram_counts[i],
+            histogram_bin_edges=bin_edges[i],
+        )
+
+    return feature_trends
+
+
+def create_feature_plot(
+    df_songs: pd.DataFrame,
+    feature_trend: FeatureTrend,
+    x_axis: str,
+    color_map: Dict[str, str],
+    file_path: str,
+    plotlyjs_src: str = "cdn",
+    render_mode: str = "auto"
+) -> str:
+    """
+    Generate a scatter plot, with lines marking the feature range if the
+        feature has a strong trend, and save plot as an HTML file.
+
+    Parameters:
+        df_songs (pd.DataFrame): DataFrame containing song info.
+        feature_trend (FeatureTrend): Trend of the feature to be plotted on
+            the y-axis (see analyze_feature_trends).
+        x_axis (str): Feature to be plotted on the x-axis.
+        color_map (Dict[str, str]): Artist colors (see get_artist_color_map).
+        file_path (str): Path of the .html file to create.
+        plotlyjs_src (str): plotly.js file path, relative to file_path (see
+            write_plotlyjs_asset), or "cdn".
+        render_mode (str): 'auto', 'svg', 'webgl' or 'density' (see
+            get_render_mode).
+
+    Returns:
+        str: The plot's figure JSON.
+    """
+
+    feature = feature_trend.feature
+    render_mode = get_render_mode(len(df_songs), render_mode)
+
+    # Create feature plot with interacative hover capability
+    if render_mode == "svg":
+        fig = px.scatter(
+            df_songs,
+            x=x_axis,
+            y=feature,
+            color="Artist",
+            hover_data=["Song"],
+            color_discrete_map=color_map,
+        )
+    else:
+        fig = create_large_feature_plot(
+            df_songs, feature, x_axis, color_map, render_mode
+        )
+
+    # Add uppper and lower bound lines to the plot
+    if feature_trend.has_trend:
+        for bound in (feature_trend.lower_bound, feature_trend.upper_bound):
+            fig.add_shape(
+                type="line",
+                x0=df_songs[x_axis].min(),
+                x1=df_songs[x_axis].max(),
+                y0=bound,
+                y1=bound,
+                line=dict(color="red", width=2),
+            )
+
+    # For adding units to plot y-axis
+    if feature == "Tempo":
+        y_units = "BPM"
+
+    elif feature in {"Danceability", "Energy", "Speechiness"}:
+        y_units = "0-1"
+
+    # Create and center plot title. Define spacing/margins and colors
+    fig.update_layout(
+        title=f"{feature} vs. Song Popularity",
+        title_x=0.5,
+        xaxis_title=f"Song Popularity (1-100)",
+        yaxis_title=f"{feature} ({y_units})",
+        paper_bgcolor="rgba(200, 200, 200, 0)", # Transparent, as...
+        # ... part of a work-around for rounding the plot corners.
+        # plot_bgcolor="rgb(200, 200, 200)",
+        margin=dict(l=25, r=20, t=40, b=5),
+        legend=dict(
+            x=1,
+            y=1,
+            traceorder="normal",
+            orientation="v",
+            xanchor="left",
+            yanchor="top",
+        ),
+        title_font=dict(color="black"),
+        xaxis=dict(
+            title_font=dict(color="black"),
+            tickfont=dict(color="black")
+        ),
+        yaxis=dict(
+            title_font=dict(color="black"),
+            tickfont=dict(color="black")
+        ),
+        font=dict(color="black"),
     )
-    df_songs['Artist Genres'] = df_songs['Artist Genres'].apply(eval)
+
+    # Save plot to an HTML file
+    fig.write_html(
+        file_path,
+        full_html=False,
+        include_plotlyjs=plotlyjs_src,
+        default_width=605,
+        default_height=335
+    )
+
+    return fig.to_json()
+
+
+def get_render_mode(num_songs: int, render_mode: str = "auto") -> str:
+    """
+    Chooses how to render a feature plot.
+
+    Parameters:
+        num_songs (int): Number of songs to plot.
+        render_mode (str):
+            'svg' - one SVG trace per artist, with a legend.
+            'webgl' - one WebGL trace colored by artist, without a legend.
+            'density' - a song density heatmap, plus a WebGL trace of up to
+                MAX_PLOT_POINTS sampled songs.
+            'auto' - 'svg' below WEBGL_MIN_SONGS songs, 'webgl' below
+                DENSITY_MIN_SONGS songs, otherwise 'density'.
+
+    Returns:
+        str: 'svg', 'webgl' or 'density'.
+    """
+
+    if render_mode not in RENDER_MODES:
+        raise ValueError(f"render_mode must be one of {RENDER_MODES}")
+    if render_mode != "auto":
+        return render_mode
+    if num_songs < WEBGL_MIN_SONGS:
+        return "svg"
+    if num_songs < DENSITY_MIN_SONGS:
+        return "webgl"
+    return "density"
+
+
+def create_large_feature_plot(
+    df_songs: pd.DataFrame,
+    feature: str,
+    x_axis: str,
+    color_map: Dict[str, str],
+    render_mode: str
+) -> go.Figure:
+    """
+    Create a feature scatter plot for playlists too large for one SVG trace
+    per artist. Trace count is constant, and with render_mode='density' the
+    number of plotted points is bounded too.
+
+    Parameters:
+        df_songs (pd.DataFrame): DataFrame containing song info.
+        feature (str): Feature to be plotted on the y-axis.
+        x_axis (str): Feature to be plotted on the x-axis.
+        color_map (Dict[str, str]): Artist colors (see get_artist_color_map).
+        render_mode (str): 'webgl' or 'density' (see get_render_mode).
+
+    Returns:
+        go.Figure: Feature plot.
+    """
+
+    fig = go.Figure()
+    df_points = df_songs
+
+    if render_mode == "density":
+        # Song density heatmap, binned here so its size is fixed
+        x = df_songs[x_axis].to_numpy(dtype=float, na_value=np.nan)
+        y = df_songs[feature].to_numpy(dtype=float, na_value=np.nan)
+        is_valid = ~np.isnan(x) & ~np.isnan(y)
+        counts, x_edges, y_edges = np.histogram2d(
+            x[is_valid], y[is_valid], bins=DENSITY_BINS
+        )
+        fig.add_trace(go.Heatmap(
+            x=(x_edges[:-1] + x_edges[1:]) / 2,
+            y=(y_edges[:-1] + y_edges[1:]) / 2,
+            z=np.where(counts.T > 0, counts.T, np.nan), # Empty bins blank
+            colorscale="Greys",
+            showscale=False,
+            hovertemplate="%{z} songs<extra></extra>",
+        ))
+
+        # Sample songs to draw on top of the density layer
+        if len(df_songs) > MAX_PLOT_POINTS:
+            df_points = df_songs.sample(MAX_PLOT_POINTS, random_state=0)
+
+    # Single WebGL trace, colored by artist. Artists are shown on hover
+    # rather than in a legend, which would be too long.
+    fig.add_trace(go.Scattergl(
+        x=df_points[x_axis],
+        y=df_points[feature],
+        mode="markers",
+        marker=dict(
+            color=df_points["Artist"].map(color_map).fillna("#808080"),
+            size=5,
+            opacity=0.7,
+        ),
+        customdata=np.column_stack([df_points["Artist"], df_points["Song"]]),
+        hovertemplate=(
+            "Artist=%{customdata[0]}<br>"
+            f"{x_axis}=%{{x}}<br>{feature}=%{{y}}<br>"
+            "Song=%{customdata[1]}<extra></extra>"
+        ),
+        showlegend=False,
+    ))
+
+    return fig
+
+
+def write_plotlyjs_asset(styles_dir: str = STYLES_DIR) -> str:
+    """
+    Writes the minified plotly.js bundled with the plotly package to the
+    shared styles folder, if not yet written, so dashboards and plots render
+    offline without each loading plotly.js from the CDN.
+
+    Parameters:
+        styles_dir (str): Folder to write plotly.js to.
+
+    Returns:
+        str: Name of the plotly.js file (Ex: 'plotly-2.27.0.min.js').
+    """
+
+    file_name = f"plotly-{get_plotlyjs_version()}.min.js"
+    file_path = os.path.join(styles_dir, file_name)
+    if not os.path.exists(file_path):
+        os.makedirs(styles_dir, exist_ok=True)
+
+        # Write to a temporary file first, so concurrent dashboard builds
+        # never read a partially written file
+        temp_file_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(temp_file_path, "w", encoding="utf-8") as plotlyjs_file:
+            plotlyjs_file.write(get_plotlyjs())
+        os.replace(temp_file_path, file_path)
+
+    return file_name
+
+
+if __name__ == "__main__":
+    from playlist_io import load_df
+
+    # Import df from .csv (parsing string representation of genres to lists)
+    df_songs = load_df("output/sample_data/EdcOrlando2023SampleSongs.csv")
     recommended_artists = ['Nicky Romero', 'Sebastian Ingrosso', 'Hardwell']
     playlist_name = "Edc Orlando 2023"
     playlist_uri = "spotify:playlist:3yKYKDuCzErrYaZ1DXLdAS"
@@ -0,0 +1,256 @@
+###############################################################################
+#
+# This file contains functions for saving and loading df_songs and df_artists
+# (see run_playlist_generator.main for their columns):
+#   - save_songs / save_artists save a typed, compressed Parquet file, with
+#      real list columns (Ex: 'Artist Genres') and explicit dtypes
+#   - load_df loads a Parquet (or .csv) file back into a DataFrame with list
+#      columns as lists, and iter_df_chunks loads one a chunk at a time
+#   - find_song_file finds a playlist output folder's songs file, preferring
+#      playlist_songs.parquet
+#   - load_csv safely parses list columns of .csv files (saved for humans,
+#      or older outputs), which store lists as strings (Ex: "['House', 'EDM']")
+#
+###############################################################################
+
+import ast
+import os
+from typing import Any, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+PARQUET_COMPRESSION = "zstd"
+
+# Columns stored as lists of strings. In .csv files, they're stored as the
+# string representation of a Python list.
+LIST_COLUMNS = ("Artist Genres", "Song Artists")
+
+# Songs files saved in each playlist output folder, in order of preference
+SONG_FILE_NAMES = ("playlist_songs.parquet", "playlist_songs.csv")
+
+# Explicit column types. Only columns present in a DataFrame are used, and
+# other columns are stored with their inferred types.
+SONG_SCHEMA = pa.schema([
+    ("Song", pa.string()),
+    ("Artist", pa.string()),
+    ("Song Popularity", pa.int64()),
+    ("Danceability", pa.float64()),
+    ("Energy", pa.float64()),
+    ("Tempo", pa.float64()),
+    ("Speechiness", pa.float64()),
+    ("Song Duration", pa.int64()),
+    ("Artist Genres", pa.list_(pa.string())),
+    ("Artist Popularity", pa.int64()),
+    ("Artist uri", pa.string()),
+    ("Song uri", pa.string()),
+    ("Artist Image url", pa.string()),
+    ("Song Artists", pa.list_(pa.string())),
+    ("Song isrc", pa.string()),
+])
+ARTIST_SCHEMA = pa.schema([
+    ("Artist", pa.string()),
+    ("Artist Genres", pa.list_(pa.string())),
+    ("Artist Popularity", pa.int64()),
+    ("Artist uri", pa.string()),
+    ("Artist Image url", pa.string()),
+])
+
+
+def save_songs(df_songs: pd.DataFrame, file_path: str) -> None:
+    """Saves df_songs as a Parquet file (see save_df)."""
+    save_df(df_songs, file_path, SONG_SCHEMA)
+
+
+def save_artists(df_artists: pd.DataFrame, file_path: str) -> None:
+    """Saves df_artists as a Parquet file (see save_df)."""
+    save_df(df_artists, file_path, ARTIST_SCHEMA)
+
+
+def save_df(
+    df: pd.DataFrame,
+    file_path: str,
+    schema: pa.Schema,
+    compression: str = PARQUET_COMPRESSION
+) -> None:
+    """
+    Saves a DataFrame as a compressed Parquet file, casting its columns to
+    their types in schema.
+
+    Parameters:
+        df (pd.DataFrame): DataFrame to save (Ex: df_songs).
+        file_path (str): Path of the .parquet file.
+        schema (pa.Schema): Column types (Ex: SONG_SCHEMA). Columns not in
+            schema keep their inferred types.
+        compression (str): Parquet compression codec.
+    """
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    for field in schema:
+        column_index = table.schema.get_field_index(field.name)
+        if column_index != -1:
+            table = table.set_column(
+                column_index,
+                field,
+                table.column(column_index).cast(field.type)
+            )
+
+    pq.write_table(table, file_path, compression=compression)
+
+
+def load_df(
+    file_path: str,
+    columns: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Loads a DataFrame saved by save_songs/save_artists (or a .csv file, see
+    load_csv). List columns are loaded as lists of strings.
+
+    Parameters:
+        file_path (str): Path of the .parquet (or .csv) file.
+        columns (List[str], optional): Only load these columns.
+
+    Returns:
+        pd.DataFrame: Loaded DataFrame.
+    """
+
+    if file_path.endswith(".csv"):
+        return load_csv(file_path, usecols=columns)
+
+    return table_to_df(pq.read_table(file_path, columns=columns))
+
+
+def iter_df_chunks(
+    file_path: str,
+    chunksize: int,
+    columns: Optional[List[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Loads a file like load_df, chunksize rows at a time, so large files can
+    be processed without loading them whole.
+
+    Parameters:
+        file_path (str): Path of the .parquet (or .csv) file.
+        chunksize (int): Max rows per chunk.
+        columns (List[str], optional): Only load these columns.
+
+    Yields:
+        pd.DataFrame: Loaded rows, with list columns as lists of strings.
+    """
+
+    if file_path.endswith(".csv"):
+        for df_chunk in pd.read_csv(
+            file_path, usecols=columns, chunksize=chunksize
+        ):
+            yield parse_list_columns(df_chunk)
+        return
+
+    parquet_file = pq.ParquetFile(file_path)
+    for batch in parquet_file.iter_batches(
+        batch_size=chunksize, columns=columns
+    ):
+        yield table_to_df(pa.Table.from_batches([batch]))
+
+
+def find_song_file(folder_path: str) -> Optional[str]:
+    """
+    Gets the path of a playlist output folder's songs file (see
+    SONG_FILE_NAMES), or None if it has none.
+    """
+
+    for file_name in SONG_FILE_NAMES:
+        file_path = os.path.join(folder_path, file_name)
+        if os.path.isfile(file_path):
+            return file_path
+    return None
+
+
+def table_to_df(table: pa.Table) -> pd.DataFrame:
+    """Converts a loaded Arrow table to a DataFrame with list columns as lists."""
+
+    list_columns = [
+        field.name for field in table.schema if pa.types.is_list(field.type)
+    ]
+    df = table.drop(list_columns).to_pandas()
+
+    # Convert list columns to Python lists (to_pandas gives NumPy arrays),
+    # keeping the saved column order
+    for name in list_columns:
+        df[name] = to_lists(table.column(name))
+
+    return df[table.column_names]
+
+
+def to_lists(column: pa.ChunkedArray) -> List[List[Any]]:
+    """
+    Converts a Parquet list column to a list of Python lists (nulls as []).
+    Slices the flattened values by the list offsets, which is several times
+    faster than ChunkedArray.to_pylist.
+    """
+
+    column = column.combine_chunks()
+    if column.null_count:
+        column = column.fill_null(pa.scalar([], type=column.type))
+    offsets = column.offsets.to_numpy().tolist()
+    values = column.flatten().to_numpy(zero_copy_only=False)
+
+    return [
+        values[start:end].tolist()
+        for start, end in zip(offsets[:-1], offsets[1:])
+    ]
+
+
+def load_csv(file_path: str, **read_csv_kwargs: Any) -> pd.DataFrame:
+    """
+    Loads a .csv file of songs or artists, safely parsing list columns
+    (without eval).
+
+    Parameters:
+        file_path (str): Path of the .csv file.
+        **read_csv_kwargs: Passed to pd.read_csv.
+
+    Returns:
+        pd.DataFrame: Loaded DataFrame.
+    """
+
+    return parse_list_columns(pd.read_csv(file_path, **read_csv_kwargs))
+
+
+def parse_list_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Parses the list columns (see LIST_COLUMNS) of a DataFrame read from .csv
+    in place, using parse_list.
+    """
+
+    for name in LIST_COLUMNS:
+        if name in df.columns:
+            # Parse each distinct value once (Ex: an artist's genres repeat
+            # for each of their songs), giving each row its own list
+            codes, values = pd.factorize(df[name])
+            parsed_values = [parse_list(value) for value in values]
+            df[name] = [
+                [] if code == -1 else list(parsed_values[code])
+                for code in codes
+            ]
+
+    return df
+
+
+def parse_list(value: Any) -> List[str]:
+    """
+    Parses a list column value read from .csv (Ex: "['House', 'EDM']"), using
+    ast.literal_eval, so only literals are evaluated. Values that aren't the
+    string representation of a list or tuple are parsed as [].
+    """
+
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str):
+        return []
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return []
+    return list(value) if isinstance(value, (list, tuple)) else []
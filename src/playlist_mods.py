@@ -1,8 +1,219 @@
-from typing import List, Tuple
+from contextlib import nullcontext
+from functools import lru_cache, partial, wraps
+import inspect
+import re
+import time
+from typing import (
+    Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional,
+    Tuple, Union
+)
+import unicodedata
 
+import numpy as np
 import pandas as pd
 
 
+# Optional execution backends. pandas (NumPy/object dtypes) is always
+# available; Arrow-backed pandas requires pyarrow, and Polars frames are
+# accepted (and returned) when polars is installed.
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+BACKENDS = ("auto", "pandas", "arrow")
+
+# Inputs with at least this many rows run on the Arrow backend when
+# backend="auto". Arrow strings and list<string> genres roughly halve memory
+# use compared to object dtypes, which matters for multi-festival jobs.
+ARROW_BACKEND_MIN_ROWS = 50_000
+
+
+def is_arrow_backed(df: pd.DataFrame) -> bool:
+    """Returns True if any column of a pandas DataFrame uses pd.ArrowDtype."""
+    return any(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+
+
+def select_backend(df: Any, backend: str = "auto") -> str:
+    """
+    Selects the backend ('pandas' or 'arrow') used to process a DataFrame.
+
+    Parameters:
+        df: pandas or Polars DataFrame.
+        backend (str): 'auto', 'pandas' or 'arrow'. 'auto' uses Arrow for
+            Polars frames, Arrow-backed frames and frames with at least
+            ARROW_BACKEND_MIN_ROWS rows (if pyarrow is installed).
+
+    Returns:
+        str: 'pandas' or 'arrow'.
+    """
+
+    if backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, not {backend!r}")
+    if backend == "arrow" and pa is None:
+        raise ImportError("The 'arrow' backend requires pyarrow.")
+    if backend != "auto":
+        return backend
+
+    if pa is None:
+        return "pandas"
+    if pl is not None and isinstance(df, pl.DataFrame):
+        return "arrow"
+    if is_arrow_backed(df) or len(df) >= ARROW_BACKEND_MIN_ROWS:
+        return "arrow"
+    return "pandas"
+
+
+def convert_df_backend(df: Any, backend: str) -> pd.DataFrame:
+    """
+    Converts a pandas or Polars DataFrame to a pandas DataFrame for the given
+    backend.
+
+    Parameters:
+        df: pandas or Polars DataFrame.
+        backend (str): 'pandas' (NumPy/object dtypes) or 'arrow'
+            (pd.ArrowDtype columns, with 'Artist Genres' as list<string>).
+
+    Returns:
+        pd.DataFrame using the backend's dtypes.
+    """
+
+    if pl is not None and isinstance(df, pl.DataFrame):
+        # Polars and pandas ArrowDtype columns share Arrow memory
+        df = df.to_pandas(use_pyarrow_extension_array=True)
+
+    if backend == "arrow":
+        if not is_arrow_backed(df) or (df.dtypes == object).any():
+            df = df.convert_dtypes(dtype_backend="pyarrow")
+
+            # convert_dtypes leaves list columns (Ex: 'Artist Genres') as
+            # object dtype, so convert those to Arrow lists separately
+            for column in df.columns[df.dtypes == object]:
+                values = df[column].tolist()
+                try:
+                    arrow_values = pa.array(values)
+                except (pa.ArrowInvalid, pa.ArrowTypeError):
+                    continue # Mixed types; leave as object dtype
+                df[column] = pd.Series(
+                    pd.arrays.ArrowExtensionArray(arrow_values),
+                    index=df.index
+                )
+        return df
+
+    # 'pandas' backend: NumPy-backed columns, with strings/lists as objects
+    if is_arrow_backed(df):
+        list_columns = [
+            column for column, dtype in df.dtypes.items()
+            if isinstance(dtype, pd.ArrowDtype)
+            and pa.types.is_list(dtype.pyarrow_dtype)
+        ]
+        df = df.astype({
+            column: object if pd.api.types.is_object_dtype(
+                dtype.numpy_dtype
+            ) else dtype.numpy_dtype
+            for column, dtype in df.dtypes.items()
+            if isinstance(dtype, pd.ArrowDtype) and column not in list_columns
+        })
+
+        # Arrow lists become Python lists (astype would give NumPy arrays)
+        for column in list_columns:
+            df[column] = pd.Series(
+                arrow_lists_to_python(pa.array(df[column].array)),
+                index=df.index,
+                dtype=object
+            )
+    return df
+
+
+def arrow_lists_to_python(values: Any) -> List[Optional[List[Any]]]:
+    """
+    Converts an Arrow list array to Python lists (nulls as None), by slicing
+    the flattened values by the list offsets (several times faster than
+    to_pylist).
+    """
+
+    if isinstance(values, pa.ChunkedArray):
+        values = values.combine_chunks()
+    offsets = values.offsets.to_numpy().tolist()
+    flat_values = values.flatten().to_numpy(zero_copy_only=False)
+    is_null = values.is_null().to_numpy(zero_copy_only=False)
+
+    return [
+        None if is_null[i] else flat_values[start:end].tolist()
+        for i, (start, end) in enumerate(zip(offsets[:-1], offsets[1:]))
+    ]
+
+
+def with_backend(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Decorator adding a `backend` keyword argument to a playlist_mods function.
+
+    DataFrame arguments (positional or keyword) are converted to the selected
+    backend, chosen from the first DataFrame argument. DataFrames in the
+    result are returned in the form of that first argument, so the backend
+    is an internal detail: Polars in, Polars out; NumPy-backed pandas in,
+    NumPy-backed pandas out; Arrow-backed pandas in, Arrow-backed pandas out.
+    """
+
+    signature = inspect.signature(func)
+
+    def is_frame(arg: Any) -> bool:
+        return isinstance(arg, pd.DataFrame) or (
+            pl is not None and isinstance(arg, pl.DataFrame)
+        )
+
+    @wraps(func)
+    def wrapper(*args: Any, backend: str = "auto", **kwargs: Any) -> Any:
+        bound_args = signature.bind(*args, **kwargs)
+        first_frame = next(
+            (arg for arg in bound_args.arguments.values() if is_frame(arg)),
+            None
+        )
+        if first_frame is None:
+            raise TypeError(
+                f"{func.__name__}() requires a pandas or Polars DataFrame "
+                "argument"
+            )
+
+        selected_backend = select_backend(first_frame, backend)
+        for name, arg in bound_args.arguments.items():
+            if is_frame(arg):
+                bound_args.arguments[name] = convert_df_backend(
+                    arg, selected_backend
+                )
+        result = func(*bound_args.args, **bound_args.kwargs)
+
+        return convert_result_backend(result, first_frame)
+
+    return wrapper
+
+
+def convert_result_backend(result: Any, input_frame: Any) -> Any:
+    """
+    Converts DataFrames in a with_backend function's result (a DataFrame or
+    a tuple containing DataFrames) back to the form of its input frame.
+    """
+
+    if isinstance(result, tuple):
+        return tuple(
+            convert_result_backend(item, input_frame) for item in result
+        )
+    if not isinstance(result, pd.DataFrame):
+        return result
+
+    if pl is not None and isinstance(input_frame, pl.DataFrame):
+        return pl.from_pandas(result)
+    if is_arrow_backed(input_frame):
+        return convert_df_backend(result, "arrow")
+    return convert_df_backend(result, "pandas")
+
+
+@with_backend
 def remove_duplicates(
     df_songs: pd.DataFrame
 ) -> Tuple[pd.DataFrame, List[str]]:
@@ -11,6 +222,7 @@ def remove_duplicates(
     
     Parameters:
         df_songs: Pandas DataFrame containing song information.
+        backend: 'auto', 'pandas' or 'arrow' (see select_backend).
 
     Returns:
         DataFrame containing no duplicate songs.
@@ -32,6 +244,323 @@ def remove_duplicates(
     return df_no_duplicates, removed_songs
 
 
+# Bracketed or dashed title suffixes that don't make a song a different song.
+# Ex: 'Escape (feat. Hayla)', 'Levels - Radio Version', 'Hey Jude - Remastered
+# 2015'. Remixes and edits are intentionally NOT listed here; those are
+# handled (optionally) by remove_remixes_and_edits.
+FEATURED_ARTIST_PATTERN = re.compile(
+    r"\s*[\(\[](?:feat\.?|ft\.?|featuring|with)\s[^\)\]]*[\)\]]",
+    flags=re.IGNORECASE
+)
+NON_DISTINCT_VERSION_PATTERN = re.compile(
+    r"\s*(?:-\s*|[\(\[])"
+    r"(?:(?:\d{4}\s+)?remaster(?:ed)?(?:\s+\d{4})?(?:\s+version)?"
+    r"|single version|album version|radio version|original mix"
+    r"|mono|stereo|mono version|stereo version)"
+    r"[\)\]]?\s*$",
+    flags=re.IGNORECASE
+)
+
+
+# Titles repeat across an artist's releases and across festivals, but a
+# bounded cache keeps memory flat for very large multi-festival merges
+@lru_cache(maxsize=65_536)
+def normalize_song_title(song: str) -> str:
+    """
+    Normalizes a song title so that different releases of the same song
+    produce the same string.
+
+    Parameters:
+        song (str): Song title, as returned by the Spotify API.
+
+    Returns:
+        str: Case-folded, accent-stripped title without featured artists or
+            non-distinct version suffixes.
+
+    Ex: 'Tiësto - Single Version' -> 'tiesto'
+        'Another Me (with Dylan Matthew)' -> 'another me'
+    """
+
+    # Strip accents (Ex: 'Tiësto' -> 'Tiesto') and case-fold
+    title = unicodedata.normalize("NFKD", song)
+    title = "".join(c for c in title if not unicodedata.combining(c))
+    title = title.casefold()
+
+    # Remove featured artists and non-distinct version suffixes. Looped since
+    # titles can stack suffixes (Ex: 'Song (feat. X) - 2011 Remaster')
+    previous_title = None
+    while previous_title != title:
+        previous_title = title
+        title = FEATURED_ARTIST_PATTERN.sub("", title)
+        title = NON_DISTINCT_VERSION_PATTERN.sub("", title)
+
+    # Drop punctuation and collapse whitespace
+    title = re.sub(r"[^\w\s]", " ", title)
+    return " ".join(title.split())
+
+
+def get_track_signature(
+    song: str,
+    artists: Iterable[str],
+) -> Tuple[str, Tuple[str, ...]]:
+    """
+    Creates the duration-independent part of a track signature.
+
+    Parameters:
+        song (str): Song title.
+        artists (Iterable[str]): All artists credited on the song. A single
+            artist name (str) is also accepted.
+
+    Returns:
+        Tuple[str, Tuple[str, ...]]: Normalized title and sorted, case-folded
+            artist set.
+    """
+
+    if isinstance(artists, str):
+        artists = [artists]
+    artist_set = tuple(sorted({artist.casefold() for artist in artists}))
+    return normalize_song_title(song), artist_set
+
+
+class TrackDedupeIndex():
+    """
+    Hash index for detecting near-duplicate tracks: covers, re-releases and
+    collabs that show up under multiple artists with different URIs.
+
+    Two tracks are considered the same song if they share an ISRC (when
+    available), or if they share a track signature: normalized title, sorted
+    artist set, and a duration within duration_tolerance_ms. Durations are
+    bucketed by duration_tolerance_ms and the neighboring buckets are probed,
+    so both add() and find() are O(1) per track.
+    """
+
+    def __init__(self, duration_tolerance_ms: int = 5000) -> None:
+        """
+        Initialize the TrackDedupeIndex class.
+
+        Parameters:
+            duration_tolerance_ms (int): Max difference in 'Song Duration' for
+                two tracks with the same title and artists to be considered
+                the same song (default is 5 seconds).
+        """
+
+        self.duration_tolerance_ms = max(int(duration_tolerance_ms), 1)
+        self._signatures = {} # (title, artists, bucket) -> [(duration, value)]
+        self._isrcs = {} # isrc -> value
+        self._num_tracks = 0
+
+    def __len__(self) -> int:
+        """Number of tracks added to the index."""
+        return self._num_tracks
+
+    def find(
+        self,
+        song: str,
+        artists: Iterable[str],
+        duration_ms: int,
+        isrc: Optional[str] = None,
+    ) -> Optional[Any]:
+        """
+        Finds a previously added track matching the given track.
+
+        Parameters:
+            song (str): Song title.
+            artists (Iterable[str]): All artists credited on the song.
+            duration_ms (int): Song duration in ms.
+            isrc (str, optional): International Standard Recording Code.
+
+        Returns:
+            Any: value stored with the matching track, or None if no match.
+        """
+
+        if isrc and isrc in self._isrcs:
+            return self._isrcs[isrc]
+
+        title, artist_set = get_track_signature(song, artists)
+        bucket = int(duration_ms) // self.duration_tolerance_ms
+        for neighbor_bucket in (bucket, bucket - 1, bucket + 1):
+            for duration, value in self._signatures.get(
+                (title, artist_set, neighbor_bucket), ()
+            ):
+                if abs(duration - duration_ms) <= self.duration_tolerance_ms:
+                    return value
+
+        return None
+
+    def add(
+        self,
+        song: str,
+        artists: Iterable[str],
+        duration_ms: int,
+        isrc: Optional[str] = None,
+        value: Any = True,
+    ) -> None:
+        """
+        Adds a track to the index.
+
+        Parameters:
+            song (str): Song title.
+            artists (Iterable[str]): All artists credited on the song.
+            duration_ms (int): Song duration in ms.
+            isrc (str, optional): International Standard Recording Code.
+            value (Any): Value returned by find() for matching tracks (Ex: a
+                row index or Song uri).
+        """
+
+        title, artist_set = get_track_signature(song, artists)
+        bucket = int(duration_ms) // self.duration_tolerance_ms
+        self._signatures.setdefault((title, artist_set, bucket), []).append(
+            (int(duration_ms), value)
+        )
+        if isrc:
+            self._isrcs.setdefault(isrc, value)
+        self._num_tracks += 1
+
+    def find_or_add(
+        self,
+        song: str,
+        artists: Iterable[str],
+        duration_ms: int,
+        isrc: Optional[str] = None,
+        value: Any = True,
+    ) -> Optional[Any]:
+        """
+        Single-pass helper: returns the matching track's value if the track is
+        a near-duplicate, otherwise adds the track and returns None.
+        """
+
+        match = self.find(song, artists, duration_ms, isrc)
+        if match is None:
+            self.add(song, artists, duration_ms, isrc, value)
+        elif isrc:
+            self._isrcs.setdefault(isrc, match) # Link ISRC to first version
+        return match
+
+
+def get_song_artists_column(df_songs: pd.DataFrame) -> pd.Series:
+    """
+    Gets the artists credited on each song.
+
+    Uses 'Song Artists' (all credited artists, from get_top_tracks) when
+    available. Falls back to 'Artist' for DataFrames created before that
+    column existed (Ex: older .csv files in output/sample_data).
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+
+    Returns:
+        pd.Series of artist lists, or of artist name strings.
+    """
+
+    if "Song Artists" in df_songs.columns:
+        return df_songs["Song Artists"].astype(object).where(
+            df_songs["Song Artists"].notna(), df_songs["Artist"]
+        )
+    return df_songs["Artist"]
+
+
+def get_near_duplicate_mask(
+    df_songs: pd.DataFrame,
+    duration_tolerance_ms: int = 5000,
+) -> np.ndarray:
+    """
+    Flags songs that are near-duplicates of an earlier song in df_songs.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        duration_tolerance_ms: Max 'Song Duration' difference for two songs
+            with the same title and artists to be considered the same song.
+
+    Returns:
+        np.ndarray[bool]: True for songs to keep (first occurrences).
+    """
+
+    dedupe_index = TrackDedupeIndex(duration_tolerance_ms)
+    if "Song isrc" in df_songs.columns:
+        isrcs = df_songs["Song isrc"].astype(object).where(
+            df_songs["Song isrc"].notna(), None
+        )
+    else:
+        isrcs = [None] * len(df_songs)
+
+    # Build the index and flag near-duplicates in one hashing pass
+    is_near_duplicate = [
+        dedupe_index.find_or_add(song, artists, duration, isrc) is not None
+        for song, artists, duration, isrc in zip(
+            df_songs["Song"],
+            get_song_artists_column(df_songs),
+            df_songs["Song Duration"],
+            isrcs,
+        )
+    ]
+
+    return ~np.array(is_near_duplicate, dtype=bool)
+
+
+@with_backend
+def remove_near_duplicates(
+    df_songs: pd.DataFrame,
+    duration_tolerance_ms: int = 5000,
+) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Removes songs that are the same song released under different URIs, such
+    as a collab appearing under each artist's top tracks as both the single
+    and the album version.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        duration_tolerance_ms: Max 'Song Duration' difference for two songs
+            with the same title and artists to be considered the same song.
+        backend: 'auto', 'pandas' or 'arrow' (see select_backend).
+
+    Returns:
+        DataFrame containing no near-duplicate songs (first occurrence kept).
+        List[str] containing removed songs, if any.
+
+    Uses 'Song isrc' for exact recording matches when that column is present.
+    """
+
+    keep = get_near_duplicate_mask(df_songs, duration_tolerance_ms)
+    removed_songs = df_songs.loc[~keep, "Song"].tolist()
+    df_no_duplicates = df_songs[keep].reset_index(drop=True)
+
+    return df_no_duplicates, removed_songs
+
+
+def get_remix_and_edit_mask(df_songs: pd.DataFrame) -> np.ndarray:
+    """
+    Flags the highest 'Song Popularity' version of every song. Ties are
+    resolved in favor of the version that comes first in df_songs.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+
+    Returns:
+        np.ndarray[bool]: True for songs to keep.
+    """
+
+    # Extract the 'Base Song Name' from the 'Song' column
+    # Ex: 'Where You Are - Kaskade Remix' -> 'Where You Are'
+    base_song_names = df_songs['Song'].str.replace(
+        r'^(.+?) - .+$', r'\1', regex=True
+    )
+
+    # Order by 'Song Popularity' (to keep most popular version) and retain the
+    # first song for each base song
+    popularity_order = np.argsort(
+        -df_songs['Song Popularity'].to_numpy(dtype=float), kind='stable'
+    )
+    base_song_names = base_song_names.iloc[popularity_order]
+    is_most_popular_version = (
+        ~base_song_names.duplicated(keep='first') & base_song_names.notna()
+    ).to_numpy()
+
+    keep = np.empty(len(df_songs), dtype=bool)
+    keep[popularity_order] = is_most_popular_version
+    return keep
+
+
+@with_backend
 def remove_remixes_and_edits(
     df_songs: pd.DataFrame
 ) -> Tuple[pd.DataFrame, List[str]]:
@@ -41,6 +570,7 @@ def remove_remixes_and_edits(
 
     Parameters:
         df_songs: Pandas DataFrame containing song information.
+        backend: 'auto', 'pandas' or 'arrow' (see select_backend).
 
     Returns:
         Filtered DataFrame with only the highest popularity version of any song
@@ -49,81 +579,1137 @@ def remove_remixes_and_edits(
     Ex: Input contains:  'Where You Are' and 'Where You Are - Kaskade Remix'
         Output contains: 'Where You Are' only
     """
-    
-    # Split the 'Song' column into 'Base Song Name' and 'Version'
-    # Ex: Splits 'Where You Are - Kaskade Remix' into
-    # 'Where You Are' and 'Kaskade Remix'
-    df_songs[['Base Song Name', 'Version']] = (
-        df_songs['Song'].str.extract(r'(.+?)(?: - (.+))?$', expand=True)
-    )
-
-    # Sort the df by 'Song Popularity' (to keep most popular version)
-    df_sorted = df_songs.sort_values(by='Song Popularity', ascending=False)
 
-    # Group by base song and retain the first for each, then drop the temp cols
-    df_filtered = df_sorted.groupby('Base Song Name').head(1)
-    df_filtered = df_filtered.drop(columns=['Base Song Name', 'Version'])
-
-    # Get removed songs by comparing the original and new DataFrames
-    removed_song_names = list(
-        df_songs[~df_songs.index.isin(df_filtered.index)]['Song']
-    )
+    keep = get_remix_and_edit_mask(df_songs)
+    removed_song_names = df_songs.loc[~keep, 'Song'].tolist()
 
     # Sort the final DataFrame alphabetically by artist
-    df_filtered = df_filtered.sort_values(by='Artist')
+    df_filtered = df_songs[keep].sort_values(by='Artist', kind='stable')
 
     return df_filtered.reset_index(drop=True), removed_song_names
 
 
-def filter_songs_by_artist_popularity(df_songs: pd.DataFrame) -> pd.DataFrame:
+def get_retained_song_counts(
+    df_songs: pd.DataFrame
+) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Filter songs based on the variation in popularity for each artist,
-    keeping more songs the more popular an artist is.
+    Calculates the number of songs to retain for each artist, retaining more
+    songs the more popular an artist is.
 
     Parameters:
         df_songs: Pandas DataFrame containing song information.
 
     Returns:
-        Filtered DataFrame with songs based on the artist popularity.
+        np.ndarray[int]: Artist code of each song (-1 for missing artists),
+            as returned by pd.factorize(df_songs['Artist']).
+        np.ndarray[float]: Number of songs to retain for each artist code.
     """
 
+    # Encode artists as integer codes (-1 for missing artist names) so the
+    # per-artist counting below runs in NumPy for every backend
+    artist_codes, _ = pd.factorize(df_songs['Artist'])
+    has_artist = artist_codes >= 0
+    if not has_artist.any():
+        return artist_codes, np.zeros(0)
+
     # Get the maximum number of songs by any artist in the DataFrame
-    max_songs_by_artist = df_songs.groupby('Artist').size().max()
+    songs_by_artist = np.bincount(artist_codes[has_artist])
+    max_songs_by_artist = songs_by_artist.max()
 
     # Get the maximum artist popularity in the DataFrame
-    artist_max_pop = df_songs['Artist Popularity'].max()
+    artist_popularity = df_songs['Artist Popularity'].to_numpy(
+        dtype=float, na_value=np.nan
+    )
+    artist_max_pop = np.nanmax(artist_popularity)
 
     # Calculate song retention percentage for each artist based on popularity.
     # By design, this is correlated to the difference between each artist's
     # popularity and the max popularity in the DataFrame.
-    df_songs['Retention Percentage'] = (
-        100 - (artist_max_pop - df_songs['Artist Popularity'])
+    # Ensure a minimum retention percentage of 30%.
+    retention_percentage = np.fmax(
+        100 - (artist_max_pop - artist_popularity), 30
     )
 
-    # Ensure a minimum retention percentage of 30%
-    df_songs['Retention Percentage'] = (
-        df_songs['Retention Percentage'].clip(lower=30)
+    # Calculate the number of songs to retain for each artist (ensure 2+),
+    # based on each artist's first song
+    retained_songs = np.fmax(
+        (retention_percentage / 100) * max_songs_by_artist, 2
     )
+    _, first_song_by_artist = np.unique(artist_codes, return_index=True)
+    if artist_codes[first_song_by_artist[0]] < 0: # Skip missing artist names
+        first_song_by_artist = first_song_by_artist[1:]
+    return artist_codes, np.floor(retained_songs[first_song_by_artist])
+
+
+def get_artist_popularity_mask(df_songs: pd.DataFrame) -> np.ndarray:
+    """
+    Flags the songs to retain for each artist, keeping more songs the more
+    popular an artist is. Each artist's first songs in df_songs are retained.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+
+    Returns:
+        np.ndarray[bool]: True for songs to keep.
+    """
 
-    # Calculate the number of songs to retain for each artist (ensure 2+)
-    df_songs['Retained Songs'] = (
-        (df_songs['Retention Percentage'] / 100) * max_songs_by_artist
+    artist_codes, retained_songs = get_retained_song_counts(df_songs)
+    has_artist = artist_codes >= 0
+    if not has_artist.any():
+        return has_artist
+
+    # Rank each artist's songs by position (0 = artist's first song)
+    songs_by_artist = np.bincount(artist_codes[has_artist])
+    song_order = np.argsort(artist_codes, kind='stable')
+    group_starts = np.cumsum(songs_by_artist) - songs_by_artist
+    song_rank_by_artist = np.empty(len(artist_codes), dtype=np.int64)
+    song_rank_by_artist[song_order[-has_artist.sum():]] = (
+        np.arange(has_artist.sum())
+        - np.repeat(group_starts, songs_by_artist)
     )
-    df_songs['Retained Songs'] = df_songs['Retained Songs'].clip(lower=2)
 
     # Retain songs based on the calculated retained songs for each artist
-    df_filtered = df_songs.groupby('Artist').apply(
-        lambda x: x.head(int(x['Retained Songs'].iloc[0]))
+    keep = np.zeros(len(artist_codes), dtype=bool)
+    keep[has_artist] = (
+        song_rank_by_artist[has_artist]
+        < retained_songs[artist_codes[has_artist]]
     )
+    return keep
 
-    # Drop the temporary columns
-    df_filtered = df_filtered.drop(
-        ['Retention Percentage', 'Retained Songs'], axis=1
-    )
+
+@with_backend
+def filter_songs_by_artist_popularity(df_songs: pd.DataFrame) -> pd.DataFrame:
+    """
+    Filter songs based on the variation in popularity for each artist,
+    keeping more songs the more popular an artist is.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        backend: 'auto', 'pandas' or 'arrow' (see select_backend).
+
+    Returns:
+        Filtered DataFrame with songs based on the artist popularity.
+    """
+
+    keep = get_artist_popularity_mask(df_songs)
+    df_filtered = df_songs[keep].sort_values(by='Artist', kind='stable')
 
     return df_filtered.reset_index(drop=True)
 
 
+# Limits for the swap search in get_target_runtime_mask: max number of swaps
+# evaluated at once (memory), max number of score-improving swaps (time) and
+# max songs on each side of a score-improving swap search (time)
+MAX_SWAP_MATRIX_SIZE = 2_000_000
+MAX_IMPROVING_SWAPS = 50
+MAX_IMPROVING_SWAP_CANDIDATES = 256
+
+
+def get_popularity_scores(df_songs: pd.DataFrame) -> np.ndarray:
+    """
+    Scores songs by 'Song Popularity', weighted by 'Artist Popularity'.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+
+    Returns:
+        np.ndarray[float]: Song scores (missing popularities count as 0).
+    """
+
+    song_popularity = df_songs['Song Popularity'].to_numpy(
+        dtype=float, na_value=0
+    )
+    artist_popularity = df_songs['Artist Popularity'].to_numpy(
+        dtype=float, na_value=0
+    )
+    return (song_popularity + 1) * (artist_popularity + 1) / 101
+
+
+def get_per_artist_limits(
+    artist_names: np.ndarray,
+    limit: Union[int, Dict[str, int], None],
+    default: int,
+) -> np.ndarray:
+    """
+    Expands a per-artist song count limit to an array (one value per artist).
+
+    Parameters:
+        artist_names (np.ndarray): Unique artist names.
+        limit (int | Dict[str, int] | None): Limit for every artist, or a dict
+            of artist name -> limit (other artists use default).
+        default (int): Limit used when limit is None or an artist isn't in it.
+
+    Returns:
+        np.ndarray[int]: Limit for each artist in artist_names.
+    """
+
+    if limit is None:
+        return np.full(len(artist_names), default)
+    if isinstance(limit, dict):
+        return np.array(
+            [limit.get(name, default) for name in artist_names], dtype=int
+        )
+    return np.full(len(artist_names), int(limit))
+
+
+def get_target_runtime_mask(
+    df_songs: pd.DataFrame,
+    target_duration_ms: int,
+    tolerance_ms: int = 120000,
+    min_songs_per_artist: Union[int, Dict[str, int]] = 0,
+    max_songs_per_artist: Union[int, Dict[str, int], None] = None,
+) -> np.ndarray:
+    """
+    Flags songs to keep so that the total 'Song Duration' hits a target
+    runtime, maximizing the total popularity score (see
+    get_popularity_scores).
+
+    This is a bounded knapsack problem, solved with greedy-with-repair:
+        1) Each artist's min_songs_per_artist highest scoring songs are kept.
+        2) Remaining songs are added greedily, by score per ms, while the
+           total stays under target_duration_ms + tolerance_ms.
+        3) If the total is still short of target_duration_ms - tolerance_ms,
+           the best single swap (kept song out, other song in) that lands the
+           total within tolerance is made.
+        4) Swaps that raise the total score while staying within tolerance
+           are then made, best swap first (up to MAX_IMPROVING_SWAPS).
+    Each swap search is vectorized over all candidate songs, so 10k
+    candidates take well under a second.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        target_duration_ms: Target total playlist runtime in ms.
+        tolerance_ms: Allowed difference from the target runtime in ms.
+        min_songs_per_artist: Min songs for every artist, or a dict of artist
+            name -> min songs (default is 0). Minimums are always kept, so
+            they must fit in the target runtime.
+        max_songs_per_artist: Max songs for every artist, or a dict of artist
+            name -> max songs (default is no max).
+
+    Returns:
+        np.ndarray[bool]: True for songs to keep.
+
+    Raises:
+        ValueError: If the min songs per artist alone exceed
+            target_duration_ms + tolerance_ms (Ex: 1 song per artist of a
+            large multi-festival lineup for a 4 hour playlist).
+    """
+
+    num_songs = len(df_songs)
+    keep = np.zeros(num_songs, dtype=bool)
+    lower_limit = target_duration_ms - tolerance_ms
+    upper_limit = target_duration_ms + tolerance_ms
+
+    # Songs without a duration or artist can't be selected
+    durations = df_songs['Song Duration'].to_numpy(dtype=float, na_value=0)
+    artist_codes, artist_names = pd.factorize(df_songs['Artist'])
+    is_candidate = (durations > 0) & (artist_codes >= 0)
+    if not is_candidate.any():
+        return keep
+    scores = get_popularity_scores(df_songs)
+
+    # Per-artist min/max song counts
+    num_artists = len(artist_names)
+    min_counts = get_per_artist_limits(
+        artist_names, min_songs_per_artist, default=0
+    )
+    max_counts = get_per_artist_limits(
+        artist_names, max_songs_per_artist, default=num_songs
+    )
+    max_counts = np.maximum(max_counts, min_counts)
+    artist_counts = np.zeros(num_artists, dtype=int)
+
+    # 1) Keep each artist's highest scoring songs, up to their min count
+    score_order = np.lexsort((-scores, artist_codes))
+    score_order = score_order[is_candidate[score_order]]
+    for song in score_order:
+        artist = artist_codes[song]
+        if artist_counts[artist] < min_counts[artist]:
+            keep[song] = True
+            artist_counts[artist] += 1
+    total_duration = durations[keep].sum()
+    if total_duration > upper_limit:
+        raise ValueError(
+            f"Min songs per artist already total {total_duration / 3.6e6:.1f}"
+            f" hours, over the {upper_limit / 3.6e6:.1f} hour max runtime. "
+            "Lower min_songs_per_artist or raise target_duration_ms."
+        )
+
+    # 2) Greedily add the songs with the best score per ms that still fit
+    density_order = np.argsort(
+        -scores / np.where(durations > 0, durations, np.inf), kind='stable'
+    )
+    for song in density_order:
+        artist = artist_codes[song]
+        if (
+            is_candidate[song]
+            and not keep[song]
+            and artist_counts[artist] < max_counts[artist]
+            and total_duration + durations[song] <= upper_limit
+        ):
+            keep[song] = True
+            artist_counts[artist] += 1
+            total_duration += durations[song]
+
+    def best_swap(require_gain: bool) -> Optional[Tuple[int, int]]:
+        """Finds the best (song out, song in) swap within tolerance."""
+
+        songs_in = np.flatnonzero(is_candidate & ~keep)
+        songs_out = np.flatnonzero(keep)
+        if not len(songs_in) or not len(songs_out):
+            return None
+
+        # Score-improving swaps pair high scoring songs left out with low
+        # scoring kept songs, so only those are searched
+        if require_gain:
+            if len(songs_in) > MAX_IMPROVING_SWAP_CANDIDATES:
+                songs_in = songs_in[np.argpartition(
+                    -scores[songs_in], MAX_IMPROVING_SWAP_CANDIDATES
+                )[:MAX_IMPROVING_SWAP_CANDIDATES]]
+            if len(songs_out) > MAX_IMPROVING_SWAP_CANDIDATES:
+                songs_out = songs_out[np.argpartition(
+                    scores[songs_out], MAX_IMPROVING_SWAP_CANDIDATES
+                )[:MAX_IMPROVING_SWAP_CANDIDATES]]
+
+        # Evaluate swaps as |out| x |in| arrays, in chunks of songs_out to
+        # bound memory use
+        best_swap_score, best = -np.inf, None
+        chunk_size = max(1, MAX_SWAP_MATRIX_SIZE // len(songs_in))
+        in_artists = artist_codes[songs_in][None, :]
+        for start in range(0, len(songs_out), chunk_size):
+            chunk_out = songs_out[start : start + chunk_size]
+            gains = scores[songs_in][None, :] - scores[chunk_out][:, None]
+            new_totals = (
+                total_duration
+                - durations[chunk_out][:, None]
+                + durations[songs_in][None, :]
+            )
+            out_artists = artist_codes[chunk_out][:, None]
+            is_allowed = (
+                (new_totals >= lower_limit)
+                & (new_totals <= upper_limit)
+                & (
+                    (in_artists == out_artists)
+                    | (
+                        (artist_counts[in_artists] < max_counts[in_artists])
+                        & (
+                            artist_counts[out_artists]
+                            > min_counts[out_artists]
+                        )
+                    )
+                )
+            )
+            if require_gain:
+                is_allowed &= gains > 1e-9
+            if not is_allowed.any():
+                continue
+
+            # Best gain; among equal gains, the total closest to the target
+            swap_scores = np.where(
+                is_allowed,
+                gains - np.abs(new_totals - target_duration_ms) / upper_limit,
+                -np.inf
+            )
+            out_index, in_index = np.unravel_index(
+                np.argmax(swap_scores), swap_scores.shape
+            )
+            if swap_scores[out_index, in_index] > best_swap_score:
+                best_swap_score = swap_scores[out_index, in_index]
+                best = (chunk_out[out_index], songs_in[in_index])
+
+        return best
+
+    def make_swap(song_out: int, song_in: int) -> None:
+        nonlocal total_duration
+        keep[song_out], keep[song_in] = False, True
+        artist_counts[artist_codes[song_out]] -= 1
+        artist_counts[artist_codes[song_in]] += 1
+        total_duration += durations[song_in] - durations[song_out]
+
+    # 3) Repair: swap songs to reach the target runtime if still short of it
+    if total_duration < lower_limit:
+        swap = best_swap(require_gain=False)
+        if swap is None:
+            print(
+                "Warning: Not enough songs to reach the target runtime. "
+                "Keeping as many songs as possible."
+            )
+            return keep
+        make_swap(*swap)
+
+    # 4) Improve the total score with swaps that stay within tolerance
+    for _ in range(MAX_IMPROVING_SWAPS):
+        swap = best_swap(require_gain=True)
+        if swap is None:
+            break
+        make_swap(*swap)
+
+    return keep
+
+
+@with_backend
+def select_songs_for_target_runtime(
+    df_songs: pd.DataFrame,
+    target_duration_ms: int,
+    tolerance_ms: int = 120000,
+    min_songs_per_artist: Union[int, Dict[str, int]] = 0,
+    max_songs_per_artist: Union[int, Dict[str, int], None] = None,
+) -> pd.DataFrame:
+    """
+    Selects songs so that the playlist hits a target total runtime, keeping
+    the most popular songs (weighted by artist popularity).
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        target_duration_ms: Target total playlist runtime in ms.
+            Ex: 4 * 60 * 60 * 1000 for a 4 hour playlist.
+        tolerance_ms: Allowed difference from the target runtime in ms
+            (default is 2 minutes).
+        min_songs_per_artist: Min songs for every artist, or a dict of artist
+            name -> min songs (default is 0). Minimums are always kept, so
+            they must fit in the target runtime.
+        max_songs_per_artist: Max songs for every artist, or a dict of artist
+            name -> max songs (default is no max).
+        backend: 'auto', 'pandas' or 'arrow' (see select_backend).
+
+    Returns:
+        DataFrame of selected songs, in their original order.
+
+    Raises:
+        ValueError: If the min songs per artist alone exceed the target
+            runtime plus tolerance.
+    """
+
+    keep = get_target_runtime_mask(
+        df_songs,
+        target_duration_ms,
+        tolerance_ms,
+        min_songs_per_artist,
+        max_songs_per_artist,
+    )
+    return df_songs[keep].reset_index(drop=True)
+
+
+GENRE_MATCH_MODES = ("exact", "family", "substring")
+
+
+class ArtistGenreIndex():
+    """
+    Inverted index of genre -> artists, built from 'Artist Genres'.
+
+    Supports include/exclude genre queries with three match modes:
+        exact     - 'house' matches 'House' only
+        family    - every word of the query is a word of the genre:
+                    'house' matches 'House', 'Tech House' and 'Deep House',
+                    but not 'Houseplant'
+        substring - 'hous' matches 'House' and 'Tech House'
+    Query results are cached per term, so repeated queries (Ex: GUI
+    re-filtering) are dictionary lookups.
+    """
+
+    def __init__(self, df_artists: pd.DataFrame) -> None:
+        """
+        Initialize the ArtistGenreIndex class.
+
+        Parameters:
+            df_artists (pd.DataFrame): DataFrame with 'Artist' and 'Artist
+                Genres' (List[str]) columns. Can be df_artists or df_songs.
+        """
+
+        df_unique_artists = df_artists.drop_duplicates(subset='Artist')
+        self.artist_names = df_unique_artists['Artist'].tolist()
+        self.genre_to_artists = {} # normalized genre -> set of artist ids
+        self.word_to_genres = {} # genre word -> set of normalized genres
+
+        for artist_id, genres in enumerate(df_unique_artists['Artist Genres']):
+            if genres is None or isinstance(genres, float): # Missing genres
+                continue
+            for genre in genres:
+                normalized_genre = " ".join(genre.casefold().split())
+                self.genre_to_artists.setdefault(
+                    normalized_genre, set()
+                ).add(artist_id)
+                for word in normalized_genre.split():
+                    self.word_to_genres.setdefault(word, set()).add(
+                        normalized_genre
+                    )
+
+        self._term_cache = {} # (term, match) -> frozenset of artist ids
+
+    def __len__(self) -> int:
+        """Number of distinct genres in the index."""
+        return len(self.genre_to_artists)
+
+    def match_genres(self, term: str, match: str = "family") -> List[str]:
+        """
+        Finds the indexed (normalized) genres matching a query term.
+
+        Parameters:
+            term (str): Genre query term. Ex: 'house'
+            match (str): 'exact', 'family' or 'substring'.
+
+        Returns:
+            List[str]: Matching normalized genres.
+        """
+
+        if match not in GENRE_MATCH_MODES:
+            raise ValueError(
+                f"match must be one of {GENRE_MATCH_MODES}, not {match!r}"
+            )
+        term = " ".join(term.casefold().split())
+
+        if match == "exact":
+            return [term] if term in self.genre_to_artists else []
+
+        if match == "family":
+            # Intersect the genres containing each word of the term
+            words = term.split()
+            if not words:
+                return []
+            genres = set(self.word_to_genres.get(words[0], ()))
+            for word in words[1:]:
+                genres &= self.word_to_genres.get(word, set())
+            # Multi-word terms must appear in order (Ex: 'hip hop')
+            return sorted(genre for genre in genres if term in genre)
+
+        return sorted(
+            genre for genre in self.genre_to_artists if term in genre
+        )
+
+    def _artist_ids_for_term(self, term: str, match: str) -> FrozenSet[int]:
+        """Artist ids for a single genre term (cached)."""
+
+        key = (term, match)
+        if key not in self._term_cache:
+            artist_ids = set()
+            for genre in self.match_genres(term, match):
+                artist_ids |= self.genre_to_artists[genre]
+            self._term_cache[key] = frozenset(artist_ids)
+        return self._term_cache[key]
+
+    def query(
+        self,
+        include_genres: Optional[Iterable[str]] = None,
+        exclude_genres: Optional[Iterable[str]] = None,
+        match: str = "family",
+    ) -> List[str]:
+        """
+        Finds artists with any of include_genres and none of exclude_genres.
+
+        Parameters:
+            include_genres (Iterable[str], optional): Genre terms to include.
+                If None or empty, all artists are included.
+            exclude_genres (Iterable[str], optional): Genre terms to exclude.
+            match (str): 'exact', 'family' or 'substring'.
+
+        Returns:
+            List[str]: Matching artist names, in index order.
+        """
+
+        if isinstance(include_genres, str):
+            include_genres = [include_genres]
+        if isinstance(exclude_genres, str):
+            exclude_genres = [exclude_genres]
+
+        if include_genres:
+            artist_ids = set()
+            for term in include_genres:
+                artist_ids |= self._artist_ids_for_term(term, match)
+        else:
+            artist_ids = set(range(len(self.artist_names)))
+
+        for term in exclude_genres or ():
+            artist_ids -= self._artist_ids_for_term(term, match)
+
+        return [self.artist_names[i] for i in sorted(artist_ids)]
+
+
+def parse_genre_query(genre_query: str) -> Tuple[List[str], List[str]]:
+    """
+    Parses a comma-separated genre query into include and exclude terms.
+    Terms starting with '-' are excluded.
+
+    Parameters:
+        genre_query (str): Ex: 'house, techno, -dubstep'
+
+    Returns:
+        List[str]: Genre terms to include. Ex: ['house', 'techno']
+        List[str]: Genre terms to exclude. Ex: ['dubstep']
+    """
+
+    include_genres, exclude_genres = [], []
+    for term in genre_query.split(","):
+        term = term.strip()
+        if term.startswith("-") and term[1:].strip():
+            exclude_genres.append(term[1:].strip())
+        elif term:
+            include_genres.append(term)
+    return include_genres, exclude_genres
+
+
+def get_genre_mask(
+    df_songs: pd.DataFrame,
+    include_genres: Optional[Iterable[str]] = None,
+    exclude_genres: Optional[Iterable[str]] = None,
+    match: str = "family",
+    genre_index: Optional[ArtistGenreIndex] = None,
+) -> np.ndarray:
+    """
+    Flags songs by artists with any of include_genres and none of
+    exclude_genres.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        include_genres: Genre terms to include (all artists if None).
+        exclude_genres: Genre terms to exclude.
+        match: 'exact', 'family' or 'substring'.
+        genre_index: Prebuilt index (built from df_songs if None).
+
+    Returns:
+        np.ndarray[bool]: True for songs to keep.
+    """
+
+    if genre_index is None:
+        genre_index = ArtistGenreIndex(df_songs)
+    matching_artists = genre_index.query(include_genres, exclude_genres, match)
+    return df_songs['Artist'].isin(matching_artists).to_numpy(dtype=bool)
+
+
+@with_backend
+def filter_songs_by_genre(
+    df_songs: pd.DataFrame,
+    include_genres: Optional[Iterable[str]] = None,
+    exclude_genres: Optional[Iterable[str]] = None,
+    match: str = "family",
+) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Keeps songs by artists with any of include_genres and none of
+    exclude_genres.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        include_genres: Genre terms to include (all artists if None).
+            Ex: ['house'] keeps House, Tech House and Deep House artists.
+        exclude_genres: Genre terms to exclude. Ex: ['dubstep']
+        match: 'exact', 'family' or 'substring' (see ArtistGenreIndex).
+        backend: 'auto', 'pandas' or 'arrow' (see select_backend).
+
+    Returns:
+        Filtered DataFrame.
+        List[str] of removed songs, if any.
+    """
+
+    keep = get_genre_mask(df_songs, include_genres, exclude_genres, match)
+    removed_songs = df_songs.loc[~keep, 'Song'].tolist()
+    return df_songs[keep].reset_index(drop=True), removed_songs
+
+
+# Song features used to compare songs (Ex: for smooth transitions)
+SONG_FEATURES = ['Tempo', 'Energy', 'Danceability', 'Speechiness']
+
+
+class FeatureRangeIndex():
+    """
+    Sorted per-feature index of song features, for fast range queries such as
+    Energy 0.6-0.9 and Tempo 120-130 BPM.
+
+    Each feature is sorted once. A range query is then two np.searchsorted
+    calls per feature, and multi-feature queries are combined as boolean mask
+    intersections, so re-filtering (Ex: in the GUI) stays fast even for large
+    multi-festival catalogs.
+    """
+
+    def __init__(
+        self,
+        df_songs: pd.DataFrame,
+        features: List[str] = SONG_FEATURES,
+    ) -> None:
+        """
+        Initialize the FeatureRangeIndex class.
+
+        Parameters:
+            df_songs (pd.DataFrame): DataFrame containing song information.
+            features (List[str]): Feature columns to index.
+        """
+
+        self.num_songs = len(df_songs)
+        self.sorted_positions = {} # feature -> song positions sorted by value
+        self.sorted_values = {} # feature -> sorted values (NaNs dropped)
+
+        for feature in features:
+            values = df_songs[feature].to_numpy(dtype=float, na_value=np.nan)
+            sorted_positions = np.argsort(values, kind='stable') # NaNs last
+            num_valid = np.count_nonzero(~np.isnan(values))
+            self.sorted_positions[feature] = sorted_positions[:num_valid]
+            self.sorted_values[feature] = values[sorted_positions[:num_valid]]
+
+    def query(
+        self,
+        feature_ranges: Dict[str, Tuple[Optional[float], Optional[float]]]
+    ) -> np.ndarray:
+        """
+        Finds songs within every given feature range (inclusive).
+
+        Parameters:
+            feature_ranges (Dict[str, Tuple[float, float]]): feature ->
+                (min, max). Either bound can be None for an open range.
+                Ex: {'Energy': (0.6, 0.9), 'Tempo': (120, 130)}
+
+        Returns:
+            np.ndarray[bool]: True for songs within all ranges. Songs missing
+                a queried feature are excluded.
+        """
+
+        mask = np.ones(self.num_songs, dtype=bool)
+        for feature, (min_value, max_value) in feature_ranges.items():
+            if feature not in self.sorted_values:
+                raise KeyError(f"Feature {feature!r} is not indexed.")
+            sorted_values = self.sorted_values[feature]
+            start = 0 if min_value is None else np.searchsorted(
+                sorted_values, min_value, side='left'
+            )
+            stop = len(sorted_values) if max_value is None else np.searchsorted(
+                sorted_values, max_value, side='right'
+            )
+            feature_mask = np.zeros(self.num_songs, dtype=bool)
+            feature_mask[self.sorted_positions[feature][start:stop]] = True
+            mask &= feature_mask
+        return mask
+
+
+def get_feature_range_mask(
+    df_songs: pd.DataFrame,
+    feature_ranges: Dict[str, Tuple[Optional[float], Optional[float]]],
+    feature_index: Optional[FeatureRangeIndex] = None,
+) -> np.ndarray:
+    """
+    Flags songs within every given feature range (inclusive).
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        feature_ranges: feature -> (min, max). Ex: {'Tempo': (120, 130)}
+        feature_index: FeatureRangeIndex built from df_songs, for repeated
+            queries on the same songs. Without one, the features are
+            compared directly, which is fastest for a single query.
+
+    Returns:
+        np.ndarray[bool]: True for songs to keep. Songs missing a queried
+            feature are excluded.
+    """
+
+    if feature_index is not None:
+        if feature_index.num_songs != len(df_songs):
+            raise ValueError(
+                f"feature_index has {feature_index.num_songs} songs, but "
+                f"df_songs has {len(df_songs)}. Build it from df_songs."
+            )
+        return feature_index.query(feature_ranges)
+
+    mask = np.ones(len(df_songs), dtype=bool)
+    for feature, (min_value, max_value) in feature_ranges.items():
+        values = df_songs[feature].to_numpy(dtype=float, na_value=np.nan)
+        with np.errstate(invalid='ignore'):
+            mask &= ~np.isnan(values)
+            if min_value is not None:
+                mask &= values >= min_value
+            if max_value is not None:
+                mask &= values <= max_value
+    return mask
+
+
+@with_backend
+def filter_songs_by_features(
+    df_songs: pd.DataFrame,
+    feature_ranges: Dict[str, Tuple[Optional[float], Optional[float]]],
+    feature_index: Optional[FeatureRangeIndex] = None,
+) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    Keeps songs whose features are all within the given ranges.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        feature_ranges: feature -> (min, max), inclusive. Either bound can be
+            None. Ex: {'Energy': (0.6, 0.9), 'Tempo': (120, 130)}
+        feature_index: FeatureRangeIndex built once from df_songs, for
+            re-filtering the same songs with different ranges (Ex: in the
+            GUI). Without one, the features are compared directly.
+        backend: 'auto', 'pandas' or 'arrow' (see select_backend).
+
+    Returns:
+        Filtered DataFrame.
+        List[str] of removed songs, if any.
+    """
+
+    keep = get_feature_range_mask(df_songs, feature_ranges, feature_index)
+    removed_songs = df_songs.loc[~keep, 'Song'].tolist()
+    return df_songs[keep].reset_index(drop=True), removed_songs
+
+
+# Above this many songs, songs are sequenced in chunks (see
+# get_smooth_transition_order), bounding the n x n distance matrix size
+MAX_SEQUENCING_CHUNK_SIZE = 2500
+
+
+def get_feature_matrix(
+    df_songs: pd.DataFrame,
+    features: List[str] = SONG_FEATURES,
+) -> np.ndarray:
+    """
+    Creates a standardized song feature matrix (one row per song).
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        features: Feature columns to include.
+
+    Returns:
+        np.ndarray[float] of shape (len(df_songs), len(features)) containing
+            z-scores, so each feature weighs the same regardless of its units
+            (Ex: Tempo in BPM vs Energy in 0-1). Missing values are set to the
+            feature mean (z-score of 0).
+    """
+
+    feature_matrix = np.column_stack([
+        df_songs[feature].to_numpy(dtype=float, na_value=np.nan)
+        for feature in features
+    ]) if len(df_songs) else np.empty((0, len(features)))
+
+    with np.errstate(invalid='ignore'):
+        means = np.nanmean(feature_matrix, axis=0)
+        stds = np.nanstd(feature_matrix, axis=0)
+    stds = np.where(stds > 0, stds, 1)
+    feature_matrix = (feature_matrix - means) / stds
+    return np.nan_to_num(feature_matrix, nan=0.0)
+
+
+def get_distance_matrix(feature_matrix: np.ndarray) -> np.ndarray:
+    """Pairwise Euclidean distances between rows of a feature matrix."""
+
+    squared_norms = np.einsum('ij,ij->i', feature_matrix, feature_matrix)
+    squared_distances = (
+        squared_norms[:, None] + squared_norms[None, :]
+        - 2 * feature_matrix @ feature_matrix.T
+    )
+    return np.sqrt(np.maximum(squared_distances, 0))
+
+
+def get_path_order(
+    distances: np.ndarray,
+    start: int,
+    max_passes: int = 50,
+) -> np.ndarray:
+    """
+    Orders songs with a short total transition distance (an open traveling
+    salesman path) using nearest-neighbor followed by 2-opt.
+
+    Parameters:
+        distances (np.ndarray): n x n song transition costs.
+        start (int): Song to start the path with.
+        max_passes (int): Max 2-opt improvement passes over the path.
+
+    Returns:
+        np.ndarray[int]: Song order (a permutation of range(n)).
+    """
+
+    num_songs = len(distances)
+    if num_songs <= 2:
+        return np.array([start] + [i for i in range(num_songs) if i != start])
+
+    # Nearest-neighbor: always transition to the closest unvisited song
+    path = np.empty(num_songs, dtype=np.int64)
+    path[0] = start
+    is_visited = np.zeros(num_songs, dtype=bool)
+    is_visited[start] = True
+    for i in range(1, num_songs):
+        next_distances = np.where(is_visited, np.inf, distances[path[i - 1]])
+        path[i] = np.argmin(next_distances)
+        is_visited[path[i]] = True
+
+    # 2-opt on the open path. A dummy song with zero distance to every song
+    # closes the path into a cycle, so both path ends can also move.
+    extended_distances = np.zeros((num_songs + 1, num_songs + 1))
+    extended_distances[:num_songs, :num_songs] = distances
+    tour = np.append(path, num_songs) # Dummy song last
+
+    for _ in range(max_passes):
+        improved = False
+        for i in range(1, num_songs):
+            # Reversing tour[i:j+1] replaces edges (a, b) and (c, d) with
+            # (a, c) and (b, d). Evaluate every j at once.
+            a, b = tour[i - 1], tour[i]
+            c = tour[i + 1 :]
+            d = np.append(tour[i + 2 :], tour[0])
+            gains = (
+                extended_distances[a, b] + extended_distances[c, d]
+                - extended_distances[a, c] - extended_distances[b, d]
+            )
+            best_j = np.argmax(gains)
+            if gains[best_j] > 1e-9:
+                j = i + 1 + best_j
+                tour[i : j + 1] = tour[i : j + 1][::-1]
+                improved = True
+        if not improved:
+            break
+
+    # Rotate the cycle so it starts right after the dummy song
+    dummy_position = np.flatnonzero(tour == num_songs)[0]
+    return np.roll(tour, -dummy_position)[1:]
+
+
+def get_smooth_transition_order(
+    df_songs: pd.DataFrame,
+    features: List[str] = SONG_FEATURES,
+    avoid_same_artist: bool = True,
+    max_chunk_size: int = MAX_SEQUENCING_CHUNK_SIZE,
+) -> np.ndarray:
+    """
+    Orders songs so that consecutive songs have similar features.
+
+    Songs are points in (standardized) feature space and the order is an
+    approximately shortest path through all of them, starting from the
+    lowest Energy song. Back-to-back songs by the same artist get a distance
+    penalty so they only occur when unavoidable.
+
+    Beyond max_chunk_size songs, songs are sorted along their first principal
+    component and split into contiguous chunks, each ordered separately, with
+    each chunk starting at the song closest to the end of the previous chunk.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        features: Feature columns to compare songs by.
+        avoid_same_artist: Whether to avoid same-artist back-to-back songs.
+        max_chunk_size: Max songs ordered with a full distance matrix.
+
+    Returns:
+        np.ndarray[int]: Positions of songs in df_songs, in playlist order.
+    """
+
+    num_songs = len(df_songs)
+    if num_songs == 0:
+        return np.arange(0)
+
+    feature_matrix = get_feature_matrix(df_songs, features)
+    artist_codes, _ = pd.factorize(df_songs['Artist'])
+
+    # Split large inputs into chunks of songs that are near in feature space
+    if num_songs > max_chunk_size:
+        _, _, principal_axes = np.linalg.svd(feature_matrix, full_matrices=False)
+        chunk_order = np.argsort(feature_matrix @ principal_axes[0])
+        num_chunks = -(-num_songs // max_chunk_size) # Ceiling division
+        chunks = np.array_split(chunk_order, num_chunks)
+    else:
+        chunks = [np.arange(num_songs)]
+
+    order = []
+    for chunk in chunks:
+        distances = get_distance_matrix(feature_matrix[chunk])
+        if avoid_same_artist:
+            chunk_artists = artist_codes[chunk]
+            same_artist_penalty = distances.max() + 1
+            distances += same_artist_penalty * (
+                chunk_artists[:, None] == chunk_artists[None, :]
+            )
+
+        # Start at the lowest Energy song, or for later chunks, the song
+        # closest to where the previous chunk ended
+        if order:
+            start_distances = np.linalg.norm(
+                feature_matrix[chunk] - feature_matrix[order[-1]], axis=1
+            )
+            if avoid_same_artist:
+                start_distances += same_artist_penalty * (
+                    artist_codes[chunk] == artist_codes[order[-1]]
+                )
+            start = np.argmin(start_distances)
+        elif 'Energy' in features:
+            start = np.argmin(feature_matrix[chunk, features.index('Energy')])
+        else:
+            start = 0
+
+        order.extend(chunk[get_path_order(distances, start)])
+
+    return np.array(order)
+
+
+@with_backend
+def order_songs_for_smooth_transitions(
+    df_songs: pd.DataFrame,
+    features: List[str] = SONG_FEATURES,
+    avoid_same_artist: bool = True,
+) -> pd.DataFrame:
+    """
+    Reorders songs so the playlist transitions smoothly, with no big jumps in
+    Tempo, Energy, Danceability or Speechiness between consecutive songs.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        features: Feature columns to compare songs by.
+        avoid_same_artist: Whether to avoid same-artist back-to-back songs.
+        backend: 'auto', 'pandas' or 'arrow' (see select_backend).
+
+    Returns:
+        Reordered DataFrame.
+    """
+
+    order = get_smooth_transition_order(df_songs, features, avoid_same_artist)
+    return df_songs.take(order).reset_index(drop=True)
+
+
+def get_mmr_selection(
+    feature_matrix: np.ndarray,
+    relevance: np.ndarray,
+    num_select: int,
+    diversity: float = 0.3,
+) -> np.ndarray:
+    """
+    Selects items by maximal marginal relevance (MMR): each pick maximizes
+        (1 - diversity) * relevance - diversity * similarity
+    where similarity is to the most similar already-selected item, and
+    similarity = 1 / (1 + feature-space distance), in (0, 1].
+
+    Parameters:
+        feature_matrix (np.ndarray): Item feature vectors (one row per item).
+        relevance (np.ndarray): Item relevance, scaled to 0-1.
+        num_select (int): Number of items to select.
+        diversity (float): 0 selects purely by relevance; 1 purely spreads
+            items out in feature space.
+
+    Returns:
+        np.ndarray[int]: Positions of selected items, in selection order.
+    """
+
+    num_items = len(relevance)
+    num_select = min(int(num_select), num_items)
+    selected = np.empty(num_select, dtype=np.int64)
+    max_similarity = np.zeros(num_items, dtype=np.float32)
+
+    # Distances to each pick come from one matrix-vector product per step:
+    # |a - b|^2 = |a|^2 + |b|^2 - 2 a.b, with squared norms computed once
+    feature_matrix = np.ascontiguousarray(feature_matrix, dtype=np.float32)
+    squared_norms = np.einsum('ij,ij->i', feature_matrix, feature_matrix)
+    weighted_relevance = ((1 - diversity) * relevance).astype(np.float32)
+    mmr_scores = np.empty(num_items, dtype=np.float32)
+    squared_distances = np.empty(num_items, dtype=np.float32)
+
+    for i in range(num_select):
+        np.multiply(max_similarity, -diversity, out=mmr_scores)
+        mmr_scores += weighted_relevance
+        pick = np.argmax(mmr_scores)
+        selected[i] = pick
+        weighted_relevance[pick] = -np.inf # Not selectable again
+
+        # Update each item's similarity to its most similar selected item
+        np.matmul(feature_matrix, feature_matrix[pick], out=squared_distances)
+        squared_distances *= -2
+        squared_distances += squared_norms
+        squared_distances += squared_norms[pick]
+        np.maximum(squared_distances, 0, out=squared_distances)
+        np.maximum(
+            max_similarity,
+            1 / (1 + np.sqrt(squared_distances)),
+            out=max_similarity
+        )
+
+    return selected
+
+
+def get_mmr_mask(
+    df_songs: pd.DataFrame,
+    num_songs: Optional[int] = None,
+    songs_per_artist: Optional[int] = None,
+    diversity: float = 0.3,
+    features: List[str] = SONG_FEATURES,
+) -> np.ndarray:
+    """
+    Flags songs selected by maximal marginal relevance, trading off 'Song
+    Popularity' against feature-space distance to songs already selected.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        num_songs: Select this many songs from the whole playlist.
+        songs_per_artist: Otherwise, select this many songs per artist.
+            If both are None, each artist keeps as many songs as
+            filter_songs_by_artist_popularity would keep.
+        diversity: 0 selects purely by popularity; higher values favor songs
+            that sound different from those already selected.
+        features: Feature columns to compare songs by.
+
+    Returns:
+        np.ndarray[bool]: True for songs to keep.
+    """
+
+    keep = np.zeros(len(df_songs), dtype=bool)
+    if not len(df_songs):
+        return keep
+    feature_matrix = get_feature_matrix(df_songs, features)
+    relevance = df_songs['Song Popularity'].to_numpy(
+        dtype=float, na_value=0
+    ) / 100
+
+    # Global selection across all songs
+    if num_songs is not None:
+        keep[get_mmr_selection(
+            feature_matrix, relevance, num_songs, diversity
+        )] = True
+        return keep
+
+    # Selection within each artist's songs
+    if songs_per_artist is not None:
+        artist_codes, _ = pd.factorize(df_songs['Artist'])
+        retained_songs = np.full(artist_codes.max() + 1, songs_per_artist)
+    else:
+        artist_codes, retained_songs = get_retained_song_counts(df_songs)
+
+    song_order = np.argsort(artist_codes, kind='stable')
+    artist_starts = np.searchsorted(
+        artist_codes[song_order], np.arange(len(retained_songs) + 1)
+    )
+    for artist_code, num_retained in enumerate(retained_songs):
+        artist_songs = song_order[
+            artist_starts[artist_code] : artist_starts[artist_code + 1]
+        ]
+        keep[artist_songs[get_mmr_selection(
+            feature_matrix[artist_songs],
+            relevance[artist_songs],
+            num_retained,
+            diversity,
+        )]] = True
+
+    return keep
+
+
+@with_backend
+def select_songs_by_mmr(
+    df_songs: pd.DataFrame,
+    num_songs: Optional[int] = None,
+    songs_per_artist: Optional[int] = None,
+    diversity: float = 0.3,
+) -> pd.DataFrame:
+    """
+    Alternative to filter_songs_by_artist_popularity that avoids keeping
+    several near-identical songs. Songs are selected by maximal marginal
+    relevance: popular songs are favored, but each pick is penalized for
+    being similar (in Tempo, Energy, Danceability and Speechiness) to songs
+    already selected.
+
+    Parameters:
+        df_songs: Pandas DataFrame containing song information.
+        num_songs: Select this many songs from the whole playlist.
+        songs_per_artist: Otherwise, select this many songs per artist.
+            If both are None, each artist keeps as many songs as
+            filter_songs_by_artist_popularity would keep.
+        diversity: 0 selects purely by popularity; higher values favor songs
+            that sound different from those already selected (default 0.3).
+        backend: 'auto', 'pandas' or 'arrow' (see select_backend).
+
+    Returns:
+        DataFrame of selected songs, in their original order.
+    """
+
+    keep = get_mmr_mask(df_songs, num_songs, songs_per_artist, diversity)
+    return df_songs[keep].reset_index(drop=True)
+
+
+@with_backend
 def create_df_playlist_artists(
     df_lineup_artists: pd.DataFrame,
     df_new_artists: pd.DataFrame,
@@ -137,15 +1723,16 @@ def create_df_playlist_artists(
         df_lineup_artists (pd.DataFrame): df containing the lineup artists
         df_new_artists (pd.DataFrame): df containing newly entered artists
         selected_artist_names (List[str]): List of selected artists from lineup
+        backend (str): 'auto', 'pandas' or 'arrow' (see select_backend)
         
     Returns
         pd.DataFrame: df combining both selected lineup and new artists
     """
 
     # Reduce df of lineup artists to a df of selected artists only
-    df_selected_artists = df_lineup_artists[df_lineup_artists['Artist'].apply(
-        lambda x: x in selected_artist_names
-    )]
+    df_selected_artists = df_lineup_artists[
+        df_lineup_artists['Artist'].isin(selected_artist_names)
+    ]
 
     # Combine both DataFrames (selected and newly-entered artists)
     df_playlist_artists = pd.concat(
@@ -164,6 +1751,356 @@ def create_df_playlist_artists(
     return df_playlist_artists
 
 
+class PipelineStage(NamedTuple):
+    """
+    A filter stage of a PlaylistModsPipeline.
+
+    mask_func receives a DataFrame holding only the stage's columns, for the
+    songs still in the playlist (in their current order), and returns a
+    boolean array-like of songs to keep. sort_by is an optional list of
+    (column, ascending) pairs the songs are ordered by after the stage.
+    """
+
+    name: str
+    mask_func: Callable[[pd.DataFrame], Any]
+    columns: List[str]
+    sort_by: List[Tuple[str, bool]]
+
+
+class StageReport(NamedTuple):
+    """Execution report for a single step of a PlaylistModsPipeline."""
+
+    name: str
+    removed_songs: List[str]
+    seconds: float
+
+
+def get_sort_key(values: np.ndarray, ascending: bool = True) -> np.ndarray:
+    """
+    Converts values to integer sort keys matching pandas sort_values ordering,
+    with missing values sorted last regardless of sort direction.
+
+    Parameters:
+        values (np.ndarray): Values of the column being sorted.
+        ascending (bool): Sort direction.
+
+    Returns:
+        np.ndarray[int]: Keys where a smaller key sorts first.
+    """
+
+    codes, uniques = pd.factorize(values, sort=True)
+    if not ascending:
+        codes = np.where(codes >= 0, len(uniques) - 1 - codes, codes)
+    return np.where(codes >= 0, codes, len(uniques))
+
+
+class PlaylistModsPipeline():
+    """
+    A lazy, fused version of the playlist_mods filters.
+
+    Stages are recorded when their methods are called, then planned and
+    executed in a single pass by execute(). Instead of copying, re-sorting
+    and re-indexing the full df_songs after every filter, the pipeline tracks
+    an array of row positions:
+        - Each stage gathers only the columns it needs.
+        - Consecutive sorts are merged into one lexsort, and sorts the songs
+          already satisfy are dropped.
+        - The full DataFrame is taken and re-indexed once, at the end.
+
+    Results match calling the standalone functions one after another.
+
+    Ex:
+        df_songs, report = (
+            PlaylistModsPipeline()
+            .remove_duplicates()
+            .remove_remixes_and_edits()
+            .filter_songs_by_artist_popularity()
+            .execute(df_songs)
+        )
+
+    Custom filters can be added with add_filter() without an extra full pass.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the PlaylistModsPipeline class with no stages."""
+        self.stages = []
+
+    def add_filter(
+        self,
+        name: str,
+        mask_func: Callable[[pd.DataFrame], Any],
+        columns: List[str],
+        sort_by: Optional[List[Tuple[str, bool]]] = None,
+    ) -> "PlaylistModsPipeline":
+        """
+        Adds a filter stage to the pipeline.
+
+        Parameters:
+            name (str): Stage name used in the plan and report.
+            mask_func (Callable): Function taking a DataFrame of the stage's
+                columns and returning a boolean array of songs to keep.
+            columns (List[str]): Columns needed by mask_func. Columns missing
+                from df_songs are skipped (for optional columns).
+            sort_by (List[Tuple[str, bool]], optional): (column, ascending)
+                pairs to order songs by after this stage.
+
+        Returns:
+            PlaylistModsPipeline: self, so that calls can be chained.
+        """
+
+        self.stages.append(
+            PipelineStage(name, mask_func, list(columns), list(sort_by or []))
+        )
+        return self
+
+    def remove_duplicates(self) -> "PlaylistModsPipeline":
+        """Adds a stage equivalent to remove_duplicates."""
+        return self.add_filter(
+            "remove_duplicates",
+            lambda df: ~df['Song uri'].duplicated(keep='first').to_numpy(),
+            ['Song uri'],
+        )
+
+    def remove_near_duplicates(
+        self,
+        duration_tolerance_ms: int = 5000
+    ) -> "PlaylistModsPipeline":
+        """Adds a stage equivalent to remove_near_duplicates."""
+        return self.add_filter(
+            "remove_near_duplicates",
+            partial(
+                get_near_duplicate_mask,
+                duration_tolerance_ms=duration_tolerance_ms
+            ),
+            ['Song', 'Artist', 'Song Artists', 'Song Duration', 'Song isrc'],
+        )
+
+    def remove_remixes_and_edits(self) -> "PlaylistModsPipeline":
+        """Adds a stage equivalent to remove_remixes_and_edits."""
+        return self.add_filter(
+            "remove_remixes_and_edits",
+            get_remix_and_edit_mask,
+            ['Song', 'Song Popularity'],
+            sort_by=[('Artist', True)],
+        )
+
+    def filter_songs_by_artist_popularity(self) -> "PlaylistModsPipeline":
+        """Adds a stage equivalent to filter_songs_by_artist_popularity."""
+        return self.add_filter(
+            "filter_songs_by_artist_popularity",
+            get_artist_popularity_mask,
+            ['Artist', 'Artist Popularity'],
+            sort_by=[('Artist', True)],
+        )
+
+    def select_songs_for_target_runtime(
+        self,
+        target_duration_ms: int,
+        tolerance_ms: int = 120000,
+        min_songs_per_artist: Union[int, Dict[str, int]] = 0,
+        max_songs_per_artist: Union[int, Dict[str, int], None] = None,
+    ) -> "PlaylistModsPipeline":
+        """Adds a stage equivalent to select_songs_for_target_runtime."""
+        return self.add_filter(
+            "select_songs_for_target_runtime",
+            partial(
+                get_target_runtime_mask,
+                target_duration_ms=target_duration_ms,
+                tolerance_ms=tolerance_ms,
+                min_songs_per_artist=min_songs_per_artist,
+                max_songs_per_artist=max_songs_per_artist,
+            ),
+            ['Artist', 'Song Popularity', 'Artist Popularity', 'Song Duration'],
+        )
+
+    def filter_songs_by_genre(
+        self,
+        include_genres: Optional[Iterable[str]] = None,
+        exclude_genres: Optional[Iterable[str]] = None,
+        match: str = "family",
+        genre_index: Optional[ArtistGenreIndex] = None,
+    ) -> "PlaylistModsPipeline":
+        """
+        Adds a stage equivalent to filter_songs_by_genre. A prebuilt
+        genre_index (Ex: from the lineup artists) can be reused.
+        """
+        return self.add_filter(
+            "filter_songs_by_genre",
+            partial(
+                get_genre_mask,
+                include_genres=include_genres,
+                exclude_genres=exclude_genres,
+                match=match,
+                genre_index=genre_index,
+            ),
+            ['Artist', 'Artist Genres'],
+        )
+
+    def filter_songs_by_features(
+        self,
+        feature_ranges: Dict[str, Tuple[Optional[float], Optional[float]]],
+    ) -> "PlaylistModsPipeline":
+        """Adds a stage equivalent to filter_songs_by_features."""
+        return self.add_filter(
+            "filter_songs_by_features",
+            partial(get_feature_range_mask, feature_ranges=feature_ranges),
+            list(feature_ranges),
+        )
+
+    def select_songs_by_mmr(
+        self,
+        num_songs: Optional[int] = None,
+        songs_per_artist: Optional[int] = None,
+        diversity: float = 0.3,
+    ) -> "PlaylistModsPipeline":
+        """Adds a stage equivalent to select_songs_by_mmr."""
+        return self.add_filter(
+            "select_songs_by_mmr",
+            partial(
+                get_mmr_mask,
+                num_songs=num_songs,
+                songs_per_artist=songs_per_artist,
+                diversity=diversity,
+            ),
+            ['Artist', 'Song Popularity', 'Artist Popularity'] + SONG_FEATURES,
+        )
+
+    def plan(self) -> List[Tuple[str, Any]]:
+        """
+        Plans execution of the recorded stages.
+
+        Returns:
+            List[Tuple[str, Any]]: Execution steps, each one of:
+                ('filter', PipelineStage)
+                ('sort', List[Tuple[str, bool]]) - merged sort keys
+                ('take', None) - single final take and index reset
+        """
+
+        steps = []
+        pending_sort = [] # Sort keys not yet applied
+        current_sort = [] # Sort keys the songs are currently ordered by
+
+        def flush_pending_sort() -> None:
+            nonlocal pending_sort, current_sort
+            # Filters preserve relative order, so a sort that is a prefix of
+            # the current ordering is redundant
+            if pending_sort and pending_sort != current_sort[:len(pending_sort)]:
+                steps.append(('sort', pending_sort))
+                current_sort = pending_sort
+            pending_sort = []
+
+        for stage in self.stages:
+            # Every filter sees songs in their up-to-date order
+            flush_pending_sort()
+            steps.append(('filter', stage))
+
+            # Merge with any pending sort: a stable sort by new keys applied
+            # after a sort by old keys is one sort by (new keys, old keys)
+            if stage.sort_by:
+                new_columns = {column for column, _ in stage.sort_by}
+                pending_sort = stage.sort_by + [
+                    key for key in pending_sort if key[0] not in new_columns
+                ]
+
+        flush_pending_sort()
+        steps.append(('take', None))
+        return steps
+
+    def execute(
+        self,
+        df_songs: pd.DataFrame,
+        backend: str = "auto",
+        profiler: Optional[Any] = None,
+    ) -> Tuple[pd.DataFrame, List[StageReport]]:
+        """
+        Executes the planned stages on df_songs. df_songs is not modified.
+
+        Parameters:
+            df_songs: Pandas (or Polars) DataFrame containing song information.
+            backend: 'auto', 'pandas' or 'arrow' (see select_backend).
+            profiler: Optional run_profiler.RunProfiler, recording each
+                step's time and memory use as a stage.
+
+        Returns:
+            Filtered (and sorted) DataFrame, in df_songs' backend.
+            List[StageReport] with removed songs and timing for each step.
+        """
+
+        input_df_songs = df_songs
+        df_songs = convert_df_backend(
+            df_songs, select_backend(df_songs, backend)
+        )
+        positions = np.arange(len(df_songs)) # Rows still in the playlist
+        song_names = df_songs['Song'].to_numpy()
+        report = []
+
+        for step, step_info in self.plan():
+            if step == 'filter':
+                name = step_info.name
+            elif step == 'sort':
+                name = "sort by " + ", ".join(c for c, _ in step_info)
+            else:
+                name = "take"
+            step_context = (
+                nullcontext() if profiler is None else profiler.stage(name)
+            )
+            with step_context:
+                positions, df_songs, removed_songs, seconds = (
+                    self.execute_step(
+                        step, step_info, df_songs, positions, song_names
+                    )
+                )
+            report.append(StageReport(name, removed_songs, seconds))
+
+        # Return songs in the caller's backend, whichever backend ran
+        df_songs = convert_result_backend(df_songs, input_df_songs)
+
+        return df_songs, report
+
+    @staticmethod
+    def execute_step(
+        step: str,
+        step_info: Any,
+        df_songs: pd.DataFrame,
+        positions: np.ndarray,
+        song_names: np.ndarray,
+    ) -> Tuple[np.ndarray, pd.DataFrame, List[str], float]:
+        """
+        Executes one planned step (see plan).
+
+        Returns:
+            Tuple: Updated positions and df_songs, removed song names and the
+                step's time in seconds.
+        """
+
+        start_time = time.perf_counter()
+        removed_songs = []
+
+        if step == 'filter':
+            # Gather only the stage's columns for the remaining songs
+            columns = [c for c in step_info.columns if c in df_songs]
+            df_stage = df_songs[columns].take(positions)
+            df_stage.index = pd.RangeIndex(len(df_stage))
+            keep = np.asarray(step_info.mask_func(df_stage), dtype=bool)
+            removed_songs = song_names[positions[~keep]].tolist()
+            positions = positions[keep]
+
+        elif step == 'sort':
+            # np.lexsort is stable and uses the last key as primary key
+            sort_keys = [
+                get_sort_key(df_songs[column].to_numpy()[positions], asc)
+                for column, asc in reversed(step_info)
+            ]
+            positions = positions[np.lexsort(sort_keys)]
+
+        else: # 'take'
+            df_songs = df_songs.take(positions).reset_index(drop=True)
+
+        return (
+            positions, df_songs, removed_songs, time.perf_counter() - start_time
+        )
+
+
 # Test the functions in this file if executed directly
 if __name__ == '__main__':
     df_test1 = pd.read_csv(
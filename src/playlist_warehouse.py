@@ -0,0 +1,433 @@
+###############################################################################
+#
+# This file contains a SQLite analytics warehouse over all created playlists
+# (output/created_playlists/<playlist_name>Summary_Created<date>/
+# playlist_songs.parquet or .csv), for questions spanning many festivals:
+#   - PlaylistWarehouse ingests new playlist folders and answers queries,
+#      such as artist overlap between festivals, genre share over time and
+#      feature distributions per festival
+#   - parse_playlist_folder_name gets a playlist's name and creation date
+#      from its output folder name
+#
+###############################################################################
+
+import os
+import re
+import sqlite3
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# Relative when imported as src.playlist_warehouse, by name when run from src
+try:
+    from .playlist_io import find_song_file, load_df
+except ImportError:
+    from playlist_io import find_song_file, load_df
+
+
+CREATED_PLAYLISTS_DIR = "output/created_playlists"
+WAREHOUSE_PATH = "output/playlist_warehouse.db"
+FEATURES = ["Tempo", "Danceability", "Energy", "Speechiness"]
+
+# Song columns stored in the warehouse: playlist_songs column -> warehouse
+# column. Columns missing from older .csv files are stored as NULL.
+SONG_COLUMNS = {
+    "Song": "song",
+    "Artist": "artist",
+    "Song Popularity": "song_popularity",
+    "Danceability": "danceability",
+    "Energy": "energy",
+    "Tempo": "tempo",
+    "Speechiness": "speechiness",
+    "Song Duration": "song_duration",
+    "Artist Popularity": "artist_popularity",
+    "Artist uri": "artist_uri",
+    "Song uri": "song_uri",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS playlists (
+    playlist_id INTEGER PRIMARY KEY,
+    folder_name TEXT NOT NULL UNIQUE,
+    playlist_name TEXT NOT NULL,
+    created_on TEXT, -- YYYY-MM-DD
+    num_songs INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS songs (
+    playlist_id INTEGER NOT NULL REFERENCES playlists(playlist_id),
+    song TEXT,
+    artist TEXT,
+    song_popularity INTEGER,
+    danceability REAL,
+    energy REAL,
+    tempo REAL,
+    speechiness REAL,
+    song_duration INTEGER,
+    artist_popularity INTEGER,
+    artist_uri TEXT,
+    song_uri TEXT
+);
+CREATE TABLE IF NOT EXISTS playlist_artists (
+    playlist_id INTEGER NOT NULL REFERENCES playlists(playlist_id),
+    artist TEXT NOT NULL,
+    PRIMARY KEY (artist, playlist_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS artist_genres (
+    playlist_id INTEGER NOT NULL REFERENCES playlists(playlist_id),
+    artist TEXT NOT NULL,
+    genre TEXT NOT NULL,
+    PRIMARY KEY (genre, playlist_id, artist)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS songs_playlist_id ON songs(playlist_id);
+CREATE INDEX IF NOT EXISTS songs_artist ON songs(artist);
+CREATE INDEX IF NOT EXISTS songs_song_uri ON songs(song_uri);
+CREATE INDEX IF NOT EXISTS playlist_artists_playlist_id
+    ON playlist_artists(playlist_id);
+CREATE INDEX IF NOT EXISTS artist_genres_playlist_id
+    ON artist_genres(playlist_id);
+"""
+
+
+class PlaylistWarehouse():
+    """
+    SQLite warehouse of all created playlists' songs, artists and genres.
+
+    Each playlist folder is ingested once. ingest() only loads folders not
+    yet in the warehouse, so it can be re-run after every new playlist.
+    Distinct artists and artist genres are stored per playlist, with
+    indexes, so cross-playlist queries don't scan every song.
+    """
+
+    def __init__(self, db_path: str = WAREHOUSE_PATH) -> None:
+        """
+        Initialize the PlaylistWarehouse class, creating the database file
+        and tables if they don't exist yet.
+
+        Parameters:
+            db_path (str): Path of the SQLite database file (":memory:" for
+                an in-memory warehouse).
+        """
+
+        if db_path != ":memory:" and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        self.connection.close()
+
+    def __enter__(self) -> "PlaylistWarehouse":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def ingest(
+        self,
+        created_playlists_dir: str = CREATED_PLAYLISTS_DIR
+    ) -> List[str]:
+        """
+        Loads every playlist folder not yet in the warehouse.
+
+        Parameters:
+            created_playlists_dir (str): Folder containing one output folder
+                per created playlist.
+
+        Returns:
+            List[str]: Names of the newly ingested folders.
+        """
+
+        ingested_folders = {
+            folder_name for (folder_name,) in self.connection.execute(
+                "SELECT folder_name FROM playlists"
+            )
+        }
+        song_files = {
+            folder_name: find_song_file(
+                os.path.join(created_playlists_dir, folder_name)
+            )
+            for folder_name in sorted(os.listdir(created_playlists_dir))
+            if folder_name not in ingested_folders
+        }
+        new_folders = [
+            folder_name
+            for folder_name, song_file in song_files.items()
+            if song_file is not None
+        ]
+
+        for folder_name in new_folders:
+            self.ingest_playlist(folder_name, load_df(song_files[folder_name]))
+
+        return new_folders
+
+    def ingest_playlist(self, folder_name: str, df_songs: pd.DataFrame) -> int:
+        """
+        Loads one playlist's songs, in a single transaction.
+
+        Parameters:
+            folder_name (str): Playlist output folder name (unique key).
+            df_songs (pd.DataFrame): Playlist songs, as loaded by
+                playlist_io.load_df ('Artist Genres' as lists).
+
+        Returns:
+            int: playlist_id of the ingested playlist.
+        """
+
+        playlist_name, created_on = parse_playlist_folder_name(folder_name)
+        df_warehouse_songs = df_songs.reindex(columns=list(SONG_COLUMNS))
+        df_warehouse_songs = df_warehouse_songs.astype(object).where(
+            df_warehouse_songs.notna(), None
+        )
+
+        # Distinct artists and (artist, genre) pairs of the playlist
+        df_artists = df_songs.drop_duplicates("Artist")
+        artist_genres = {
+            (artist, genre)
+            for artist, genres in zip(
+                df_artists["Artist"],
+                df_artists.get(
+                    "Artist Genres", pd.Series([[]] * len(df_artists))
+                )
+            )
+            for genre in genres
+            if isinstance(genre, str) and genre
+        }
+
+        with self.connection:
+            playlist_id = self.connection.execute(
+                "INSERT INTO playlists (folder_name, playlist_name, "
+                "created_on, num_songs, ingested_at) VALUES (?, ?, ?, ?, ?)",
+                (
+                    folder_name,
+                    playlist_name,
+                    created_on,
+                    len(df_songs),
+                    datetime.now().isoformat(timespec="seconds"),
+                )
+            ).lastrowid
+            self.connection.executemany(
+                f"INSERT INTO songs (playlist_id, "
+                f"{', '.join(SONG_COLUMNS.values())}) VALUES "
+                f"({', '.join(['?'] * (len(SONG_COLUMNS) + 1))})",
+                (
+                    (playlist_id, *row)
+                    for row in df_warehouse_songs.itertuples(
+                        index=False, name=None
+                    )
+                )
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO playlist_artists VALUES (?, ?)",
+                ((playlist_id, artist) for artist in df_artists["Artist"])
+            )
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO artist_genres VALUES (?, ?, ?)",
+                (
+                    (playlist_id, artist, genre)
+                    for artist, genre in artist_genres
+                )
+            )
+
+        return playlist_id
+
+    def query(self, sql: str, params: Sequence[Any] = ()) -> pd.DataFrame:
+        """Runs any SQL query against the warehouse."""
+        return pd.read_sql_query(sql, self.connection, params=params)
+
+    def get_playlists(self) -> pd.DataFrame:
+        """Gets all ingested playlists, oldest first."""
+
+        return self.query(
+            "SELECT playlist_id, playlist_name, created_on, num_songs "
+            "FROM playlists ORDER BY created_on, playlist_name"
+        )
+
+    def get_artist_overlap(self, min_playlists: int = 2) -> pd.DataFrame:
+        """
+        Gets artists appearing in multiple playlists.
+
+        Parameters:
+            min_playlists (int): Min number of playlists an artist is in.
+
+        Returns:
+            pd.DataFrame: Artist, Num Playlists and Playlists (comma-separated
+                playlist names), most playlists first.
+        """
+
+        return self.query(
+            """
+            SELECT pa.artist AS "Artist",
+                   COUNT(*) AS "Num Playlists",
+                   GROUP_CONCAT(p.playlist_name, ', ') AS "Playlists"
+            FROM playlist_artists pa
+            JOIN playlists p USING (playlist_id)
+            GROUP BY pa.artist
+            HAVING COUNT(*) >= ?
+            ORDER BY COUNT(*) DESC, pa.artist
+            """,
+            (min_playlists,)
+        )
+
+    def get_playlist_overlap(self) -> pd.DataFrame:
+        """
+        Gets the number of shared artists for each pair of playlists.
+
+        Returns:
+            pd.DataFrame: Playlist 1, Playlist 2 and Shared Artists, for
+                pairs sharing at least one artist, most shared first.
+        """
+
+        return self.query(
+            """
+            SELECT p1.playlist_name AS "Playlist 1",
+                   p2.playlist_name AS "Playlist 2",
+                   COUNT(*) AS "Shared Artists"
+            FROM playlist_artists pa1
+            JOIN playlist_artists pa2
+                ON pa1.artist = pa2.artist
+                AND pa1.playlist_id < pa2.playlist_id
+            JOIN playlists p1 ON p1.playlist_id = pa1.playlist_id
+            JOIN playlists p2 ON p2.playlist_id = pa2.playlist_id
+            GROUP BY pa1.playlist_id, pa2.playlist_id
+            ORDER BY COUNT(*) DESC, p1.playlist_name, p2.playlist_name
+            """
+        )
+
+    def get_genre_share(
+        self,
+        period: str = "month",
+        top_n: Optional[int] = 10
+    ) -> pd.DataFrame:
+        """
+        Gets each genre's share of playlist artists over time: the fraction
+        of artists (counted once per playlist) having the genre.
+
+        Parameters:
+            period (str): 'month', 'year' or 'playlist'.
+            top_n (int): Only include the top_n genres by overall artist
+                count. None includes all genres.
+
+        Returns:
+            pd.DataFrame: Period, Genre, Artists and Share, sorted by period
+                then share (descending).
+        """
+
+        period_columns = {
+            "month": "SUBSTR(p.created_on, 1, 7)",
+            "year": "SUBSTR(p.created_on, 1, 4)",
+            "playlist": "p.playlist_name",
+        }
+        if period not in period_columns:
+            raise ValueError(f"period must be one of {list(period_columns)}")
+        period_column = period_columns[period]
+
+        top_genres_filter = ""
+        params: Tuple[Any, ...] = ()
+        if top_n is not None:
+            top_genres_filter = """
+                WHERE ag.genre IN (
+                    SELECT genre FROM artist_genres
+                    GROUP BY genre ORDER BY COUNT(*) DESC, genre LIMIT ?
+                )
+            """
+            params = (top_n,)
+
+        return self.query(
+            f"""
+            WITH period_artists AS (
+                SELECT {period_column} AS period, COUNT(*) AS num_artists
+                FROM playlist_artists pa
+                JOIN playlists p USING (playlist_id)
+                GROUP BY period
+            )
+            SELECT {period_column} AS "Period",
+                   ag.genre AS "Genre",
+                   COUNT(*) AS "Artists",
+                   CAST(COUNT(*) AS REAL) / pa.num_artists AS "Share"
+            FROM artist_genres ag
+            JOIN playlists p USING (playlist_id)
+            JOIN period_artists pa ON pa.period = {period_column}
+            {top_genres_filter}
+            GROUP BY "Period", ag.genre
+            ORDER BY "Period", "Share" DESC, ag.genre
+            """,
+            params
+        )
+
+    def get_feature_distributions(
+        self,
+        features: List[str] = FEATURES
+    ) -> pd.DataFrame:
+        """
+        Gets each playlist's song feature distributions: count, mean,
+        standard deviation, min and max of each feature.
+
+        Parameters:
+            features (List[str]): Song features (Ex: 'Tempo', 'Energy').
+
+        Returns:
+            pd.DataFrame: One row per playlist, with '<feature> <stat>'
+                columns.
+        """
+
+        aggregates = []
+        for feature in features:
+            column = SONG_COLUMNS.get(feature)
+            if column not in {"tempo", "danceability", "energy", "speechiness"}:
+                raise ValueError(f"Unknown song feature: {feature}")
+            aggregates.append(
+                f'COUNT({column}) AS "{feature} Count", '
+                f'AVG({column}) AS "{feature} Mean", '
+                f"SQRT(MAX(AVG({column} * {column}) - AVG({column}) * "
+                f'AVG({column}), 0)) AS "{feature} Std", '
+                f'MIN({column}) AS "{feature} Min", '
+                f'MAX({column}) AS "{feature} Max"'
+            )
+
+        return self.query(
+            f"""
+            SELECT p.playlist_name AS "Playlist",
+                   p.created_on AS "Created On",
+                   {', '.join(aggregates)}
+            FROM songs s
+            JOIN playlists p USING (playlist_id)
+            GROUP BY s.playlist_id
+            ORDER BY p.created_on, p.playlist_name
+            """
+        )
+
+
+def parse_playlist_folder_name(folder_name: str) -> Tuple[str, Optional[str]]:
+    """
+    Gets a playlist's name and creation date from its output folder name.
+
+    Ex: 'EdcOrlando2023Summary_Created2024-01-10' ->
+        ('EdcOrlando2023', '2024-01-10')
+
+    Parameters:
+        folder_name (str): Output folder name.
+
+    Returns:
+        Tuple[str, Optional[str]]: Playlist name and creation date
+            (YYYY-MM-DD), or the folder name and None if not in the usual
+            format.
+    """
+
+    match = re.fullmatch(r"(.+)Summary_Created(\d{4}-\d{2}-\d{2})", folder_name)
+    if match is None:
+        return folder_name, None
+    return match.group(1), match.group(2)
+
+
+if __name__ == "__main__":
+    with PlaylistWarehouse() as warehouse:
+        new_folders = warehouse.ingest()
+        print(f"Ingested {len(new_folders)} new playlists: {new_folders}")
+        print(warehouse.get_playlists())
+        print(warehouse.get_artist_overlap().head(20))
+        print(warehouse.get_playlist_overlap().head(10))
+        print(warehouse.get_genre_share(period="playlist", top_n=5))
+        print(warehouse.get_feature_distributions(["Tempo", "Energy"]))
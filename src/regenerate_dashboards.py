@@ -0,0 +1,363 @@
+###############################################################################
+#
+# This file contains a command line tool for regenerating the summary
+# dashboards of all created playlists, Ex: after a dashboard template or CSS
+# change. No browser windows are opened.
+#
+# Run from the repo root:
+#   python src/regenerate_dashboards.py [--workers N] [--force] [--export]
+#       [--match PATTERN] [--report FILE]
+#
+###############################################################################
+
+import argparse
+import fnmatch
+import html
+import json
+import os
+import re
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+# Relative when imported as src.regenerate_dashboards, by name when run from
+# src
+try:
+    from .playlist_analytics import (
+        METADATA_FILE_NAME, PlaylistGenOutputs, get_dashboard_dir,
+    )
+    from .playlist_io import find_song_file, load_df
+    from .track_catalog import (
+        TRACK_CATALOG_DIR, TrackCatalog, fill_missing_features,
+    )
+except ImportError:
+    from playlist_analytics import (
+        METADATA_FILE_NAME, PlaylistGenOutputs, get_dashboard_dir,
+    )
+    from playlist_io import find_song_file, load_df
+    from track_catalog import (
+        TRACK_CATALOG_DIR, TrackCatalog, fill_missing_features,
+    )
+
+
+CREATED_PLAYLISTS_DIR = "output/created_playlists"
+DASHBOARD_FILE_NAME = "summary_dashboard.html"
+
+
+def find_dashboard_folders(
+    created_playlists_dir: str = CREATED_PLAYLISTS_DIR,
+    match: str = "*"
+) -> List[str]:
+    """
+    Finds every created playlist folder (<playlist_name>Summary_Created<date>)
+    containing a playlist_songs.parquet or playlist_songs.csv file.
+
+    Parameters:
+        created_playlists_dir (str): Folder containing created playlists.
+        match (str): Only include folder names matching this glob pattern.
+
+    Returns:
+        List[str]: Folder paths, sorted by folder name.
+    """
+
+    return [
+        os.path.join(created_playlists_dir, folder_name)
+        for folder_name in sorted(os.listdir(created_playlists_dir))
+        if "Summary_Created" in folder_name
+        and fnmatch.fnmatch(folder_name, match)
+        and find_song_file(
+            os.path.join(created_playlists_dir, folder_name)
+        ) is not None
+    ]
+
+
+def load_playlist_songs(folder_path: str) -> pd.DataFrame:
+    """
+    Loads a created playlist's songs, from playlist_songs.parquet if saved,
+    otherwise from playlist_songs.csv (see playlist_io.load_df). Missing
+    features are filled from the track catalog, if there is one.
+
+    Parameters:
+        folder_path (str): Created playlist folder.
+
+    Returns:
+        pd.DataFrame: Playlist songs.
+    """
+
+    file_path = find_song_file(folder_path)
+    if file_path is None:
+        raise FileNotFoundError(f"No playlist songs file in {folder_path}")
+
+    df_songs = load_df(file_path)
+    if os.path.isfile(os.path.join(TRACK_CATALOG_DIR, "catalog.json")):
+        df_songs = fill_missing_features(
+            df_songs, TrackCatalog(TRACK_CATALOG_DIR)
+        )
+    return df_songs
+
+
+def load_playlist_metadata(folder_path: str) -> Dict[str, Any]:
+    """
+    Loads the dashboard inputs saved alongside a playlist's songs.
+
+    Dashboards created before playlist_metadata.json was saved fall back to
+    the folder name (playlist name and creation date) and the existing
+    dashboard (display name and recommended artists). Their playlist URI is
+    unknown.
+
+    Parameters:
+        folder_path (str): Created playlist folder.
+
+    Returns:
+        Dict[str, Any]: playlist_name, playlist_uri, playlist_created_on
+            (month-day-year) and recommended_artists.
+    """
+
+    metadata_path = os.path.join(folder_path, METADATA_FILE_NAME)
+    if os.path.isfile(metadata_path):
+        with open(metadata_path, encoding="utf-8") as file:
+            return json.load(file)
+
+    folder_name = os.path.basename(os.path.normpath(folder_path))
+    match = re.fullmatch(
+        r"(.+)Summary_Created(\d{4})-(\d{2})-(\d{2})", folder_name
+    )
+    if match is None:
+        raise ValueError(f"Unexpected playlist folder name: {folder_name}")
+    playlist_name, year, month, day = match.groups()
+    playlist_metadata = {
+        "playlist_name": playlist_name,
+        "playlist_uri": "",
+        "playlist_created_on": f"{month}-{day}-{year}",
+        "recommended_artists": [],
+    }
+
+    dashboard_path = os.path.join(folder_path, DASHBOARD_FILE_NAME)
+    if os.path.isfile(dashboard_path):
+        # Older dashboards were saved in the platform's default encoding
+        # (cp1252 on Windows)
+        with open(dashboard_path, "rb") as file:
+            dashboard_bytes = file.read()
+        try:
+            dashboard_html = dashboard_bytes.decode("utf-8")
+        except UnicodeDecodeError:
+            dashboard_html = dashboard_bytes.decode("cp1252", errors="replace")
+        name_match = re.search(
+            r'<div id="top-line">(.*?)</div>', dashboard_html
+        )
+        # Only keep the display name if it maps to the same folder
+        if name_match and (
+            html.unescape(name_match.group(1)).replace(" ", "")
+            == playlist_name
+        ):
+            playlist_metadata["playlist_name"] = html.unescape(
+                name_match.group(1)
+            )
+        artists_match = re.search(
+            r'<div id="line1">(.*?)</div>\s*'
+            r'<div id="line2">Similar artists to this playlist</div>',
+            dashboard_html
+        )
+        if artists_match and artists_match.group(1).strip():
+            playlist_metadata["recommended_artists"] = [
+                html.unescape(artist)
+                for artist in artists_match.group(1).split(", ")
+            ]
+
+    return playlist_metadata
+
+
+def regenerate_dashboard(
+    folder_path: str,
+    force: bool = False,
+    export: bool = False
+) -> Dict[str, Any]:
+    """
+    Regenerates one created playlist's dashboard, without opening it.
+
+    Parameters:
+        folder_path (str): Created playlist folder.
+        force (bool): If True, regenerate all dashboard components, even if
+            their inputs are unchanged.
+        export (bool): If True, also save the single-file dashboard (see
+            PlaylistGenOutputs.export_dashboard).
+
+    Returns:
+        Dict[str, Any]: folder, num_songs, seconds, regenerated components
+            and error (None on success, otherwise the traceback).
+    """
+
+    start_time = time.perf_counter()
+    result = {
+        "folder": os.path.basename(os.path.normpath(folder_path)),
+        "num_songs": None,
+        "seconds": None,
+        "regenerated_components": [],
+        "error": None,
+    }
+    try:
+        df_songs = load_playlist_songs(folder_path)
+        result["num_songs"] = len(df_songs)
+        playlist_metadata = load_playlist_metadata(folder_path)
+
+        # Check before any output folders are created
+        dashboard_dir = get_dashboard_dir(
+            playlist_metadata["playlist_name"],
+            playlist_metadata["playlist_created_on"]
+        )
+        if os.path.abspath(dashboard_dir) != os.path.abspath(folder_path):
+            raise ValueError(
+                f"Playlist metadata maps to {dashboard_dir}, not {folder_path}"
+            )
+
+        outputs = PlaylistGenOutputs(
+            df_songs,
+            playlist_metadata["recommended_artists"],
+            playlist_metadata["playlist_name"],
+            playlist_metadata["playlist_uri"],
+            playlist_metadata["playlist_created_on"],
+        )
+
+        # Folders are already regenerated in parallel, so create each
+        # dashboard's components serially
+        outputs.create_dashboard(max_workers=1, force=force)
+        result["regenerated_components"] = outputs.regenerated_components
+        if export:
+            outputs.export_dashboard(max_workers=1)
+    except Exception:
+        result["error"] = traceback.format_exc()
+    result["seconds"] = round(time.perf_counter() - start_time, 3)
+
+    return result
+
+
+def regenerate_dashboards(
+    folder_paths: List[str],
+    max_workers: Optional[int] = None,
+    force: bool = False,
+    export: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Regenerates dashboards in parallel across processes, printing each
+    folder's result as it finishes.
+
+    Parameters:
+        folder_paths (List[str]): Created playlist folders.
+        max_workers (int): Max processes used (default is the CPU count).
+            1 regenerates dashboards serially, in this process.
+        force (bool): See regenerate_dashboard.
+        export (bool): See regenerate_dashboard.
+
+    Returns:
+        List[Dict[str, Any]]: Results (see regenerate_dashboard), in
+            folder_paths order.
+    """
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(folder_paths))
+
+    results = {}
+    if max_workers <= 1:
+        for folder_path in folder_paths:
+            results[folder_path] = regenerate_dashboard(
+                folder_path, force, export
+            )
+            print_result(results[folder_path])
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+            for folder_path in folder_paths:
+                future = executor.submit(
+                    regenerate_dashboard, folder_path, force, export
+                )
+                futures[future] = folder_path
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                print_result(results[futures[future]])
+
+    return [results[folder_path] for folder_path in folder_paths]
+
+
+def print_result(result: Dict[str, Any]) -> None:
+    """Prints one folder's regeneration result on a single line."""
+
+    status = "FAILED" if result["error"] else "ok"
+    print(
+        f"{status:>6}  {result['seconds']:7.2f}s  "
+        f"{result['num_songs'] or 0:6} songs  "
+        f"{len(result['regenerated_components']):2} regenerated  "
+        f"{result['folder']}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Regenerate the summary dashboards of all created playlists, "
+            "without opening them."
+        )
+    )
+    parser.add_argument(
+        "--match",
+        default="*",
+        help="only regenerate folders matching this glob pattern"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="max processes used (default: CPU count)"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="regenerate all components, even if their inputs are unchanged"
+    )
+    parser.add_argument(
+        "--export",
+        action="store_true",
+        help="also save each dashboard as a single self-contained file"
+    )
+    parser.add_argument(
+        "--report",
+        default=None,
+        help="also save per-folder results to this .json file"
+    )
+    args = parser.parse_args(argv)
+
+    # Dashboards link to the shared styles folder of CREATED_PLAYLISTS_DIR,
+    # so only its playlist folders can be regenerated
+    folder_paths = find_dashboard_folders(CREATED_PLAYLISTS_DIR, args.match)
+    if not folder_paths:
+        print(f"No created playlist folders found in {CREATED_PLAYLISTS_DIR}")
+        return 0
+
+    print(f"Regenerating {len(folder_paths)} dashboards...")
+    start_time = time.perf_counter()
+    results = regenerate_dashboards(
+        folder_paths, args.workers, args.force, args.export
+    )
+    failed_results = [result for result in results if result["error"]]
+
+    for result in failed_results:
+        print(f"\n{result['folder']} failed:\n{result['error']}")
+    print(
+        f"\n{len(results) - len(failed_results)} regenerated, "
+        f"{len(failed_results)} failed in "
+        f"{time.perf_counter() - start_time:.2f}s"
+    )
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+
+    return 1 if failed_results else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,6 @@
-from typing import Tuple
+from contextlib import nullcontext
+import os
+from typing import ContextManager, Optional, Tuple
 
 import pandas as pd
 
@@ -9,22 +11,30 @@ from gui.gui3b_artist_manual_entry import launch_gui_artist_manual_entry
 from gui.gui4ab_song_customization import launch_gui_song_customization
 
 from festival_lineup_scraper import get_artist_names
-from playlist_analytics import PlaylistGenOutputs
+from playlist_analytics import PlaylistGenOutputs, get_dashboard_dir
+from run_profiler import RunProfiler
+from playlist_io import save_artists, save_songs
 from playlist_mods import (
-    create_df_playlist_artists, filter_songs_by_artist_popularity,
-    remove_duplicates, remove_remixes_and_edits,
+    ArtistGenreIndex, PlaylistModsPipeline, create_df_playlist_artists,
+    order_songs_for_smooth_transitions,
 )
 from spotipy_utils import (
-    auth_flow, create_playlist, get_token_header, get_top_tracks,
-    recommend_artists, search_for_artists
+    MAX_PLAYLIST_SIZE, auth_flow, create_playlist, create_sharded_playlists,
+    get_token_header, get_top_tracks, recommend_artists, search_for_artists
 )
+from spotify_catalog import SpotifyCatalog
+from track_catalog import TrackCatalog
 
 
 def main(
     create_new_playlist: bool = True,
     analyze_playlist: bool = True,
     save_df_songs: bool = True,
-    save_df_artists: bool = False
+    save_df_artists: bool = False,
+    smooth_transitions: bool = False,
+    shard_by: Optional[str] = None,
+    profile_run: bool = True,
+    profile_memory: bool = False
 ) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Main function of Spotify Festival Playlist Generator.
@@ -37,6 +47,20 @@ def main(
             as a CSV file.
         save_df_artists (bool): Flag indicating whether to save artist
             information as a CSV file.
+        smooth_transitions (bool): Flag indicating whether to order songs so
+            that Tempo, Energy, etc. change smoothly from song to song. Off by
+            default, keeping the playlist grouped by artist.
+        shard_by (str, optional): How to split playlists with more songs than
+            Spotify allows into multiple playlists: None (by size), 'genre',
+            or a column name (see spotipy_utils.split_into_shards).
+        profile_run (bool): Flag indicating whether to record the time of
+            each stage (scrape, artist search, top tracks, each song filter,
+            playlist creation, recommendations and each dashboard component).
+            The profile is shown in the dashboard and saved as profile.json.
+            GUI screens are not profiled.
+        profile_memory (bool): Flag indicating whether the profile also
+            records each stage's peak memory. Off by default, as tracing
+            memory makes memory-heavy stages several times slower.
 
     Returns:
         Tuple[pd.DataFrame, pd.DataFrame]: A tuple containing DataFrames for
@@ -66,6 +90,8 @@ def main(
         Artist uri - str
         Song uri - str
         Artist Image url - str
+        Song Artists - List[str] (all artists credited on the song)
+        Song isrc - str (International Standard Recording Code, or None)
 
     Note: Track feature descriptions available at
     https://developer.spotify.com/documentation/web-api/
@@ -85,113 +111,187 @@ def main(
     # a specific music festival or if they want to manually enter artist names.
     create_from_festival = launch_gui_start_screen()
 
+    # Profile each non-GUI stage of the run
+    profiler = (
+        RunProfiler(trace_memory=profile_memory) if profile_run else None
+    )
+
+    def profile_stage(name: str) -> ContextManager:
+        return nullcontext() if profiler is None else profiler.stage(name)
+
     # Set up Spotipy auth flow and artist search header
     spot = auth_flow()
     search_header = get_token_header()
 
-    while create_from_festival: # Create playlist for specific music festival
-
-        # Launch GUI screen 2a. Prompts user for festival link. Also has
-        # option to skip festival link step and enter artist names instead.
-        festival_link, skip_this_step = launch_gui_festival_link()
-
-        if skip_this_step: # Skip festival link search step
-            print(
-                "Skipping festival link screen."
-                "Enter artists' names manually instead."
-            )
-            create_from_festival = False # End while loop
-
-        else: # Search for festival, extract lineup, and get data for artists
-
-            # Search songkick.com for lineup and process festival name from URL
-            festival_name, lineup_artist_names = get_artist_names(
-                festival_link
-            )
-
-            # Search Spotify for each artist name in festival lineup.
-            df_lineup_artists = search_for_artists(
-                search_header,
-                lineup_artist_names
-            )
+    # Artists, top tracks and features fetched by previous runs are read from
+    # the local Spotify catalog while fresh (see spotify_catalog.
+    # FreshnessPolicy). Fetched metadata is written to it in one transaction,
+    # committed after fetching top tracks, or if the run stops before then
+    # (Ex: a GUI window is closed).
+    with SpotifyCatalog() as spotify_catalog:
+        # Create playlist for specific music festival
+        while create_from_festival:
+
+            # Launch GUI screen 2a. Prompts user for festival link. Also has
+            # option to skip festival link step and enter artist names instead.
+            festival_link, skip_this_step = launch_gui_festival_link()
+
+            if skip_this_step: # Skip festival link search step
+                print(
+                    "Skipping festival link screen."
+                    "Enter artists' names manually instead."
+                )
+                create_from_festival = False # End while loop
+
+            else: # Search for festival, extract lineup, get artists' data
+
+                # Search songkick.com for lineup and process festival name
+                # from URL
+                with profile_stage("scrape festival lineup"):
+                    festival_name, lineup_artist_names = get_artist_names(
+                        festival_link
+                    )
+
+                # Search Spotify for each artist name in festival lineup.
+                with profile_stage("resolve lineup artists"):
+                    df_lineup_artists = search_for_artists(
+                        search_header,
+                        lineup_artist_names,
+                        spotify_catalog
+                    )
+
+                    # Index lineup artists by genre, for selecting artists by
+                    # genre
+                    lineup_genre_index = ArtistGenreIndex(df_lineup_artists)
+
+                # GUI screen 3a. Select artists from lineup (and add other
+                # artists)
+                selected_artist_names, new_artist_names = (
+                    launch_gui_artist_selection(
+                        df_lineup_artists,
+                        festival_name,
+                        lineup_genre_index
+                    )
+                )
 
-            # GUI screen 3a. Select artists from lineup (and add other artists)
-            selected_artist_names, new_artist_names = (
-                launch_gui_artist_selection(
+                # Get new artist data and add it to df_artists
+                with profile_stage("resolve added artists"):
+                    df_new_artists = search_for_artists(
+                        search_header,
+                        new_artist_names,
+                        spotify_catalog
+                    ) # Artists added (i.e., not in lineup)
+                df_playlist_artists = create_df_playlist_artists(
                     df_lineup_artists,
-                    festival_name
+                    df_new_artists,
+                    selected_artist_names
                 )
-            )
 
-            # Get new artist data and add it to df_artists
-            df_new_artists = search_for_artists(
-                search_header,
-                new_artist_names
-            ) # Artists added (i.e., not in lineup)
-            df_playlist_artists = create_df_playlist_artists(
-                df_lineup_artists,
-                df_new_artists,
-                selected_artist_names
-            )
+            break # End while loop
 
-        break # End while loop
+        # Create playlist by manually entering artists
+        if not create_from_festival:
 
-    if not create_from_festival: # Create playlist by manually entering artists
+            # Launch GUI screen 3b. Prompts user to enter artist names manually.
+            entered_artist_names = launch_gui_artist_manual_entry()
 
-        # Launch GUI screen 3b. Prompts user to enter artist names manually.
-        entered_artist_names = launch_gui_artist_manual_entry()
-
-        # Get data for user-entered artists
-        df_playlist_artists = search_for_artists(
-            search_header,
-            entered_artist_names
-        )
-        festival_name = "Custom Playlist"
-
-    # Launch GUI screen 4. Contains multiple playlist customization options.
-    (
-        playlist_name,
-        tracks_per_artist,
-        artist_popularity_filtering,
-        include_remixes
-    ) = launch_gui_song_customization(df_playlist_artists, festival_name)
+            # Get data for user-entered artists
+            with profile_stage("resolve entered artists"):
+                df_playlist_artists = search_for_artists(
+                    search_header,
+                    entered_artist_names,
+                    spotify_catalog
+                )
+            festival_name = "Custom Playlist"
 
-    # Get between 1-10 top tracks from each selected artist using Spotipy
-    df_songs = get_top_tracks(spot, df_playlist_artists, tracks_per_artist)
+        # Launch GUI screen 4. Contains multiple playlist customization options.
+        (
+            playlist_name,
+            tracks_per_artist,
+            artist_popularity_filtering,
+            include_remixes
+        ) = launch_gui_song_customization(df_playlist_artists, festival_name)
+
+        # Get between 1-10 top tracks from each selected artist using Spotipy.
+        # Features of tracks fetched by previous runs are read from the Spotify
+        # and track catalogs, and newly fetched tracks are added to both.
+        with profile_stage("fetch top tracks"):
+            df_songs = get_top_tracks(
+                spot,
+                df_playlist_artists,
+                tracks_per_artist,
+                track_catalog=TrackCatalog(writable=True),
+                spotify_catalog=spotify_catalog
+            )
 
-    # Drop duplicates of the same song, if any
-    df_songs, duplicate_songs_removed = remove_duplicates(df_songs)
-    if duplicate_songs_removed:
-        print(f"Duplicate songs removed: {duplicate_songs_removed}")
+    # Plan the song filters selected by the user, then apply them in one pass.
+    # Exact duplicates and other releases of the same song (Ex: a collab's
+    # single and album versions appearing under each of its artists' top
+    # tracks) are always dropped.
+    song_filters = (
+        PlaylistModsPipeline()
+        .remove_duplicates()
+        .remove_near_duplicates()
+    )
 
     # Drop multiple versions of songs if user selected this option
     if not include_remixes:
-        df_songs, remix_songs_removed = remove_remixes_and_edits(df_songs)
-        if remix_songs_removed:
-            print("Multiple versions of song(s) present.\n")
-            print(f"Songs removed: {remix_songs_removed}")
+        song_filters.remove_remixes_and_edits()
 
     # Adjust qty of songs per artist, scaling with artist popularity
     if artist_popularity_filtering:
-        df_songs = filter_songs_by_artist_popularity(df_songs)
+        song_filters.filter_songs_by_artist_popularity()
+
+    with profile_stage("filter songs"):
+        df_songs, song_filters_report = song_filters.execute(
+            df_songs, profiler=profiler
+        )
+    for stage_report in song_filters_report:
+        if stage_report.removed_songs:
+            print(
+                f"{stage_report.name} removed {len(stage_report.removed_songs)}"
+                f" songs: {stage_report.removed_songs}"
+            )
+
+    # Order songs so consecutive songs have similar features
+    if smooth_transitions:
+        with profile_stage("order songs for smooth transitions"):
+            df_songs = order_songs_for_smooth_transitions(df_songs)
 
     # Create a new playlist using df_songs
-    if create_new_playlist:
-        playlist_uri = create_playlist(playlist_name, spot, df_songs)
-    else:
-        playlist_uri = ""
+    with profile_stage("create playlist"):
+        if create_new_playlist and len(df_songs) > MAX_PLAYLIST_SIZE:
+            # Too many songs for one playlist, so split into multiple
+            # playlists. Progress is saved in the playlist's output folder.
+            shards_dir = get_dashboard_dir(playlist_name)
+            os.makedirs(shards_dir, exist_ok=True)
+            playlist_uris = create_sharded_playlists(
+                playlist_name,
+                spot,
+                df_songs,
+                shard_by=shard_by,
+                on_failure='resume',
+                state_path=f"{shards_dir}playlist_shards.json"
+            )
+            playlist_uri = playlist_uris[0]
+        elif create_new_playlist:
+            playlist_uri = create_playlist(playlist_name, spot, df_songs)
+        else:
+            playlist_uri = ""
 
     # If creating any outputs, instanstiate outputs class
     if analyze_playlist or save_df_songs or save_df_artists:
-        recommended_artists = recommend_artists(
-            spot,
-            df_playlist_artists
-        ) # Get top 3 artist recs
+        with profile_stage("recommend artists"):
+            recommended_artists = recommend_artists(
+                spot,
+                df_playlist_artists
+            ) # Get top 3 artist recs
         outputs = PlaylistGenOutputs(
             df_songs,
             recommended_artists,
             playlist_name,
-            playlist_uri
+            playlist_uri,
+            profiler=profiler
         )
 
     # Create output summary dashboard, dashboard components, and folders
@@ -199,13 +299,25 @@ def main(
         outputs.create_dashboard()
         outputs.open_dashboard_and_playlist()
 
-    # Save songs df as a .csv file (and make output folder)
+    # Save songs df as a typed .parquet file (for loading), and a .csv file
+    # (for humans)
     if save_df_songs:
         outputs.save_df_as_csv(df_songs, "playlist_songs.csv")
+        save_songs(df_songs, f"{outputs.dashboard_dir}playlist_songs.parquet")
 
-    # Save artists df as a .csv file (and make output folder)
+    # Save artists df as a .parquet and a .csv file
     if save_df_artists:
         outputs.save_df_as_csv(df_playlist_artists, "playlist_artists.csv")
+        save_artists(
+            df_playlist_artists,
+            f"{outputs.dashboard_dir}playlist_artists.parquet"
+        )
+
+    # Save the run profile (and stop tracing memory)
+    if profiler is not None:
+        if analyze_playlist or save_df_songs or save_df_artists:
+            outputs.save_profile()
+        profiler.stop()
 
 
 if __name__ == "__main__":
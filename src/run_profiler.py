@@ -0,0 +1,260 @@
+###############################################################################
+#
+# This file contains RunProfiler, which records the wall time and memory use
+# of each stage of a playlist generator run (Ex: scraping the lineup, fetching
+# top tracks, each song filter, each dashboard component), so slow runs can
+# be diagnosed after the fact:
+#   - RunProfiler.stage is a context manager timing one (possibly nested)
+#      stage
+#   - profile_call times a function in a worker process, for stages run in a
+#      process pool
+#   - The profile is saved as profile.json and shown in the dashboard
+#
+###############################################################################
+
+from contextlib import contextmanager
+from datetime import datetime
+import json
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+BYTES_PER_MB = 1024 ** 2
+
+
+def profile_call(
+    trace_memory: bool,
+    func: Callable,
+    *args: Any
+) -> Tuple[Any, float, Optional[int], Optional[int]]:
+    """
+    Calls func(*args), measuring its wall time and memory use. Used to
+    profile stages run in worker processes (see RunProfiler.add_stage).
+
+    Parameters:
+        trace_memory (bool): If True, also measure memory use.
+        func (Callable): Function to call.
+        *args: Arguments of func.
+
+    Returns:
+        Tuple: func's result, seconds, peak bytes and memory delta bytes
+            (both None if not tracing memory).
+    """
+
+    started_tracing = trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    if trace_memory and hasattr(tracemalloc, "reset_peak"):
+        tracemalloc.reset_peak()
+    start_memory = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+    start_time = time.perf_counter()
+
+    try:
+        result = func(*args)
+        seconds = time.perf_counter() - start_time
+        if trace_memory:
+            current_memory, peak_memory = tracemalloc.get_traced_memory()
+            return (
+                result,
+                seconds,
+                peak_memory - start_memory,
+                current_memory - start_memory,
+            )
+        return result, seconds, None, None
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+
+class RunProfiler():
+    """
+    Records each stage's wall time and memory use (via tracemalloc).
+
+    For each stage:
+        seconds - wall time
+        peak_mb - peak memory allocated during the stage, above the memory
+            allocated when it started
+        memory_delta_mb - memory still allocated when the stage ended, above
+            the memory allocated when it started
+
+    Stages can be nested. Peak memory is per stage when
+    tracemalloc.reset_peak is available (Python 3.9+). Otherwise, a stage's
+    peak is the peak since the profiler started, if that peak was reached
+    during the stage.
+
+    Ex:
+        profiler = RunProfiler()
+        with profiler.stage("fetch top tracks"):
+            df_songs = get_top_tracks(spot, df_artists)
+        profiler.save("profile.json")
+    """
+
+    def __init__(self, trace_memory: bool = True) -> None:
+        """
+        Initialize the RunProfiler class, starting tracemalloc if needed.
+
+        Parameters:
+            trace_memory (bool): If True, record memory use with tracemalloc
+                (slows down memory-heavy stages). If False, only record time.
+        """
+
+        self.trace_memory = trace_memory
+        self.created_on = datetime.now().isoformat(timespec="seconds")
+        self.stages = []
+
+        self.started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+
+        # Peak memory seen so far by each open stage. The first item is the
+        # whole run.
+        self._open_stage_peaks = [0]
+        self._stage_start_times = {} # id(stage info) -> start time
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Records the wall time and memory use of the code run in this context.
+
+        Parameters:
+            name (str): Stage name. Nested stages are shown indented under
+                the enclosing stage.
+        """
+
+        stage_info = {
+            "name": name,
+            "depth": len(self._open_stage_peaks) - 1,
+            "seconds": None,
+            "peak_mb": None,
+            "memory_delta_mb": None,
+            "finished": False,
+        }
+        self.stages.append(stage_info) # Enclosing stages are listed first
+        start_memory = self._start_peak_window()
+        self._open_stage_peaks.append(start_memory)
+        start_time = time.perf_counter()
+        self._stage_start_times[id(stage_info)] = start_time
+
+        try:
+            yield
+        finally:
+            stage_info["seconds"] = round(time.perf_counter() - start_time, 4)
+            stage_info["finished"] = True
+            del self._stage_start_times[id(stage_info)]
+            stage_peak = self._open_stage_peaks.pop()
+            if self.is_tracing():
+                current_memory, peak_memory = tracemalloc.get_traced_memory()
+                stage_peak = max(stage_peak, peak_memory)
+                stage_info["peak_mb"] = to_mb(stage_peak - start_memory)
+                stage_info["memory_delta_mb"] = to_mb(
+                    current_memory - start_memory
+                )
+                self._open_stage_peaks[-1] = max(
+                    self._open_stage_peaks[-1], stage_peak
+                )
+
+    def add_stage(
+        self,
+        name: str,
+        seconds: float,
+        peak_bytes: Optional[int] = None,
+        memory_delta_bytes: Optional[int] = None,
+    ) -> None:
+        """
+        Records a stage measured elsewhere (Ex: in a worker process, see
+        profile_call), nested under the currently open stage.
+        """
+
+        self.stages.append({
+            "name": name,
+            "depth": len(self._open_stage_peaks) - 1,
+            "seconds": round(seconds, 4),
+            "peak_mb": None if peak_bytes is None else to_mb(peak_bytes),
+            "memory_delta_mb": (
+                None if memory_delta_bytes is None
+                else to_mb(memory_delta_bytes)
+            ),
+            "finished": True,
+        })
+
+    # Times a function in a worker process (module-level, so it's pickled by
+    # reference when submitted to a process pool)
+    profile_call = staticmethod(profile_call)
+
+    def is_tracing(self) -> bool:
+        """Whether memory use is being recorded."""
+        return self.trace_memory and tracemalloc.is_tracing()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Gets the profile: creation date, total time of top-level stages, run
+        peak memory and each stage's measurements (in start order). Stages
+        still running (Ex: the dashboard stage, while rendering the dashboard)
+        have finished=False and their time so far.
+        """
+
+        run_peak = self._open_stage_peaks[0]
+        if self.is_tracing():
+            run_peak = max(run_peak, tracemalloc.get_traced_memory()[1])
+
+        current_time = time.perf_counter()
+        stages = [
+            stage_info if stage_info["finished"] else dict(
+                stage_info,
+                seconds=round(
+                    current_time - self._stage_start_times[id(stage_info)], 4
+                )
+            )
+            for stage_info in self.stages
+        ]
+
+        return {
+            "created_on": self.created_on,
+            "total_seconds": round(sum(
+                stage_info["seconds"]
+                for stage_info in stages if stage_info["depth"] == 0
+            ), 4),
+            "peak_mb": to_mb(run_peak) if self.trace_memory else None,
+            "peak_per_stage": hasattr(tracemalloc, "reset_peak"),
+            "stages": stages,
+        }
+
+    def save(self, file_path: str) -> None:
+        """Saves the profile (see to_dict) as a .json file."""
+
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def stop(self) -> None:
+        """Stops tracemalloc, if it was started by this profiler."""
+
+        if self.started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.started_tracing = False
+
+    def _start_peak_window(self) -> int:
+        """
+        Folds the current peak into the innermost open stage, then resets the
+        peak so the next stage's peak is measured on its own.
+
+        Returns:
+            int: Memory currently allocated (0 if not tracing).
+        """
+
+        if not self.is_tracing():
+            return 0
+
+        current_memory, peak_memory = tracemalloc.get_traced_memory()
+        self._open_stage_peaks[-1] = max(
+            self._open_stage_peaks[-1], peak_memory
+        )
+        if hasattr(tracemalloc, "reset_peak"):
+            tracemalloc.reset_peak()
+
+        return current_memory
+
+
+def to_mb(num_bytes: int) -> float:
+    """Converts bytes to MB (MiB), rounded to 3 decimals."""
+    return round(num_bytes / BYTES_PER_MB, 3)
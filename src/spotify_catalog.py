@@ -0,0 +1,500 @@
+###############################################################################
+#
+# This file contains a local SQLite catalog of Spotify metadata (artists,
+# tracks, artist top-track lists and track audio features), kept across runs
+# so searches and top tracks already fetched aren't requested again:
+#   - SpotifyCatalog reads cached metadata and writes fetched metadata
+#      through with bulk upserts. Writes stay in one open transaction until
+#      commit() (Ex: once per run), and are visible to reads before then.
+#   - FreshnessPolicy decides how long each kind of metadata can be used
+#      before it's fetched from the Spotify API again
+#   - normalize_name normalizes artist names for searching the catalog
+#
+###############################################################################
+
+from datetime import datetime, timedelta
+import json
+import os
+import re
+import sqlite3
+import unicodedata
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+
+SPOTIFY_CATALOG_PATH = "output/spotify_catalog.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artists (
+    artist_uri TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    normalized_name TEXT NOT NULL,
+    popularity INTEGER,
+    genres TEXT NOT NULL, -- JSON list, as returned by Spotify (lowercase)
+    image_url TEXT,
+    fetched_at TEXT NOT NULL -- ISO 8601
+);
+CREATE TABLE IF NOT EXISTS artist_searches (
+    normalized_query TEXT PRIMARY KEY,
+    artist_uri TEXT NOT NULL REFERENCES artists(artist_uri),
+    searched_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tracks (
+    track_uri TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    popularity INTEGER,
+    duration_ms INTEGER,
+    isrc TEXT,
+    artists TEXT NOT NULL, -- JSON list of credited artist names
+    fetched_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS top_track_lists (
+    artist_uri TEXT PRIMARY KEY,
+    num_tracks INTEGER NOT NULL,
+    fetched_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS top_tracks (
+    artist_uri TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    track_uri TEXT NOT NULL REFERENCES tracks(track_uri),
+    PRIMARY KEY (artist_uri, rank)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS track_features (
+    track_uri TEXT PRIMARY KEY,
+    danceability REAL, -- NULL if Spotify has no features for the track
+    energy REAL,
+    tempo REAL,
+    speechiness REAL,
+    fetched_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS artists_normalized_name
+    ON artists(normalized_name);
+CREATE INDEX IF NOT EXISTS top_tracks_track_uri ON top_tracks(track_uri);
+"""
+
+FEATURE_NAMES = ("danceability", "energy", "tempo", "speechiness")
+
+# Max number of SQL variables per query (SQLite's default limit before
+# 3.32 is 999)
+MAX_QUERY_VARIABLES = 900
+
+
+class FreshnessPolicy(NamedTuple):
+    """
+    Max age (in days) of each kind of cached metadata before it's fetched
+    again. None means cached metadata never expires.
+
+    Popularity and top tracks change over weeks, while audio features of a
+    track don't change. Tracks Spotify had no features for are checked again,
+    as their features may be added later.
+    """
+
+    artist_max_age_days: Optional[float] = 7
+    top_tracks_max_age_days: Optional[float] = 7
+    features_max_age_days: Optional[float] = None
+    missing_features_max_age_days: Optional[float] = 7
+
+    def is_fresh(
+        self,
+        fetched_at: str,
+        max_age_days: Optional[float],
+        now: Optional[datetime] = None
+    ) -> bool:
+        """
+        Whether metadata fetched at fetched_at (ISO 8601) is younger than
+        max_age_days.
+        """
+
+        if max_age_days is None:
+            return True
+        now = now or datetime.now()
+        return (
+            now - datetime.fromisoformat(fetched_at)
+            < timedelta(days=max_age_days)
+        )
+
+
+class SpotifyCatalog():
+    """
+    SQLite catalog of Spotify artists, tracks, top-track lists and audio
+    features, consulted before the Spotify API (see
+    spotipy_utils.search_for_artists and spotipy_utils.get_top_tracks).
+
+    Artists and tracks are stored as dicts with the fields used by
+    spotipy_utils:
+        artist - name, uri, popularity, genres (List[str]), image_url
+        track - name, uri, popularity, duration_ms, isrc, artists (List[str])
+        features - danceability, energy, tempo, speechiness (or None if
+            Spotify has no features for the track)
+
+    Ex:
+        with SpotifyCatalog() as spotify_catalog:
+            df_artists = search_for_artists(
+                search_header, artist_names, spotify_catalog
+            )
+            df_songs = get_top_tracks(
+                spot, df_artists, spotify_catalog=spotify_catalog
+            )
+            spotify_catalog.commit() # Also committed when exiting
+    """
+
+    def __init__(
+        self,
+        db_path: str = SPOTIFY_CATALOG_PATH,
+        freshness_policy: FreshnessPolicy = FreshnessPolicy()
+    ) -> None:
+        """
+        Initialize the SpotifyCatalog class, creating the database file and
+        tables if they don't exist yet.
+
+        Parameters:
+            db_path (str): Path of the SQLite database file (":memory:" for
+                an in-memory catalog).
+            freshness_policy (FreshnessPolicy): When cached metadata is used
+                instead of fetching it again.
+        """
+
+        if db_path != ":memory:" and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.connection = sqlite3.connect(db_path)
+        self.connection.executescript(SCHEMA)
+        self.freshness_policy = freshness_policy
+
+    def commit(self) -> None:
+        """Commits all writes since the last commit, in one transaction."""
+        self.connection.commit()
+
+    def close(self) -> None:
+        """Closes the database connection, discarding uncommitted writes."""
+        self.connection.close()
+
+    def __enter__(self) -> "SpotifyCatalog":
+        return self
+
+    def __exit__(self, exc_type: Any, *exc_info: Any) -> None:
+        # Keep metadata fetched before an error, as it's still valid
+        self.commit()
+        self.close()
+
+    def find_artists(
+        self,
+        artist_names: Iterable[str],
+        now: Optional[datetime] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Finds fresh artists by name: first by previous searches for the same
+        (normalized) name, then by artist name.
+
+        Parameters:
+            artist_names (Iterable[str]): Searched artist names.
+            now (datetime, optional): Time used to check freshness.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Artist of each found name (names not
+                found, or only found with stale metadata, are left out).
+        """
+
+        normalized_names = {name: normalize_name(name) for name in artist_names}
+        artists = {}
+        for chunk in chunks(sorted(set(normalized_names.values()))):
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.connection.execute(
+                "SELECT normalized_name, artist_uri, name, popularity, genres, "
+                "image_url, fetched_at, 1 AS priority FROM artists "
+                f"WHERE normalized_name IN ({placeholders}) "
+                "UNION ALL "
+                "SELECT s.normalized_query, a.artist_uri, a.name, "
+                "a.popularity, a.genres, a.image_url, a.fetched_at, 0 "
+                "FROM artist_searches s JOIN artists a USING (artist_uri) "
+                f"WHERE s.normalized_query IN ({placeholders}) "
+                "ORDER BY priority DESC",
+                chunk + chunk
+            )
+            # Searches (priority 0) override name matches
+            for row in rows:
+                artists[row[0]] = row[1:]
+
+        found_artists = {}
+        for name, normalized_name in normalized_names.items():
+            row = artists.get(normalized_name)
+            if row and self.freshness_policy.is_fresh(
+                row[5], self.freshness_policy.artist_max_age_days, now
+            ):
+                found_artists[name] = {
+                    "name": row[1],
+                    "uri": row[0],
+                    "popularity": row[2],
+                    "genres": json.loads(row[3]),
+                    "image_url": row[4],
+                }
+
+        return found_artists
+
+    def upsert_artists(
+        self,
+        searched_artists: Dict[str, Dict[str, Any]],
+        fetched_at: Optional[str] = None
+    ) -> None:
+        """
+        Saves fetched artists and the searches that found them, in bulk.
+
+        Parameters:
+            searched_artists (Dict[str, Dict[str, Any]]): Fetched artist of
+                each searched name.
+            fetched_at (str, optional): ISO 8601 time (default is now).
+        """
+
+        fetched_at = fetched_at or get_timestamp()
+        self.connection.executemany(
+            "INSERT INTO artists VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (artist_uri) DO UPDATE SET name = excluded.name, "
+            "normalized_name = excluded.normalized_name, "
+            "popularity = excluded.popularity, genres = excluded.genres, "
+            "image_url = excluded.image_url, fetched_at = excluded.fetched_at",
+            [
+                (
+                    artist["uri"],
+                    artist["name"],
+                    normalize_name(artist["name"]),
+                    artist["popularity"],
+                    json.dumps(artist["genres"]),
+                    artist["image_url"],
+                    fetched_at,
+                )
+                for artist in searched_artists.values()
+            ]
+        )
+        self.connection.executemany(
+            "INSERT INTO artist_searches VALUES (?, ?, ?) "
+            "ON CONFLICT (normalized_query) DO UPDATE SET "
+            "artist_uri = excluded.artist_uri, "
+            "searched_at = excluded.searched_at",
+            [
+                (normalize_name(name), artist["uri"], fetched_at)
+                for name, artist in searched_artists.items()
+            ]
+        )
+
+    def get_top_tracks(
+        self,
+        artist_uris: Iterable[str],
+        now: Optional[datetime] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Gets fresh top-track lists of artists.
+
+        Parameters:
+            artist_uris (Iterable[str]): Artist URIs.
+            now (datetime, optional): Time used to check freshness.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Tracks of each artist with a
+                fresh list, in rank order.
+        """
+
+        top_tracks = {}
+        for chunk in chunks(sorted(set(artist_uris))):
+            placeholders = ", ".join("?" * len(chunk))
+            list_sizes = {
+                artist_uri: num_tracks
+                for artist_uri, num_tracks, fetched_at in self.connection.execute(
+                    "SELECT artist_uri, num_tracks, fetched_at "
+                    f"FROM top_track_lists WHERE artist_uri IN ({placeholders})",
+                    chunk
+                )
+                if self.freshness_policy.is_fresh(
+                    fetched_at, self.freshness_policy.top_tracks_max_age_days,
+                    now
+                )
+            }
+            chunk_top_tracks = {artist_uri: [] for artist_uri in list_sizes}
+            rows = self.connection.execute(
+                "SELECT r.artist_uri, t.track_uri, t.name, t.popularity, "
+                "t.duration_ms, t.isrc, t.artists "
+                "FROM top_tracks r JOIN tracks t USING (track_uri) "
+                f"WHERE r.artist_uri IN ({placeholders}) "
+                "ORDER BY r.artist_uri, r.rank",
+                chunk
+            )
+            for artist_uri, *track in rows:
+                if artist_uri in chunk_top_tracks:
+                    chunk_top_tracks[artist_uri].append({
+                        "uri": track[0],
+                        "name": track[1],
+                        "popularity": track[2],
+                        "duration_ms": track[3],
+                        "isrc": track[4],
+                        "artists": json.loads(track[5]),
+                    })
+
+            # Skip lists missing tracks
+            top_tracks.update({
+                artist_uri: tracks
+                for artist_uri, tracks in chunk_top_tracks.items()
+                if len(tracks) == list_sizes[artist_uri]
+            })
+
+        return top_tracks
+
+    def upsert_top_tracks(
+        self,
+        top_tracks: Dict[str, List[Dict[str, Any]]],
+        fetched_at: Optional[str] = None
+    ) -> None:
+        """
+        Saves fetched top-track lists and their tracks, in bulk.
+
+        Parameters:
+            top_tracks (Dict[str, List[Dict[str, Any]]]): Tracks of each
+                artist URI, in rank order.
+            fetched_at (str, optional): ISO 8601 time (default is now).
+        """
+
+        fetched_at = fetched_at or get_timestamp()
+        self.connection.executemany(
+            "INSERT INTO tracks VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (track_uri) DO UPDATE SET name = excluded.name, "
+            "popularity = excluded.popularity, "
+            "duration_ms = excluded.duration_ms, isrc = excluded.isrc, "
+            "artists = excluded.artists, fetched_at = excluded.fetched_at",
+            [
+                (
+                    track["uri"],
+                    track["name"],
+                    track["popularity"],
+                    track["duration_ms"],
+                    track["isrc"],
+                    json.dumps(track["artists"]),
+                    fetched_at,
+                )
+                for tracks in top_tracks.values()
+                for track in tracks
+            ]
+        )
+        self.connection.executemany(
+            "DELETE FROM top_tracks WHERE artist_uri = ?",
+            [(artist_uri,) for artist_uri in top_tracks]
+        )
+        self.connection.executemany(
+            "INSERT INTO top_tracks VALUES (?, ?, ?)",
+            [
+                (artist_uri, rank, track["uri"])
+                for artist_uri, tracks in top_tracks.items()
+                for rank, track in enumerate(tracks)
+            ]
+        )
+        self.connection.executemany(
+            "INSERT INTO top_track_lists VALUES (?, ?, ?) "
+            "ON CONFLICT (artist_uri) DO UPDATE SET "
+            "num_tracks = excluded.num_tracks, fetched_at = excluded.fetched_at",
+            [
+                (artist_uri, len(tracks), fetched_at)
+                for artist_uri, tracks in top_tracks.items()
+            ]
+        )
+
+    def get_track_features(
+        self,
+        track_uris: Iterable[str],
+        now: Optional[datetime] = None
+    ) -> Dict[str, Optional[Dict[str, float]]]:
+        """
+        Gets fresh audio features of tracks.
+
+        Parameters:
+            track_uris (Iterable[str]): Track URIs.
+            now (datetime, optional): Time used to check freshness.
+
+        Returns:
+            Dict[str, Optional[Dict[str, float]]]: Features of each track
+                with fresh features (None if Spotify has no features for it).
+        """
+
+        track_features = {}
+        for chunk in chunks(sorted(set(track_uris))):
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.connection.execute(
+                "SELECT track_uri, fetched_at, "
+                f"{', '.join(FEATURE_NAMES)} FROM track_features "
+                f"WHERE track_uri IN ({placeholders})",
+                chunk
+            )
+            for track_uri, fetched_at, *values in rows:
+                is_missing = all(value is None for value in values)
+                max_age_days = (
+                    self.freshness_policy.missing_features_max_age_days
+                    if is_missing
+                    else self.freshness_policy.features_max_age_days
+                )
+                if self.freshness_policy.is_fresh(fetched_at, max_age_days, now):
+                    track_features[track_uri] = (
+                        None if is_missing
+                        else dict(zip(FEATURE_NAMES, values))
+                    )
+
+        return track_features
+
+    def upsert_track_features(
+        self,
+        track_features: Dict[str, Optional[Dict[str, float]]],
+        fetched_at: Optional[str] = None
+    ) -> None:
+        """
+        Saves fetched audio features, in bulk.
+
+        Parameters:
+            track_features (Dict[str, Optional[Dict[str, float]]]): Features
+                of each track URI (None if Spotify has no features for it).
+            fetched_at (str, optional): ISO 8601 time (default is now).
+        """
+
+        fetched_at = fetched_at or get_timestamp()
+        self.connection.executemany(
+            "INSERT INTO track_features VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (track_uri) DO UPDATE SET "
+            + ", ".join(
+                f"{name} = excluded.{name}"
+                for name in FEATURE_NAMES + ("fetched_at",)
+            ),
+            [
+                (
+                    track_uri,
+                    *(
+                        None if features is None else features[name]
+                        for name in FEATURE_NAMES
+                    ),
+                    fetched_at,
+                )
+                for track_uri, features in track_features.items()
+            ]
+        )
+
+
+def normalize_name(name: str) -> str:
+    """
+    Normalizes an artist name for matching: accents removed, casefolded and
+    only letters and digits kept.
+
+    Ex: 'Tiësto' -> 'tiesto', 'DJ Snake' -> 'djsnake', 'Above & Beyond'
+        -> 'abovebeyond'
+    """
+
+    normalized_name = unicodedata.normalize("NFKD", name)
+    normalized_name = "".join(
+        char for char in normalized_name if not unicodedata.combining(char)
+    )
+    normalized_name = re.sub(r"[\W_]+", "", normalized_name.casefold())
+
+    # Keep names without letters or digits (Ex: '!!!') distinct
+    return normalized_name or name.casefold()
+
+
+def get_timestamp() -> str:
+    """Current local time in ISO 8601 format."""
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def chunks(values: List[Any], size: int = MAX_QUERY_VARIABLES // 2) -> Iterable:
+    """Splits values into lists of at most size values, for IN (...) queries."""
+
+    for i in range(0, len(values), size):
+        yield values[i : i + size]
@@ -6,23 +6,32 @@
 #   - capitalize_genre is a helper function to capitalize genres, including
 #      common genre acronyms, in the succeeding search_for_artists function
 #   - search_for_artists queries for specific artists and returns a df
-#      containing important artist info (uri, popularity, genres, img url)
+#      containing important artist info (uri, popularity, genres, img url),
+#      reading artists already in the Spotify catalog from it
 #   - retry_spotify_request is a helper function to retry Spotify API
 #      requests in the following top_tracks function
 #   - recommend_artists returns similar artists to those in playlist
 #   - get_top_tracks gets the top 1-10 songs for each artist and returns a df
-#      containing song metadata (uri, popularity, danceability, etc)
+#      containing song metadata (uri, popularity, danceability, etc), reading
+#      known top tracks and features from the Spotify and track catalogs
 #   - create_playlist creates a new playlist for many songs
+#   - split_into_shards splits songs too many for one playlist by size,
+#      stage/day, or genre
+#   - create_sharded_playlists concurrently creates one playlist per shard,
+#      rolling back or resuming if adding songs fails
 #
 ###############################################################################
 
 import base64
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 import os
+from threading import Lock
 import time
-from typing import Any, Callable, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import requests
 
@@ -30,6 +39,15 @@ from spotipy import Spotify
 from spotipy.client import SpotifyException
 from spotipy.oauth2 import SpotifyOAuth
 
+# Relative when imported as src.spotipy_utils, by name when run from src
+try:
+    from .playlist_io import parse_list
+except ImportError:
+    from playlist_io import parse_list
+
+
+MAX_PLAYLIST_SIZE = 10_000 # Max songs Spotify allows in one playlist
+
 
 def auth_flow() -> Spotify:
     """
@@ -146,7 +164,8 @@ def capitalize_genre(genre):
 
 def search_for_artists(
     search_header: Dict[str, str],
-    artist_names: List[str]
+    artist_names: List[str],
+    spotify_catalog: Optional[Any] = None
 ) -> pd.DataFrame:
     """
     Query for specific artists. Finds top query for each artists in
@@ -156,6 +175,10 @@ def search_for_artists(
     Parameters:
         search_header (Dict[str, str]): Search header for Spotify API.
         artist_names (List[str]): List of artist names.
+        spotify_catalog (SpotifyCatalog, optional): Local metadata catalog
+            (see spotify_catalog.SpotifyCatalog). Artists found there with
+            fresh metadata aren't searched for, and searched artists are
+            written to it.
 
     Returns:
         pd.DataFrame: DataFrame with artist information. Columns:
@@ -177,45 +200,56 @@ def search_for_artists(
     uri = []
     img_url = []
 
+    # Find artists already in the Spotify catalog
+    cached_artists = {}
+    if spotify_catalog is not None:
+        cached_artists = spotify_catalog.find_artists(artist_names)
+    searched_artists = {}
+
     # Establish search url for artist querying
     search_url = "https://api.spotify.com/v1/search"
 
     # Loop through every artist name to get all artists' info
     for artist_name in artist_names:
-        # Build API query and make the API request
-        # Note: This query can be modified to instead search
-        # for songs, playlists, etc.
-        query = f"?q={artist_name}&type=artist&limit=1"
-        response = requests.get(
-            search_url + query,
-            headers=search_header
-        )
-        artist_info = json.loads(response.content)["artists"]["items"][0]
+        if artist_name in cached_artists:
+            artist = cached_artists[artist_name]
+        else:
+            # Build API query and make the API request
+            # Note: This query can be modified to instead search
+            # for songs, playlists, etc.
+            query = f"?q={artist_name}&type=artist&limit=1"
+            response = requests.get(
+                search_url + query,
+                headers=search_header
+            )
+            artist_info = json.loads(response.content)["artists"]["items"][0]
+            artist = get_artist_info(artist_info)
+            searched_artists[artist_name] = artist
 
         # Prints a warning if result of query isn't exactly
         # what was searched (ex: Tiesto vs Tiësto)
-        name_query_result = artist_info['name']
+        name_query_result = artist['name']
         if name_query_result.upper() != artist_name.upper():
             print(
                 f"Warning: Searching for {artist_name} "
                 f"yielded result {name_query_result}."
             )
 
-        # Extract artist genres and convert to preferred capitalization format
-        genres = artist_info['genres']
-        genres_capitalized = [capitalize_genre(genre) for genre in genres]
+        # Convert artist genres to preferred capitalization format
+        genres_capitalized = [
+            capitalize_genre(genre) for genre in artist['genres']
+        ]
 
-        # Extract and append artist information to lists
+        # Append artist information to lists
         name.append(name_query_result)
-        popularity.append(artist_info['popularity'])
-        uri.append(artist_info['uri'].split(':')[-1])
+        popularity.append(artist['popularity'])
+        uri.append(artist['uri'])
         all_genres.append(genres_capitalized)
+        img_url.append(artist['image_url']) # For image use in GUI
 
-        # Get artist image url for image use in GUI        
-        if artist_info['images']: # If artist has an image
-            img_url.append(artist_info['images'][-1]['url'])
-        else:
-            img_url.append(None)
+    # Write searched artists through to the Spotify catalog
+    if spotify_catalog is not None:
+        spotify_catalog.upsert_artists(searched_artists)
 
     # Create DataFrame from collected information
     df_artists = pd.DataFrame({
@@ -229,6 +263,25 @@ def search_for_artists(
     return df_artists
 
 
+def get_artist_info(artist_info: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Gets the fields of a Spotify API artist object used by search_for_artists
+    (and stored in the Spotify catalog): name, uri (artist ID), popularity,
+    genres (as returned by Spotify) and image_url (smallest image, or None).
+    """
+
+    return {
+        'name': artist_info['name'],
+        'uri': artist_info['uri'].split(':')[-1],
+        'popularity': artist_info['popularity'],
+        'genres': artist_info['genres'],
+        'image_url': (
+            artist_info['images'][-1]['url'] if artist_info['images']
+            else None
+        ),
+    }
+
+
 def retry_spotify_request(func: Callable[..., Any], *args: Tuple) -> Any:
     """
     Helper function to retry a Spotify API request if a rate limit is reached.
@@ -320,7 +373,9 @@ def recommend_artists(
 def get_top_tracks(
     spot: Spotify,
     df_artists: pd.DataFrame,
-    tracks_per_artist: int=10
+    tracks_per_artist: int=10,
+    track_catalog: Optional[Any] = None,
+    spotify_catalog: Optional[Any] = None
 ) -> pd.DataFrame:
     """
     Creates DataFrame containing rows of songs for selected artists.
@@ -330,6 +385,14 @@ def get_top_tracks(
         df_artists (pd.DataFrame): DataFrame containing artist info.
         tracks_per_artist (int, optional): Number of tracks per artist to
             include in playlist.
+        track_catalog (TrackCatalog, optional): Catalog of known tracks (see
+            track_catalog.TrackCatalog). Audio features of tracks in the
+            catalog are read from it instead of requested, and fetched
+            tracks are added to it if it's writable.
+        spotify_catalog (SpotifyCatalog, optional): Local metadata catalog
+            (see spotify_catalog.SpotifyCatalog). Fresh top-track lists and
+            audio features are read from it before the track catalog or the
+            API, and fetched ones are written to it.
 
     Returns:
         pd.DataFrame: DataFrame with song metadata. Columns:
@@ -346,12 +409,67 @@ def get_top_tracks(
             Artist uri - str
             Song uri - str
             Artist Image url - str
+            Song Artists - List[str] (all artists credited on the song)
+            Song isrc - str (International Standard Recording Code, or None)
 
     Note: Track feature descriptions available at:
     https://developer.spotify.com/documentation/web-api/reference/
     get-audio-features
     """
 
+    # Get each artist's top tracks, from the Spotify catalog if fresh
+    unique_artist_uris = list(df_artists['Artist uri'].unique())
+    top_tracks = {}
+    if spotify_catalog is not None:
+        top_tracks = spotify_catalog.get_top_tracks(unique_artist_uris)
+    fetched_top_tracks = {}
+    for artist_uri in unique_artist_uris:
+        if artist_uri not in top_tracks:
+            fetched_top_tracks[artist_uri] = [
+                get_track_info(track)
+                for track in retry_spotify_request(
+                    spot.artist_top_tracks,
+                    artist_uri
+                )['tracks']
+            ]
+    top_tracks.update(fetched_top_tracks)
+
+    # Get the audio features of each track, from the Spotify catalog, then
+    # the track catalog, then the API
+    track_uris = list(dict.fromkeys(
+        track['uri']
+        for artist_uri in unique_artist_uris
+        for track in top_tracks[artist_uri][:tracks_per_artist]
+    ))
+    track_features = {}
+    if spotify_catalog is not None:
+        track_features = spotify_catalog.get_track_features(track_uris)
+    if track_catalog is not None:
+        # Includes tracks the Spotify catalog has no features for
+        uncached_uris = [
+            uri for uri in track_uris if track_features.get(uri) is None
+        ]
+        df_features = track_catalog.get_features(uncached_uris)
+        # Tracks stored without features (Ex: their features weren't found)
+        # are misses
+        has_features = df_features[
+            ['Danceability', 'Energy', 'Tempo', 'Speechiness']
+        ].notna().any(axis=1)
+        for _, feature_row in df_features[
+            (track_catalog.get_rows(uncached_uris) != -1) & has_features
+        ].iterrows():
+            track_features[feature_row['Song uri']] = {
+                'danceability': feature_row['Danceability'],
+                'energy': feature_row['Energy'],
+                'tempo': feature_row['Tempo'],
+                'speechiness': feature_row['Speechiness'],
+            }
+    fetched_features = get_audio_features(
+        spot,
+        [uri for uri in track_uris if uri not in track_features]
+    )
+    track_features.update(fetched_features)
+
     # Initialize lists to store song/track and artist information
 
     # Song/Track general info:
@@ -359,6 +477,8 @@ def get_top_tracks(
     song_popularities = []
     song_durations = []
     song_uris = []
+    song_artists = []
+    song_isrcs = []
 
     # Song/track features:
     danceabilities = []
@@ -375,17 +495,14 @@ def get_top_tracks(
 
     # Iterate through each artist in the DataFrame
     for i, row in df_artists.iterrows():
-        top_tracks = retry_spotify_request(
-            spot.artist_top_tracks,
-            row['Artist uri']
-        )['tracks']
-
-        for track in top_tracks[:tracks_per_artist]:
+        for track in top_tracks[row['Artist uri']][:tracks_per_artist]:
             # Append track info
             songs.append(track['name'])
             song_popularities.append(track['popularity'])
             song_durations.append(track['duration_ms'])
-            song_uris.append(track['uri'].split(':')[-1])
+            song_uris.append(track['uri'])
+            song_artists.append(list(track['artists']))
+            song_isrcs.append(track['isrc'])
 
             # Append artist info for each song row
             artists.append(row['Artist'])
@@ -395,10 +512,7 @@ def get_top_tracks(
             artist_img_url.append(row['Artist Image url'])
 
             # Ensure there are track features, otherwise append None
-            features = retry_spotify_request(
-                spot.audio_features,
-                track['uri']
-            )[0]
+            features = track_features.get(track['uri'])
             if features: # Append track features
                 danceabilities.append(features['danceability'])
                 energies.append(features['energy'])
@@ -429,11 +543,68 @@ def get_top_tracks(
         'Artist uri': artist_uris,
         'Song uri': song_uris,
         'Artist Image url': artist_img_url,
+        'Song Artists': song_artists,
+        'Song isrc': song_isrcs,
     })
+
+    # Write fetched metadata through to the catalogs. The track catalog also
+    # updates known tracks' popularity and duration.
+    if spotify_catalog is not None:
+        spotify_catalog.upsert_top_tracks(fetched_top_tracks)
+        spotify_catalog.upsert_track_features(fetched_features)
+    if track_catalog is not None and track_catalog.writable:
+        track_catalog.add_tracks(df_songs)
     
     return df_songs
 
 
+def get_track_info(track: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Gets the fields of a Spotify API track object used by get_top_tracks
+    (and stored in the Spotify catalog): uri (track ID), name, popularity,
+    duration_ms, isrc and artists (credited artist names).
+    """
+
+    return {
+        'uri': track['uri'].split(':')[-1],
+        'name': track['name'],
+        'popularity': track['popularity'],
+        'duration_ms': track['duration_ms'],
+        'isrc': track.get('external_ids', {}).get('isrc'),
+        'artists': [track_artist['name'] for track_artist in track['artists']],
+    }
+
+
+def get_audio_features(
+    spot: Spotify,
+    track_uris: List[str],
+    batch_size: int = 100
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Gets the audio features of tracks, 100 tracks per request (the most
+    Spotify allows).
+
+    Parameters:
+        spot (Spotify): Authenticated Spotify instance.
+        track_uris (List[str]): Track URIs (or IDs).
+        batch_size (int): Tracks per request.
+
+    Returns:
+        Dict[str, Optional[Dict[str, Any]]]: Features of each track (None if
+            Spotify has no features for it). Tracks of failed requests are
+            left out.
+    """
+
+    track_features = {}
+    for i in range(0, len(track_uris), batch_size):
+        batch_uris = track_uris[i : i + batch_size]
+        batch_features = retry_spotify_request(spot.audio_features, batch_uris)
+        if batch_features is not None:
+            track_features.update(zip(batch_uris, batch_features))
+
+    return track_features
+
+
 def create_playlist(
     playlist_name: str,
     spot: Spotify,
@@ -451,6 +622,13 @@ def create_playlist(
         str: URI of the created playlist
     """
 
+    # Fail before creating a half-built playlist
+    if len(df_songs) > MAX_PLAYLIST_SIZE:
+        raise ValueError(
+            f"{len(df_songs)} songs exceeds Spotify's {MAX_PLAYLIST_SIZE} song "
+            "playlist limit. Use create_sharded_playlists instead."
+        )
+
     # Get the user's Spotify ID
     user = os.getenv("SPOTIFY_USER")
 
@@ -473,4 +651,238 @@ def create_playlist(
         batch_uris = song_uris[i : i + batch_size]
         spot.playlist_add_items(playlist_uri, batch_uris)
 
-    return playlist_uri
\ No newline at end of file
+    return playlist_uri
+
+
+def split_into_shards(
+    df_songs: pd.DataFrame,
+    shard_by: Optional[str] = None,
+    max_shard_size: int = MAX_PLAYLIST_SIZE
+) -> List[Tuple[str, pd.DataFrame]]:
+    """
+    Splits songs into shards that each fit in one Spotify playlist.
+
+    Parameters:
+        df_songs (pd.DataFrame): DataFrame with song and artist metadata.
+        shard_by (str, optional): How to split songs:
+            None - by size only, keeping song order.
+            'genre' - by each artist's first genre. Genres are packed into as
+                few shards as possible, and an artist's songs stay together.
+            Any other column name (Ex: 'Day' or 'Stage') - one shard per value.
+            Shards over max_shard_size are split further by size.
+        max_shard_size (int): Max songs per shard.
+
+    Returns:
+        List[Tuple[str, pd.DataFrame]]: (shard name, shard songs) pairs. Shard
+            names are used as playlist name suffixes (Ex: 'Part 2', 'Day 1').
+    """
+
+    if shard_by is None:
+        groups = [("", df_songs)]
+
+    elif shard_by == 'genre':
+        # Pack genre groups into shards, largest first (first-fit decreasing)
+        primary_genres = df_songs['Artist Genres'].map(get_primary_genre)
+        genre_sizes = primary_genres.value_counts(sort=False).sort_values(
+            ascending=False, kind='stable'
+        )
+        shard_genres, shard_sizes = [], []
+        for genre, size in genre_sizes.items():
+            for i, shard_size in enumerate(shard_sizes):
+                if shard_size + size <= max_shard_size:
+                    shard_genres[i].append(genre)
+                    shard_sizes[i] += size
+                    break
+            else:
+                shard_genres.append([genre])
+                shard_sizes.append(size)
+        groups = [
+            (" / ".join(genres[:3]) + (" +" if len(genres) > 3 else ""),
+             df_songs[primary_genres.isin(genres)])
+            for genres in shard_genres
+        ]
+
+    else:
+        groups = [
+            (str(value), df_group)
+            for value, df_group in df_songs.groupby(shard_by, sort=True)
+        ]
+
+    # Split oversized groups by size
+    shards = []
+    for group_name, df_group in groups:
+        num_parts = -(-len(df_group) // max_shard_size)
+        for part in range(num_parts):
+            shard_name = group_name
+            if num_parts > 1:
+                shard_name = f"{group_name} Part {part + 1}".strip()
+            shards.append((
+                shard_name,
+                df_group.iloc[part * max_shard_size : (part + 1) * max_shard_size]
+            ))
+
+    return shards
+
+
+def get_primary_genre(artist_genres: Any) -> str:
+    """
+    Gets an artist's first genre, for an 'Artist Genres' list or its string
+    form when read from .csv (see playlist_io.parse_list). Returns 'Other'
+    for artists without genres, or with missing or unparsable genres.
+    """
+
+    if isinstance(artist_genres, str):
+        artist_genres = parse_list(artist_genres)
+    if isinstance(artist_genres, np.ndarray):
+        artist_genres = artist_genres.tolist() # From Arrow list columns
+    if (
+        not isinstance(artist_genres, (list, tuple))
+        or not artist_genres
+        or not isinstance(artist_genres[0], str)
+        or not artist_genres[0]
+    ):
+        return 'Other'
+    return artist_genres[0]
+
+
+def create_sharded_playlists(
+    playlist_name: str,
+    spot: Spotify,
+    df_songs: pd.DataFrame,
+    shard_by: Optional[str] = None,
+    max_shard_size: int = MAX_PLAYLIST_SIZE,
+    max_workers: int = 4,
+    on_failure: str = 'rollback',
+    state_path: Optional[str] = None
+) -> List[str]:
+    """
+    Creates one Spotify playlist per shard of df_songs (see split_into_shards)
+    for playlists too long for a single Spotify playlist.
+
+    Shards are created concurrently, each adding its songs in sequential
+    batches of 100. If a batch fails:
+        on_failure='rollback' - all playlists created by this call are
+            unfollowed (deleted from the user's library) and an error raised.
+        on_failure='resume' - progress is saved to state_path and an error
+            raised. Calling again with the same arguments and state_path
+            reuses the created playlists and only adds the missing songs.
+
+    Parameters:
+        playlist_name (str): Name of the new playlists. Shard names are
+            appended (Ex: 'Festival (Part 2)').
+        spot (Spotify): Authenticated Spotify instance.
+        df_songs (pd.DataFrame): DataFrame with song and artist metadata.
+        shard_by (str, optional): See split_into_shards.
+        max_shard_size (int): Max songs per playlist.
+        max_workers (int): Max shards created at once.
+        on_failure (str): 'rollback' or 'resume'.
+        state_path (str, optional): .json file storing progress for
+            on_failure='resume'. Removed once all shards are complete.
+
+    Returns:
+        List[str]: URIs of the created playlists, in shard order.
+    """
+
+    if on_failure not in ('rollback', 'resume'):
+        raise ValueError("on_failure must be 'rollback' or 'resume'")
+    if on_failure == 'resume' and state_path is None:
+        raise ValueError("state_path is required for on_failure='resume'")
+
+    shards = split_into_shards(df_songs, shard_by, max_shard_size)
+
+    # Load progress of a previous failed run
+    state = {}
+    if on_failure == 'resume' and os.path.exists(state_path):
+        with open(state_path) as f:
+            state = json.load(f)
+    state_lock = Lock()
+
+    def save_state() -> None:
+        if on_failure == 'resume':
+            with state_lock, open(state_path, 'w') as f:
+                json.dump(state, f, indent=2)
+
+    def create_shard(shard_num: int, shard_name: str, song_uris: List[str]) -> str:
+        shard_playlist_name = f"{playlist_name} ({shard_name})"
+        shard_state = state[shard_playlist_name]
+        if shard_state['uri'] is None:
+            playlist = retry_spotify_request(
+                spot.user_playlist_create,
+                os.getenv("SPOTIFY_USER"),
+                shard_playlist_name,
+                True,
+                False,
+                f'Created using Spotipy. Part {shard_num} of {len(shards)}.'
+            )
+            if playlist is None:
+                raise RuntimeError(f"Failed to create {shard_playlist_name}")
+            shard_state['uri'] = playlist['uri']
+            save_state()
+
+        # Add songs to playlist in batches of 100, continuing after any songs
+        # added by a previous run
+        batch_size = 100
+        for i in range(shard_state['num_added'], len(song_uris), batch_size):
+            batch_uris = song_uris[i : i + batch_size]
+            if retry_spotify_request(
+                spot.playlist_add_items, shard_state['uri'], batch_uris
+            ) is None:
+                raise RuntimeError(
+                    f"Failed to add songs {i}-{i + len(batch_uris)} to "
+                    f"{shard_playlist_name}"
+                )
+            shard_state['num_added'] = i + len(batch_uris)
+            save_state()
+
+        return shard_state['uri']
+
+    # Name shards 'Part N' when splitting by size only
+    shard_names = [
+        shard_name or f"Part {shard_num}"
+        for shard_num, (shard_name, _) in enumerate(shards, start=1)
+    ]
+    for shard_name in shard_names:
+        state.setdefault(
+            f"{playlist_name} ({shard_name})", {'uri': None, 'num_added': 0}
+        )
+
+    playlist_uris = [None] * len(shards)
+    errors = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                create_shard,
+                shard_num,
+                shard_name,
+                df_shard['Song uri'].tolist()
+            ): shard_num - 1
+            for shard_num, (shard_name, (_, df_shard)) in enumerate(
+                zip(shard_names, shards), start=1
+            )
+        }
+        for future in as_completed(futures):
+            try:
+                playlist_uris[futures[future]] = future.result()
+            except Exception as e:
+                errors.append(e)
+
+    if errors:
+        if on_failure == 'rollback':
+            for shard_state in state.values():
+                if shard_state['uri'] is not None:
+                    retry_spotify_request(
+                        spot.current_user_unfollow_playlist,
+                        shard_state['uri'].split(':')[-1]
+                    )
+            raise RuntimeError(
+                f"Sharded playlist creation failed and was rolled back: {errors}"
+            )
+        raise RuntimeError(
+            f"Sharded playlist creation failed. Progress saved to "
+            f"{state_path}; call again to resume: {errors}"
+        )
+
+    if on_failure == 'resume' and os.path.exists(state_path):
+        os.remove(state_path)
+
+    return playlist_uris
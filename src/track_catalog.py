@@ -0,0 +1,436 @@
+###############################################################################
+#
+# This file contains TrackCatalog, an on-disk catalog of every resolved track
+# (song URI -> popularity, duration and audio features), shared across runs
+# so features are only fetched once per track:
+#   - Features are stored as fixed-width NumPy arrays in memory-mapped .npy
+#      files, so opening the catalog takes milliseconds regardless of its size
+#      and columns are read without copying
+#   - A URI -> row hash index (open addressing, also memory-mapped) finds
+#      tracks without loading the URIs into a dict
+#   - add_tracks appends newly fetched tracks (or updates known ones)
+#   - fill_missing_features fills missing song features from the catalog
+#
+# Catalog folder contents:
+#   uris.npy      - (capacity,) fixed-width bytes, song URIs (Spotify IDs)
+#   features.npy  - (len(TRACK_COLUMNS), capacity) float64, NaN if missing
+#   index.npy     - (num_slots,) int64 hash table of rows, -1 if empty
+#   catalog.json  - number of tracks, written last when saving
+#
+# Rows past the number of tracks in catalog.json (Ex: from an interrupted
+# append) are ignored. Only one process should write to a catalog at a time.
+#
+###############################################################################
+
+import json
+import os
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+TRACK_CATALOG_DIR = "output/track_catalog"
+
+# Stored song columns, in features.npy row order
+TRACK_COLUMNS = (
+    "Song Popularity",
+    "Song Duration",
+    "Danceability",
+    "Energy",
+    "Tempo",
+    "Speechiness",
+)
+URI_WIDTH = 22 # Spotify IDs are 22 characters
+INITIAL_CAPACITY = 1024
+MAX_LOAD_FACTOR = 0.5 # Max tracks per index slot
+
+# FNV-1a (64-bit) hash constants
+FNV_OFFSET_BASIS = np.uint64(14695981039346656037)
+FNV_PRIME = np.uint64(1099511628211)
+
+
+class TrackCatalog():
+    """
+    Memory-mapped catalog of track features, keyed by song URI.
+
+    Ex:
+        track_catalog = TrackCatalog(writable=True)
+        track_catalog.add_tracks(df_songs)
+        tempos = track_catalog.column("Tempo") # No copy
+        df_features = track_catalog.get_features(df_songs["Song uri"])
+    """
+
+    def __init__(
+        self,
+        catalog_dir: str = TRACK_CATALOG_DIR,
+        writable: bool = False
+    ) -> None:
+        """
+        Opens a catalog (only the .npy headers are read).
+
+        Parameters:
+            catalog_dir (str): Catalog folder.
+            writable (bool): If True, tracks can be added and a new catalog
+                is created if catalog_dir has none. If False, catalog_dir must
+                contain a catalog.
+        """
+
+        self.catalog_dir = catalog_dir
+        self.writable = writable
+
+        if not os.path.isfile(self._get_path("catalog.json")):
+            if not writable:
+                raise FileNotFoundError(f"No track catalog in {catalog_dir}")
+            os.makedirs(catalog_dir, exist_ok=True)
+            self._create_files(INITIAL_CAPACITY)
+            self.num_tracks = 0
+            self._save_header()
+
+        with open(self._get_path("catalog.json")) as file:
+            header = json.load(file)
+        if tuple(header["columns"]) != TRACK_COLUMNS:
+            raise ValueError(
+                f"Track catalog columns {header['columns']} don't match "
+                f"{list(TRACK_COLUMNS)}"
+            )
+        self.num_tracks = header["num_tracks"]
+        self._open_files()
+
+    def __len__(self) -> int:
+        return self.num_tracks
+
+    def __contains__(self, uri: str) -> bool:
+        return self.get_rows([uri])[0] != -1
+
+    @property
+    def capacity(self) -> int:
+        """Number of tracks that fit before the files are grown."""
+        return len(self._uris)
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Gets one column (see TRACK_COLUMNS) of all tracks, in row order, as
+        a read-only view of the memory-mapped file (no copy).
+        """
+
+        values = self._features[TRACK_COLUMNS.index(name), :self.num_tracks]
+        values = values.view()
+        values.flags.writeable = False
+        return values
+
+    def get_uris(self) -> List[str]:
+        """Gets the song URIs of all tracks, in row order."""
+        return [uri.decode() for uri in self._uris[:self.num_tracks]]
+
+    def get_rows(self, uris: Iterable[str]) -> np.ndarray:
+        """
+        Looks up tracks in the hash index.
+
+        Parameters:
+            uris (Iterable[str]): Song URIs.
+
+        Returns:
+            np.ndarray: Row of each URI (int64), or -1 if not in the catalog.
+        """
+
+        uris = encode_uris(uris)
+        rows = np.full(len(uris), -1, dtype=np.int64)
+        if not len(uris) or not self.num_tracks:
+            return rows
+
+        # Probe all URIs at once, advancing the ones not resolved yet
+        mask = np.uint64(len(self._index) - 1)
+        slots = hash_uris(uris) & mask
+        pending = np.arange(len(uris))
+        while len(pending):
+            slot_rows = self._index[slots[pending]]
+            is_empty = slot_rows == -1
+            is_match = np.zeros(len(pending), dtype=bool)
+            is_valid = ~is_empty & (slot_rows < self.num_tracks)
+            is_match[is_valid] = (
+                self._uris[slot_rows[is_valid]] == uris[pending[is_valid]]
+            )
+            rows[pending[is_match]] = slot_rows[is_match]
+
+            pending = pending[~is_empty & ~is_match]
+            slots[pending] = (slots[pending] + np.uint64(1)) & mask
+
+        return rows
+
+    def get_features(
+        self,
+        uris: Iterable[str],
+        columns: Sequence[str] = TRACK_COLUMNS
+    ) -> pd.DataFrame:
+        """
+        Gets features of tracks by URI.
+
+        Parameters:
+            uris (Iterable[str]): Song URIs.
+            columns (Sequence[str]): Columns to get (see TRACK_COLUMNS).
+
+        Returns:
+            pd.DataFrame: One row per URI (in uris order), with columns
+                'Song uri' and columns. Values are NaN for tracks not in the
+                catalog.
+        """
+
+        uris = list(uris)
+        rows = self.get_rows(uris)
+        is_found = rows != -1
+
+        df_features = pd.DataFrame({"Song uri": uris})
+        for name in columns:
+            values = np.full(len(uris), np.nan)
+            values[is_found] = self.column(name)[rows[is_found]]
+            df_features[name] = values
+
+        return df_features
+
+    def add_tracks(self, df_songs: pd.DataFrame) -> int:
+        """
+        Appends new tracks and updates the features of known tracks, then
+        saves the catalog.
+
+        Parameters:
+            df_songs (pd.DataFrame): Songs with column 'Song uri' and any of
+                TRACK_COLUMNS (missing columns and values are stored as NaN
+                for new tracks, and leave known tracks' values unchanged).
+                If a URI repeats, its last row is used.
+
+        Returns:
+            int: Number of new tracks.
+        """
+
+        if not self.writable:
+            raise PermissionError("Track catalog was opened read-only")
+
+        df_songs = df_songs.drop_duplicates("Song uri", keep="last")
+        uris = encode_uris(df_songs["Song uri"])
+        features = np.full((len(TRACK_COLUMNS), len(uris)), np.nan)
+        for i, name in enumerate(TRACK_COLUMNS):
+            if name in df_songs.columns:
+                features[i] = pd.to_numeric(
+                    df_songs[name], errors="coerce"
+                ).to_numpy(dtype=float, na_value=np.nan)
+
+        # Update known tracks in place, keeping values missing from df_songs
+        rows = self.get_rows(df_songs["Song uri"])
+        is_known = rows != -1
+        known_features = features[:, is_known]
+        self._features[:, rows[is_known]] = np.where(
+            np.isnan(known_features),
+            self._features[:, rows[is_known]],
+            known_features
+        )
+
+        # Append new tracks, growing the files if needed
+        is_new = ~is_known
+        num_new = int(is_new.sum())
+        if self.num_tracks + num_new > self.capacity:
+            self._grow(self.num_tracks + num_new)
+        new_rows = np.arange(self.num_tracks, self.num_tracks + num_new)
+        self._uris[new_rows] = uris[is_new]
+        self._features[:, new_rows] = features[:, is_new]
+        insert_rows(self._index, hash_uris(uris[is_new]), new_rows)
+
+        self.num_tracks += num_new
+        self.flush()
+
+        return num_new
+
+    def flush(self) -> None:
+        """Writes changes to disk, then the number of tracks."""
+
+        if self.writable:
+            for array in (self._uris, self._features, self._index):
+                array.flush()
+            self._save_header()
+
+    def _get_path(self, file_name: str) -> str:
+        return os.path.join(self.catalog_dir, file_name)
+
+    def _open_files(self) -> None:
+        """Memory-maps the catalog files."""
+
+        mmap_mode = "r+" if self.writable else "r"
+        self._uris = np.load(self._get_path("uris.npy"), mmap_mode=mmap_mode)
+        self._features = np.load(
+            self._get_path("features.npy"), mmap_mode=mmap_mode
+        )
+        self._index = np.load(self._get_path("index.npy"), mmap_mode=mmap_mode)
+
+    def _create_files(
+        self,
+        capacity: int,
+        uris: Optional[np.ndarray] = None,
+        features: Optional[np.ndarray] = None
+    ) -> None:
+        """
+        Creates the catalog files with room for capacity tracks, holding uris
+        and features (if given) in their first rows, and indexes them.
+        """
+
+        num_tracks = 0 if uris is None else len(uris)
+        num_slots = get_num_slots(capacity)
+
+        new_uris = np.lib.format.open_memmap(
+            self._get_path("uris.npy"),
+            mode="w+",
+            dtype=f"S{URI_WIDTH}",
+            shape=(capacity,)
+        )
+        new_features = np.lib.format.open_memmap(
+            self._get_path("features.npy"),
+            mode="w+",
+            dtype=np.float64,
+            shape=(len(TRACK_COLUMNS), capacity)
+        )
+        new_features[:] = np.nan
+        new_index = np.lib.format.open_memmap(
+            self._get_path("index.npy"),
+            mode="w+",
+            dtype=np.int64,
+            shape=(num_slots,)
+        )
+        new_index[:] = -1
+
+        if num_tracks:
+            new_uris[:num_tracks] = uris
+            new_features[:, :num_tracks] = features
+            insert_rows(new_index, hash_uris(uris), np.arange(num_tracks))
+
+        for array in (new_uris, new_features, new_index):
+            array.flush()
+
+    def _grow(self, min_capacity: int) -> None:
+        """Rewrites the catalog files with at least min_capacity rows."""
+
+        capacity = self.capacity
+        while capacity < min_capacity:
+            capacity *= 2
+
+        # Copy the tracks and release the memory maps before replacing the
+        # files (open memory-mapped files can't be replaced on Windows)
+        uris = np.array(self._uris[:self.num_tracks])
+        features = np.array(self._features[:, :self.num_tracks])
+        del self._uris, self._features, self._index
+
+        self._create_files(capacity, uris, features)
+        self._open_files()
+
+    def _save_header(self) -> None:
+        """Saves catalog.json (replacing it atomically)."""
+
+        temp_path = self._get_path("catalog.json.tmp")
+        with open(temp_path, "w") as file:
+            json.dump(
+                {
+                    "num_tracks": self.num_tracks,
+                    "columns": list(TRACK_COLUMNS),
+                },
+                file
+            )
+        os.replace(temp_path, self._get_path("catalog.json"))
+
+
+def fill_missing_features(
+    df_songs: pd.DataFrame,
+    track_catalog: TrackCatalog
+) -> pd.DataFrame:
+    """
+    Fills missing (NaN or absent) TRACK_COLUMNS of df_songs from the catalog.
+
+    Parameters:
+        df_songs (pd.DataFrame): Songs with column 'Song uri'.
+        track_catalog (TrackCatalog): Catalog to read features from.
+
+    Returns:
+        pd.DataFrame: Copy of df_songs with missing features filled where the
+            catalog has them.
+    """
+
+    df_songs = df_songs.copy()
+    df_features = track_catalog.get_features(df_songs["Song uri"])
+    for name in TRACK_COLUMNS:
+        catalog_values = df_features[name].to_numpy()
+        if name not in df_songs.columns:
+            df_songs[name] = catalog_values
+        elif df_songs[name].isna().any():
+            df_songs[name] = df_songs[name].fillna(
+                pd.Series(catalog_values, index=df_songs.index)
+            )
+
+    return df_songs
+
+
+def encode_uris(uris: Iterable[str]) -> np.ndarray:
+    """
+    Encodes song URIs as fixed-width bytes, as stored in uris.npy. Full URIs
+    (Ex: 'spotify:track:<id>') are stored as their ID.
+    """
+
+    ids = [str(uri).split(":")[-1] for uri in uris]
+    too_long = [song_id for song_id in ids if len(song_id) > URI_WIDTH]
+    if too_long:
+        raise ValueError(
+            f"Song URIs longer than {URI_WIDTH} characters: {too_long[:3]}"
+        )
+
+    return np.array(ids, dtype=f"S{URI_WIDTH}")
+
+
+def hash_uris(uris: np.ndarray) -> np.ndarray:
+    """
+    Hashes encoded URIs (see encode_uris) with FNV-1a, one byte column at a
+    time across all URIs. Unlike hash(), the result is the same in every
+    process, so it can be stored in the index.
+    """
+
+    uri_bytes = uris.view(np.uint8).reshape(len(uris), URI_WIDTH)
+    hashes = np.full(len(uris), FNV_OFFSET_BASIS, dtype=np.uint64)
+    for i in range(URI_WIDTH):
+        hashes ^= uri_bytes[:, i].astype(np.uint64)
+        hashes *= FNV_PRIME # Wraps around on overflow
+
+    return hashes
+
+
+def insert_rows(
+    index: np.ndarray,
+    hashes: np.ndarray,
+    rows: np.ndarray
+) -> None:
+    """
+    Inserts rows into the hash index (linear probing). In each round, every
+    pending row takes its slot if the slot is empty and no other pending row
+    wants it; the rest move to the next slot.
+
+    Parameters:
+        index (np.ndarray): Hash table of rows, -1 for empty slots. Its
+            length must be a power of 2 with room for all rows.
+        hashes (np.ndarray): Hash of each row's URI (see hash_uris).
+        rows (np.ndarray): Rows to insert.
+    """
+
+    mask = np.uint64(len(index) - 1)
+    slots = hashes & mask
+    pending = np.arange(len(rows))
+    while len(pending):
+        pending_slots = slots[pending]
+        is_empty = index[pending_slots] == -1
+        _, first_indexes = np.unique(
+            pending_slots[is_empty], return_index=True
+        )
+        inserted = pending[is_empty][first_indexes]
+        index[slots[inserted]] = rows[inserted]
+
+        # Every other pending row's slot is now taken
+        pending = np.setdiff1d(pending, inserted, assume_unique=True)
+        slots[pending] = (slots[pending] + np.uint64(1)) & mask
+
+
+def get_num_slots(capacity: int) -> int:
+    """Index size for capacity tracks: a power of 2, at most half full."""
+    return 1 << int(np.ceil(np.log2(capacity / MAX_LOAD_FACTOR)))
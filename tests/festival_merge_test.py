@@ -0,0 +1,133 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+
+from src.festival_merge import (
+    FestivalPlaylistMerger, find_festival_song_files, get_festival_name,
+    merge_festival_playlists,
+)
+from src.playlist_io import load_df, save_songs
+
+class TestFestivalMerge(unittest.TestCase):
+    def setUp(self):
+        self.df1 = pd.read_csv(
+            "output/sample_data/EdcOrlando2023FullSongs.csv"
+        ) # Large df w/ len>1,000
+        self.df_unique = self.df1.drop_duplicates("Song uri")
+
+    def test_uri_dedupe(self):
+        merger = FestivalPlaylistMerger()
+        merger.add(self.df_unique, "Festival A")
+        num_songs = len(merger)
+        self.assertLessEqual(num_songs, len(self.df_unique))
+
+        # The same songs from another festival are all removed
+        merger.add(self.df_unique, "Festival B")
+        self.assertEqual(len(merger), num_songs)
+        self.assertEqual(len(merger.merged()), num_songs)
+        self.assertEqual(
+            len(merger.removed_songs), 2 * len(self.df_unique) - num_songs
+        )
+
+    def test_signature_dedupe(self):
+        merger = FestivalPlaylistMerger(duration_tolerance_ms=5000)
+        merger.add(self.df_unique, "Festival A")
+        num_songs = len(merger)
+
+        # Re-releases (new URIs, durations within tolerance) are removed
+        df_rereleases = merger.merged().head(5).assign(**{
+            "Song uri": [f"new_uri{i}" for i in range(5)],
+            "Song Duration": lambda df: df["Song Duration"] + 3000,
+        }).drop(columns="Artist Festival Count")
+        merger.add(df_rereleases, "Festival B")
+        self.assertEqual(len(merger), num_songs)
+
+        # Songs with the same title but a different duration are kept
+        df_other_versions = df_rereleases.assign(**{
+            "Song uri": [f"other_uri{i}" for i in range(5)],
+            "Song Duration": lambda df: df["Song Duration"] + 60000,
+        })
+        merger.add(df_other_versions, "Festival C")
+        self.assertEqual(len(merger), num_songs + 5)
+
+    def test_artist_festival_count(self):
+        artists = self.df_unique["Artist"].unique()
+        df_festival_b = self.df_unique[
+            self.df_unique["Artist"].isin(artists[:10])
+        ]
+        df_merged = (
+            FestivalPlaylistMerger()
+            .add(self.df_unique, "Festival A")
+            .add(df_festival_b, "Festival B")
+            .merged()
+        )
+
+        expected_counts = df_merged["Artist"].isin(artists[:10]) + 1
+        self.assertTrue(
+            (df_merged["Artist Festival Count"] == expected_counts).all()
+        )
+
+        # Artists playing more festivals are ranked first
+        self.assertTrue(
+            df_merged["Artist Festival Count"].is_monotonic_decreasing
+        )
+        df_unranked = (
+            FestivalPlaylistMerger()
+            .add(self.df_unique, "Festival A")
+            .merged(rank_by_festival_count=False)
+        )
+        kept_uris = self.df_unique["Song uri"].isin(df_unranked["Song uri"])
+        self.assertEqual(
+            df_unranked["Song uri"].tolist(),
+            self.df_unique.loc[kept_uris, "Song uri"].tolist()
+        ) # Added order
+
+    def test_add_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            folder_path = os.path.join(
+                temp_dir, "EdcOrlando2023Summary_Created2024-01-10"
+            )
+            os.makedirs(folder_path)
+            csv_path = os.path.join(folder_path, "playlist_songs.csv")
+            self.df1.to_csv(csv_path, index=False)
+            df_expected = (
+                FestivalPlaylistMerger()
+                .add(load_df(csv_path), "EdcOrlando2023")
+                .merged()
+            )
+
+            self.assertEqual(get_festival_name(csv_path), "EdcOrlando2023")
+
+            # Streaming in small chunks matches adding the whole DataFrame
+            merger = FestivalPlaylistMerger().add_file(csv_path, chunksize=100)
+            self.assertEqual(merger.festivals, {"EdcOrlando2023"})
+            pd.testing.assert_frame_equal(merger.merged(), df_expected)
+
+            # Parquet files are preferred, and stream the same songs
+            parquet_path = os.path.join(folder_path, "playlist_songs.parquet")
+            save_songs(load_df(csv_path), parquet_path)
+            self.assertEqual(find_festival_song_files(temp_dir), [parquet_path])
+            pd.testing.assert_frame_equal(
+                merge_festival_playlists([parquet_path], chunksize=100),
+                df_expected
+            )
+
+    def test_iter_uri_batches(self):
+        merger = FestivalPlaylistMerger().add(self.df1, "Festival A")
+        batches = list(merger.iter_uri_batches())
+        song_uris = merger.merged()["Song uri"].tolist()
+
+        self.assertEqual(len(batches), -(-len(song_uris) // 100))
+        self.assertTrue(all(len(batch) == 100 for batch in batches[:-1]))
+        self.assertLessEqual(len(batches[-1]), 100)
+        self.assertEqual(sum(batches, []), song_uris)
+
+        self.assertTrue(all(
+            len(batch) <= 30 for batch in merger.iter_uri_batches(30)
+        ))
+
+
+if __name__ == "__main__":
+    unittest.main()
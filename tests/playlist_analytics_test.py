@@ -0,0 +1,232 @@
+import base64
+import gzip
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.playlist_analytics import (
+    DENSITY_MIN_SONGS, MAX_PLOT_POINTS, WEBGL_MIN_SONGS,
+    analyze_feature_trends, compress_to_base64, create_dashboard_data_json,
+    create_large_feature_plot, get_artist_color_map, get_artist_summary_table,
+    get_artist_summary_table_json, get_content_hash, get_render_mode,
+    get_template_environment, iter_html_table_rows,
+)
+
+class TestPlaylistAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.df1 = pd.read_csv(
+            "output/sample_data/EdcOrlando2023FullSongs.csv"
+        ) # Large df w/ len>1,000
+
+    def test_analyze_feature_trends(self):
+        feature_trends = analyze_feature_trends(self.df1)
+        self.assertEqual(
+            list(feature_trends),
+            ["Tempo", "Danceability", "Energy", "Speechiness"]
+        )
+
+        for feature, feature_trend in feature_trends.items():
+            feature_range = 30 if feature == "Tempo" else 0.3
+            mean = self.df1[feature].mean()
+            lower_bound = max(mean - feature_range / 2, 0)
+            upper_bound = mean + feature_range / 2
+            if feature != "Tempo":
+                upper_bound = min(upper_bound, 1)
+            percent_within_range = round(
+                self.df1[feature].between(lower_bound, upper_bound).mean() * 100
+            )
+
+            self.assertAlmostEqual(feature_trend.mean, mean)
+            self.assertEqual(
+                feature_trend.percent_within_range, percent_within_range
+            )
+            self.assertEqual(feature_trend.has_trend, percent_within_range >= 79)
+            self.assertEqual(
+                feature_trend.histogram_counts.sum(),
+                self.df1[feature].notna().sum()
+            )
+            self.assertAlmostEqual(
+                feature_trend.quantiles[0.5], self.df1[feature].median()
+            )
+
+        # Clipped bounds are shown as ints in trend messages
+        speechiness_trend = feature_trends["Speechiness"]
+        self.assertTrue(
+            speechiness_trend.trend_details_msg.startswith(
+                f"{speechiness_trend.percent_within_range}% of songs within 0 - "
+            )
+        )
+
+    def test_get_artist_summary_table(self):
+        df_songs = pd.DataFrame({
+            "Artist": ["B", "A", "B"],
+            "Song Duration": [200_500, 61_000, 100_000],
+            "Artist Popularity": [50, 70, 50],
+            "Artist Genres": [["House", "EDM"], [], ["House", "EDM"]],
+            "Tempo": [120.0, 128.4, 125.0],
+            "Danceability": [0.5, 0.123, 0.6],
+            "Energy": [0.7, 0.5, 0.8],
+            "Speechiness": [0.05, 0.1, 0.04],
+        })
+        df_artist_summary_table = get_artist_summary_table(df_songs)
+        self.assertEqual(
+            df_artist_summary_table.values.tolist(),
+            [
+                ["A", 1, "1 min 1 sec", 70, "", 128, 0.12, 0.5, 0.1],
+                ["B", 2, "5 min 0 sec", 50, "House, EDM", 122, 0.55, 0.75,
+                 0.04],
+            ]
+        )
+
+    def test_artist_summary_table_template(self):
+        df_songs = self.df1.copy()
+        df_songs["Artist Genres"] = df_songs["Artist Genres"].apply(eval)
+        df_songs.loc[df_songs.index[:3], "Artist Popularity"] = np.nan
+        df_songs.loc[df_songs.index[0], "Artist"] = "<Artist> & Co"
+        df_artist_summary_table = get_artist_summary_table(df_songs)
+
+        table_template = get_template_environment().get_template(
+            "artist_summary_table.html"
+        )
+        table_html = table_template.render(
+            artist_summary_table_columns=df_artist_summary_table.columns,
+            artist_summary_table_rows=iter_html_table_rows(
+                df_artist_summary_table
+            ),
+        )
+        self.assertEqual(
+            table_html.strip(),
+            df_artist_summary_table.to_html(
+                header=True, justify="center", classes="table", index=False
+            )
+        )
+
+    def test_get_artist_summary_table_json(self):
+        df_songs = self.df1.copy()
+        df_songs["Artist Genres"] = df_songs["Artist Genres"].apply(eval)
+        df_songs.loc[df_songs.index[0], "Artist"] = "</script> & Co"
+        df_artist_summary_table = get_artist_summary_table(df_songs)
+
+        table_json = get_artist_summary_table_json(df_artist_summary_table)
+        self.assertNotIn("</", table_json)
+        table = json.loads(table_json)
+        self.assertEqual(
+            table["columns"], list(df_artist_summary_table.columns)
+        )
+        self.assertEqual(
+            table["decimals"], [None, None, None, None, None, None, 2, 2, 2]
+        )
+        self.assertEqual(table["rows"], df_artist_summary_table.values.tolist())
+
+    def test_create_dashboard_data_json(self):
+        x = [59, 59, 34, 63]
+        songs = [["Song 1"], ["Song 2"], ["Song 3"], ["Song 4"]]
+        feature_plots_json = {
+            f"{feature}_plot": json.dumps({
+                "data": [
+                    {"x": x, "y": [i, i + 1, i + 2, i + 3],
+                     "customdata": songs},
+                    {"x": [1, 2], "y": [i, i]},
+                ],
+                "layout": {"title": {"text": feature}},
+            })
+            for i, feature in enumerate(["tempo", "energy"])
+        }
+
+        dashboard_data = json.loads(create_dashboard_data_json(
+            feature_plots_json, '{"columns":[],"decimals":[],"rows":[]}'
+        ))
+        # x and customdata are stored once, as are the distinct y arrays
+        self.assertEqual(len(dashboard_data["arrays"]), 4)
+        self.assertEqual(dashboard_data["artist_table"]["rows"], [])
+
+        def resolve_refs(value):
+            if isinstance(value, list):
+                return [resolve_refs(item) for item in value]
+            if isinstance(value, dict):
+                if list(value) == ["$ref"]:
+                    return dashboard_data["arrays"][value["$ref"]]
+                return {key: resolve_refs(item) for key, item in value.items()}
+            return value
+
+        for plot_id, fig_json in feature_plots_json.items():
+            self.assertEqual(
+                resolve_refs(dashboard_data["plots"][plot_id]),
+                json.loads(fig_json)
+            )
+
+        compressed = compress_to_base64("</script> dashboard")
+        self.assertEqual(compressed, compress_to_base64("</script> dashboard"))
+        self.assertEqual(
+            gzip.decompress(base64.b64decode(compressed)).decode(),
+            "</script> dashboard"
+        )
+
+    def test_get_content_hash(self):
+        columns = ["Song Popularity", "Tempo", "Artist", "Artist Genres"]
+        content_hash = get_content_hash(self.df1, columns, render_mode="auto")
+        self.assertEqual(
+            content_hash,
+            get_content_hash(self.df1.copy(), columns, render_mode="auto")
+        )
+
+        # Changes to depended-on columns or parameters change the hash
+        df_changed = self.df1.copy()
+        df_changed.loc[0, "Tempo"] += 1
+        self.assertNotEqual(
+            content_hash,
+            get_content_hash(df_changed, columns, render_mode="auto")
+        )
+        self.assertNotEqual(
+            content_hash,
+            get_content_hash(self.df1, columns, render_mode="webgl")
+        )
+
+        # Changes to other columns don't
+        df_changed = self.df1.copy()
+        df_changed["Energy"] = 0
+        self.assertEqual(
+            content_hash,
+            get_content_hash(df_changed, columns, render_mode="auto")
+        )
+
+    def test_get_render_mode(self):
+        self.assertEqual(get_render_mode(WEBGL_MIN_SONGS - 1), "svg")
+        self.assertEqual(get_render_mode(WEBGL_MIN_SONGS), "webgl")
+        self.assertEqual(get_render_mode(DENSITY_MIN_SONGS - 1), "webgl")
+        self.assertEqual(get_render_mode(DENSITY_MIN_SONGS), "density")
+
+        # Explicit modes are used regardless of playlist size
+        self.assertEqual(get_render_mode(DENSITY_MIN_SONGS, "svg"), "svg")
+        self.assertEqual(get_render_mode(10, "density"), "density")
+        with self.assertRaises(ValueError):
+            get_render_mode(10, "canvas")
+
+    def test_create_large_feature_plot(self):
+        df_large = pd.concat(
+            [self.df1] * -(-(MAX_PLOT_POINTS + 1) // len(self.df1)),
+            ignore_index=True
+        )
+        color_map = get_artist_color_map(df_large)
+
+        # Density layer plus a sample of at most MAX_PLOT_POINTS songs
+        fig = create_large_feature_plot(
+            df_large, "Tempo", "Song Popularity", color_map, "density"
+        )
+        heatmap, scatter = fig.data
+        self.assertEqual(heatmap.type, "heatmap")
+        self.assertEqual(scatter.type, "scattergl")
+        self.assertEqual(len(scatter.x), MAX_PLOT_POINTS)
+        self.assertEqual(
+            np.nansum(heatmap.z),
+            df_large[["Song Popularity", "Tempo"]].notna().all(axis=1).sum()
+        ) # Every song counted in the density layer
+
+        # WebGL plots every song in one trace
+        fig = create_large_feature_plot(
+            df_large, "Tempo", "Song Popularity", color_map, "webgl"
+        )
+        self.assertEqual(len(fig.data), 1)
+        self.assertEqual(len(fig.data[0].x), len(df_large))
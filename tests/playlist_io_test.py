@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.playlist_io import (
+    find_song_file, iter_df_chunks, load_csv, load_df, parse_list,
+    save_artists, save_songs,
+)
+
+class TestPlaylistIo(unittest.TestCase):
+    def setUp(self):
+        self.df1 = load_csv(
+            "output/sample_data/EdcOrlando2023FullSongs.csv"
+        ) # Large df w/ len>1,000
+        self.df_artists = load_df(
+            "output/sample_data/EdcOrlando2023Artists.csv"
+        )
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_load_csv(self):
+        df_expected = pd.read_csv(
+            "output/sample_data/EdcOrlando2023FullSongs.csv"
+        )
+        df_expected["Artist Genres"] = df_expected["Artist Genres"].apply(eval)
+        pd.testing.assert_frame_equal(self.df1, df_expected)
+
+        # Rows get their own lists, even when values are parsed once
+        self.assertIsNot(
+            self.df1["Artist Genres"].iloc[0], self.df1["Artist Genres"].iloc[1]
+        )
+
+    def test_parse_list(self):
+        self.assertEqual(parse_list("['House', 'EDM']"), ["House", "EDM"])
+        self.assertEqual(parse_list("[]"), [])
+        self.assertEqual(parse_list(float("nan")), [])
+        self.assertEqual(parse_list("__import__('os').getcwd()"), [])
+
+    def test_save_and_load_songs(self):
+        df_songs = self.df1.assign(**{
+            "Song Artists": [[artist] for artist in self.df1["Artist"]],
+        })
+        file_path = os.path.join(self.temp_dir.name, "playlist_songs.parquet")
+        save_songs(df_songs, file_path)
+
+        schema = pq.read_schema(file_path)
+        self.assertTrue(pa.types.is_list(schema.field("Artist Genres").type))
+        self.assertEqual(schema.field("Song Popularity").type, pa.int64())
+        pd.testing.assert_frame_equal(load_df(file_path), df_songs)
+        pd.testing.assert_frame_equal(
+            load_df(file_path, columns=["Song", "Artist Genres"]),
+            df_songs[["Song", "Artist Genres"]]
+        )
+
+    def test_iter_df_chunks(self):
+        csv_path = "output/sample_data/EdcOrlando2023FullSongs.csv"
+        parquet_path = os.path.join(
+            self.temp_dir.name, "playlist_songs.parquet"
+        )
+        save_songs(self.df1, parquet_path)
+
+        for file_path in (csv_path, parquet_path):
+            df_chunks = list(iter_df_chunks(file_path, chunksize=500))
+            self.assertEqual(
+                [len(df_chunk) for df_chunk in df_chunks], [500, 500, 165]
+            )
+            pd.testing.assert_frame_equal(
+                pd.concat(df_chunks, ignore_index=True), load_df(file_path)
+            )
+
+    def test_find_song_file(self):
+        self.assertIsNone(find_song_file(self.temp_dir.name))
+        csv_path = os.path.join(self.temp_dir.name, "playlist_songs.csv")
+        self.df1.to_csv(csv_path, index=False)
+        self.assertEqual(find_song_file(self.temp_dir.name), csv_path)
+
+        # Parquet files are preferred
+        parquet_path = os.path.join(
+            self.temp_dir.name, "playlist_songs.parquet"
+        )
+        save_songs(self.df1, parquet_path)
+        self.assertEqual(find_song_file(self.temp_dir.name), parquet_path)
+
+    def test_save_and_load_artists(self):
+        # All-empty genre lists still round-trip as a list column
+        df_artists = self.df_artists.assign(**{
+            "Artist Genres": [[] for _ in range(len(self.df_artists))]
+        })
+        file_path = os.path.join(self.temp_dir.name, "playlist_artists.parquet")
+        save_artists(df_artists, file_path)
+        pd.testing.assert_frame_equal(load_df(file_path), df_artists)
+
+        save_artists(self.df_artists, file_path)
+        pd.testing.assert_frame_equal(load_df(file_path), self.df_artists)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,15 @@
 import unittest
+import numpy as np
 import pandas as pd
 
 from src.playlist_mods import (
+    ARROW_BACKEND_MIN_ROWS, ArtistGenreIndex, FeatureRangeIndex,
+    PlaylistModsPipeline, TrackDedupeIndex, convert_df_backend,
     create_df_playlist_artists, filter_songs_by_artist_popularity,
-    remove_duplicates, remove_remixes_and_edits,
+    filter_songs_by_features, get_feature_matrix, get_feature_range_mask,
+    is_arrow_backed, normalize_song_title, order_songs_for_smooth_transitions,
+    pl, remove_duplicates, remove_near_duplicates, remove_remixes_and_edits,
+    select_backend, select_songs_by_mmr, select_songs_for_target_runtime,
 )
 
 class TestPlaylistMods(unittest.TestCase):
@@ -24,4 +30,269 @@ class TestPlaylistMods(unittest.TestCase):
         self.assertEqual(len(self.df1), len(df_no_duplicates1) + len(removed_songs1))
 
     def test_remove_remixes_and_edits(self):
-        pass
\ No newline at end of file
+        df_songs, _ = remove_duplicates(self.df1)
+        df_filtered, removed_songs = remove_remixes_and_edits(df_songs)
+        self.assertEqual(len(df_songs), len(df_filtered) + len(removed_songs))
+
+        # Sorted by artist only, keeping each artist's songs in input order
+        df_expected = df_songs[
+            df_songs["Song uri"].isin(df_filtered["Song uri"])
+        ].sort_values(by="Artist", kind="stable").reset_index(drop=True)
+        pd.testing.assert_frame_equal(df_filtered, df_expected)
+
+    def test_normalize_song_title(self):
+        self.assertEqual(
+            normalize_song_title("Another Me (with Dylan Matthew)"),
+            normalize_song_title("another me"),
+        )
+        self.assertEqual(normalize_song_title("Tiësto - Single Version"), "tiesto")
+        self.assertNotEqual(
+            normalize_song_title("Escape - John Summit Remix"),
+            normalize_song_title("Escape (feat. Hayla)"),
+        )
+
+    def test_track_dedupe_index(self):
+        index = TrackDedupeIndex(duration_tolerance_ms=5000)
+        index.add("Escape (feat. Hayla)", ["Kaskade", "deadmau5"], 200000, value=0)
+        self.assertEqual(
+            index.find("Escape - Album Version", ["deadmau5", "Kaskade"], 204000), 0
+        )
+        self.assertIsNone(index.find("Escape", ["Kaskade", "deadmau5"], 230000))
+        self.assertIsNone(index.find("Escape", ["Kaskade"], 200000))
+        index.add("Other", ["A"], 1000, isrc="USABC1234567", value=1)
+        self.assertEqual(index.find("Different", ["B"], 99999, "USABC1234567"), 1)
+
+    def test_remove_near_duplicates(self):
+        df_no_duplicates1, _ = remove_duplicates(self.df1)
+        df_expected, _ = remove_near_duplicates(df_no_duplicates1)
+        self.assertGreater(len(df_no_duplicates1), len(df_expected))
+
+        # Re-releases of the same songs under new URIs get removed too
+        df_songs = pd.concat(
+            [df_expected, df_expected.head(3).assign(
+                **{"Song uri": ["new_uri1", "new_uri2", "new_uri3"]}
+            )],
+            ignore_index=True
+        )
+        df_no_near_duplicates, removed_songs = remove_near_duplicates(df_songs)
+        self.assertEqual(len(df_no_near_duplicates), len(df_expected))
+        self.assertEqual(removed_songs, df_expected.head(3)["Song"].tolist())
+
+    def test_playlist_mods_pipeline(self):
+        df_expected, _ = remove_duplicates(self.df1)
+        df_expected, _ = remove_remixes_and_edits(df_expected)
+        df_expected = filter_songs_by_artist_popularity(df_expected)
+
+        pipeline = (
+            PlaylistModsPipeline()
+            .remove_duplicates()
+            .remove_remixes_and_edits()
+            .filter_songs_by_artist_popularity()
+        )
+        sorts = [info for step, info in pipeline.plan() if step == "sort"]
+        self.assertEqual(len(sorts), 1) # Artist re-sort merged/dropped
+
+        df_songs, report = pipeline.execute(self.df1)
+        pd.testing.assert_frame_equal(df_songs, df_expected)
+        self.assertEqual(
+            len(self.df1),
+            len(df_songs) + sum(len(r.removed_songs) for r in report)
+        )
+
+    def test_backends_match(self):
+        df_arrow = convert_df_backend(self.df1, "arrow")
+        for func in (remove_duplicates, remove_remixes_and_edits):
+            df_pandas, removed_pandas = func(self.df1, backend="pandas")
+            df_result, removed_arrow = func(df_arrow)
+            self.assertEqual(removed_pandas, removed_arrow)
+            pd.testing.assert_frame_equal(
+                df_pandas,
+                convert_df_backend(df_result, "pandas"),
+                check_dtype=False,
+            )
+        pd.testing.assert_frame_equal(
+            filter_songs_by_artist_popularity(self.df1, backend="pandas"),
+            convert_df_backend(
+                filter_songs_by_artist_popularity(self.df1, backend="arrow"),
+                "pandas"
+            ),
+            check_dtype=False,
+        )
+
+    def test_backend_keyword_args(self):
+        df_by_keyword, _ = remove_duplicates(df_songs=self.df1)
+        df_by_position, _ = remove_duplicates(self.df1)
+        pd.testing.assert_frame_equal(df_by_keyword, df_by_position)
+        with self.assertRaises(TypeError):
+            remove_duplicates(songs=self.df1)
+        with self.assertRaises(TypeError):
+            filter_songs_by_artist_popularity(None)
+
+    def test_auto_backend(self):
+        repeats = -(-ARROW_BACKEND_MIN_ROWS // len(self.df1))
+        df_large = pd.concat([self.df1] * repeats, ignore_index=True)
+        self.assertEqual(select_backend(self.df1), "pandas")
+        self.assertEqual(select_backend(df_large), "arrow")
+        self.assertEqual(select_backend(df_large, "pandas"), "pandas")
+
+        # Large inputs run on Arrow but come back with the input's dtypes
+        df_auto, removed_auto = remove_duplicates(df_large)
+        df_pandas, removed_pandas = remove_duplicates(
+            df_large, backend="pandas"
+        )
+        self.assertFalse(is_arrow_backed(df_auto))
+        pd.testing.assert_frame_equal(df_auto, df_pandas)
+        self.assertEqual(removed_auto, removed_pandas)
+
+        # Arrow-backed inputs stay Arrow-backed
+        df_arrow, _ = remove_duplicates(convert_df_backend(self.df1, "arrow"))
+        self.assertTrue(is_arrow_backed(df_arrow))
+
+    def test_pipeline_auto_backend(self):
+        repeats = -(-ARROW_BACKEND_MIN_ROWS // len(self.df1))
+        df_large = pd.concat([self.df1] * repeats, ignore_index=True)
+        pipeline = (
+            PlaylistModsPipeline()
+            .remove_duplicates()
+            .filter_songs_by_artist_popularity()
+        )
+
+        # Large inputs run on Arrow but come back with the input's dtypes
+        df_auto, _ = pipeline.execute(df_large)
+        df_pandas, _ = pipeline.execute(df_large, backend="pandas")
+        self.assertFalse(is_arrow_backed(df_auto))
+        pd.testing.assert_series_equal(df_auto.dtypes, df_large.dtypes)
+        pd.testing.assert_frame_equal(df_auto, df_pandas)
+
+        # Arrow-backed inputs stay Arrow-backed
+        df_arrow, _ = pipeline.execute(convert_df_backend(self.df1, "arrow"))
+        self.assertTrue(is_arrow_backed(df_arrow))
+
+    @unittest.skipIf(pl is None, "polars is not installed")
+    def test_polars_backend(self):
+        df_polars = pl.from_pandas(self.df1)
+        self.assertEqual(select_backend(df_polars), "arrow")
+
+        df_result, removed_songs = remove_duplicates(df_polars)
+        df_expected, removed_expected = remove_duplicates(self.df1)
+        self.assertIsInstance(df_result, pl.DataFrame)
+        self.assertEqual(removed_songs, removed_expected)
+        self.assertEqual(
+            df_result["Song uri"].to_list(), df_expected["Song uri"].tolist()
+        )
+
+        df_filtered = filter_songs_by_artist_popularity(df_polars)
+        self.assertIsInstance(df_filtered, pl.DataFrame)
+        self.assertEqual(
+            len(df_filtered), len(filter_songs_by_artist_popularity(self.df1))
+        )
+
+    def test_select_songs_for_target_runtime(self):
+        df_songs, _ = remove_duplicates(self.df1)
+        target_duration_ms = 4 * 60 * 60 * 1000
+        df_selected = select_songs_for_target_runtime(
+            df_songs,
+            target_duration_ms,
+            tolerance_ms=60000,
+            min_songs_per_artist=0,
+            max_songs_per_artist=2,
+        )
+        self.assertLessEqual(
+            abs(df_selected["Song Duration"].sum() - target_duration_ms), 60000
+        )
+        self.assertLessEqual(df_selected.groupby("Artist").size().max(), 2)
+
+        # By default, every artist isn't guaranteed a song, so a large lineup
+        # still fits a short target
+        df_default = select_songs_for_target_runtime(
+            df_songs, 60 * 60 * 1000
+        )
+        self.assertLessEqual(
+            abs(df_default["Song Duration"].sum() - 60 * 60 * 1000), 120000
+        )
+
+        # Min songs per artist that can't fit the target are an error
+        with self.assertRaises(ValueError):
+            select_songs_for_target_runtime(
+                df_songs, 60 * 60 * 1000, min_songs_per_artist=1
+            )
+
+    def test_order_songs_for_smooth_transitions(self):
+        df_songs, _ = remove_duplicates(self.df1)
+        df_ordered = order_songs_for_smooth_transitions(df_songs)
+        self.assertCountEqual(df_ordered["Song uri"], df_songs["Song uri"])
+
+        def total_transition_distance(df):
+            return np.linalg.norm(
+                np.diff(get_feature_matrix(df), axis=0), axis=1
+            ).sum()
+
+        self.assertLess(
+            total_transition_distance(df_ordered),
+            total_transition_distance(df_songs)
+        )
+        artists = df_ordered["Artist"]
+        self.assertFalse((artists == artists.shift()).any())
+
+    def test_artist_genre_index(self):
+        df_artists = pd.DataFrame({
+            "Artist": ["A", "B", "C", "D"],
+            "Artist Genres": [
+                ["Tech House"], ["Deep House", "Dubstep"], ["Houseplant"], [],
+            ],
+        })
+        genre_index = ArtistGenreIndex(df_artists)
+        self.assertEqual(genre_index.query(["house"]), ["A", "B"])
+        self.assertEqual(genre_index.query(["house"], ["dubstep"]), ["A"])
+        self.assertEqual(genre_index.query(["house"], match="exact"), [])
+        self.assertEqual(
+            genre_index.query(["house"], match="substring"), ["A", "B", "C"]
+        )
+        self.assertEqual(genre_index.query(exclude_genres=["house"]), ["C", "D"])
+
+    def test_feature_range_index(self):
+        feature_ranges = {"Energy": (0.6, 0.9), "Tempo": (120, 130)}
+        mask = FeatureRangeIndex(self.df1).query(feature_ranges)
+        expected_mask = (
+            self.df1["Energy"].between(0.6, 0.9)
+            & self.df1["Tempo"].between(120, 130)
+        ).to_numpy()
+        np.testing.assert_array_equal(mask, expected_mask)
+
+        open_range_mask = FeatureRangeIndex(self.df1).query({"Tempo": (None, 100)})
+        np.testing.assert_array_equal(
+            open_range_mask, (self.df1["Tempo"] <= 100).to_numpy()
+        )
+
+        # Single queries compare features directly; a prebuilt index gives
+        # the same result
+        feature_index = FeatureRangeIndex(self.df1)
+        np.testing.assert_array_equal(
+            get_feature_range_mask(self.df1, feature_ranges), expected_mask
+        )
+        df_indexed, _ = filter_songs_by_features(
+            self.df1, feature_ranges, feature_index=feature_index
+        )
+        df_compared, _ = filter_songs_by_features(self.df1, feature_ranges)
+        pd.testing.assert_frame_equal(df_indexed, df_compared)
+        with self.assertRaises(ValueError):
+            get_feature_range_mask(self.df1.head(10), feature_ranges, feature_index)
+
+    def test_select_songs_by_mmr(self):
+        df_mmr = select_songs_by_mmr(self.df1)
+        df_popular = filter_songs_by_artist_popularity(self.df1)
+        self.assertEqual(len(df_mmr), len(df_popular))
+        self.assertTrue(
+            df_mmr["Artist"].value_counts().sort_index().equals(
+                df_popular["Artist"].value_counts().sort_index()
+            )
+        )
+
+        # With no diversity weight, the most popular songs are selected
+        df_top = select_songs_by_mmr(self.df1, num_songs=50, diversity=0)
+        self.assertEqual(
+            sorted(df_top["Song Popularity"], reverse=True),
+            self.df1["Song Popularity"].nlargest(50).tolist(),
+        )
+        self.assertEqual(len(select_songs_by_mmr(self.df1, songs_per_artist=1)),
+                         self.df1["Artist"].nunique())
@@ -0,0 +1,88 @@
+import os
+import unittest
+
+import pandas as pd
+
+from src.playlist_io import find_song_file, load_df
+from src.playlist_warehouse import (
+    CREATED_PLAYLISTS_DIR,
+    PlaylistWarehouse,
+    parse_playlist_folder_name,
+)
+
+
+class TestPlaylistWarehouse(unittest.TestCase):
+    def setUp(self):
+        self.warehouse = PlaylistWarehouse(":memory:")
+        self.new_folders = self.warehouse.ingest(CREATED_PLAYLISTS_DIR)
+
+    def tearDown(self):
+        self.warehouse.close()
+
+    def test_ingest(self):
+        df_playlists = self.warehouse.get_playlists()
+        self.assertEqual(len(df_playlists), len(self.new_folders))
+        self.assertGreater(len(df_playlists), 0)
+
+        # Re-running only ingests new folders
+        self.assertEqual(self.warehouse.ingest(CREATED_PLAYLISTS_DIR), [])
+        self.assertEqual(
+            len(self.warehouse.get_playlists()), len(df_playlists)
+        )
+
+        self.assertEqual(
+            parse_playlist_folder_name("EdcOrlando2023Summary_Created2024-01-10"),
+            ("EdcOrlando2023", "2024-01-10")
+        )
+
+    def test_queries_match_pandas(self):
+        df_songs = pd.concat([
+            load_df(
+                find_song_file(os.path.join(CREATED_PLAYLISTS_DIR, folder_name))
+            ).assign(
+                Playlist=parse_playlist_folder_name(folder_name)[0]
+            )
+            for folder_name in self.new_folders
+        ])
+
+        # Artist overlap
+        artist_counts = df_songs.groupby("Artist")["Playlist"].nunique()
+        expected_overlap = artist_counts[artist_counts >= 2]
+        df_overlap = self.warehouse.get_artist_overlap(min_playlists=2)
+        self.assertEqual(
+            dict(zip(df_overlap["Artist"], df_overlap["Num Playlists"])),
+            expected_overlap.to_dict()
+        )
+
+        # Genre share per playlist
+        df_artists = df_songs.drop_duplicates(["Playlist", "Artist"])
+        df_genres = df_artists.assign(
+            Genre=df_artists["Artist Genres"]
+        ).explode("Genre").dropna(subset=["Genre"])
+        expected_share = (
+            df_genres.groupby(["Playlist", "Genre"]).size()
+            / df_artists.groupby("Playlist").size()
+        )
+        df_share = self.warehouse.get_genre_share(period="playlist", top_n=None)
+        for period, genre, share in zip(
+            df_share["Period"], df_share["Genre"], df_share["Share"]
+        ):
+            self.assertAlmostEqual(share, expected_share[(period, genre)])
+        self.assertEqual(len(df_share), len(expected_share))
+
+        # Feature distributions
+        df_features = self.warehouse.get_feature_distributions(["Tempo"])
+        expected_tempo = df_songs.groupby("Playlist")["Tempo"]
+        for playlist, mean, std in zip(
+            df_features["Playlist"],
+            df_features["Tempo Mean"],
+            df_features["Tempo Std"],
+        ):
+            self.assertAlmostEqual(mean, expected_tempo.mean()[playlist])
+            self.assertAlmostEqual(
+                std, expected_tempo.std(ddof=0)[playlist], places=6
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from src.playlist_analytics import get_dashboard_dir
+from src.regenerate_dashboards import (
+    find_dashboard_folders, load_playlist_metadata, main, regenerate_dashboard,
+)
+
+FOLDER_NAME = "EdcOrlando2023Summary_Created2024-01-02"
+
+class TestRegenerateDashboards(unittest.TestCase):
+    def setUp(self):
+        self.df1 = pd.read_csv(
+            "output/sample_data/EdcOrlando2023FullSongs.csv"
+        ) # Large df w/ len>1,000
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder_path = os.path.join(self.temp_dir.name, FOLDER_NAME)
+        os.makedirs(self.folder_path)
+        self.df1.head(50).to_csv(
+            os.path.join(self.folder_path, "playlist_songs.csv"), index=False
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_find_dashboard_folders(self):
+        # Folders without songs, or not named like playlist folders, are
+        # skipped
+        os.makedirs(os.path.join(
+            self.temp_dir.name, "EmptySummary_Created2024-01-03"
+        ))
+        os.makedirs(os.path.join(self.temp_dir.name, "styles"))
+        other_folder_path = os.path.join(
+            self.temp_dir.name, "AbcSummary_Created2024-01-04"
+        )
+        os.makedirs(other_folder_path)
+        self.df1.head(5).to_parquet(
+            os.path.join(other_folder_path, "playlist_songs.parquet")
+        )
+
+        self.assertEqual(
+            find_dashboard_folders(self.temp_dir.name),
+            [other_folder_path, self.folder_path]
+        )
+        self.assertEqual(
+            find_dashboard_folders(self.temp_dir.name, match="Edc*"),
+            [self.folder_path]
+        )
+
+    def test_load_playlist_metadata(self):
+        # Saved metadata is used as is
+        playlist_metadata = {
+            "playlist_name": "EDC Orlando 2023",
+            "playlist_uri": "spotify:playlist:abc",
+            "playlist_created_on": "01-02-2024",
+            "recommended_artists": ["Tiësto"],
+        }
+        metadata_path = os.path.join(self.folder_path, "playlist_metadata.json")
+        with open(metadata_path, "w") as file:
+            json.dump(playlist_metadata, file)
+        self.assertEqual(
+            load_playlist_metadata(self.folder_path), playlist_metadata
+        )
+        os.remove(metadata_path)
+
+        # Otherwise, falls back to the folder name...
+        self.assertEqual(load_playlist_metadata(self.folder_path), {
+            "playlist_name": "EdcOrlando2023",
+            "playlist_uri": "",
+            "playlist_created_on": "01-02-2024",
+            "recommended_artists": [],
+        })
+
+        # ...and an existing (cp1252 encoded) dashboard
+        with open(
+            os.path.join(self.folder_path, "summary_dashboard.html"), "wb"
+        ) as file:
+            file.write(
+                '<div id="top-line">Edc Orlando 2023</div>\n'
+                '<div id="line1">Tiësto, Above &amp; Beyond</div>\n'
+                '<div id="line2">Similar artists to this playlist</div>'
+                .encode("cp1252")
+            )
+        playlist_metadata = load_playlist_metadata(self.folder_path)
+        self.assertEqual(playlist_metadata["playlist_name"], "Edc Orlando 2023")
+        self.assertEqual(
+            playlist_metadata["recommended_artists"],
+            ["Tiësto", "Above & Beyond"]
+        )
+
+        with self.assertRaises(ValueError):
+            load_playlist_metadata(self.temp_dir.name)
+
+    def test_regenerate_dashboard_failure(self):
+        # The folder's metadata maps to a folder in output/created_playlists
+        result = regenerate_dashboard(self.folder_path)
+        self.assertEqual(result["folder"], FOLDER_NAME)
+        self.assertEqual(result["num_songs"], 50)
+        self.assertIn("ValueError", result["error"])
+        self.assertFalse(os.path.exists(
+            get_dashboard_dir("EdcOrlando2023", "01-02-2024")
+        )) # No output folders created
+
+        # Exit code is 1 if any dashboard fails, 0 if none are found
+        with mock.patch(
+            "src.regenerate_dashboards.CREATED_PLAYLISTS_DIR",
+            self.temp_dir.name
+        ), mock.patch("builtins.print"):
+            self.assertEqual(main(["--workers", "1"]), 1)
+            self.assertEqual(main(["--match", "Missing*"]), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
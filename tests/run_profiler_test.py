@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from src.run_profiler import RunProfiler, profile_call
+
+
+class TestRunProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profiler = RunProfiler()
+
+    def tearDown(self):
+        self.profiler.stop()
+
+    def test_stage(self):
+        with self.profiler.stage("dashboard"):
+            with self.profiler.stage("Tempo_plot"):
+                data = bytearray(4 * 1024 ** 2) # 4 MB, kept
+            with self.profiler.stage("render dashboard"):
+                bytearray(2 * 1024 ** 2) # 2 MB, freed
+            profile = self.profiler.to_dict()
+
+        # Running stages report their time so far
+        self.assertEqual(
+            [(stage["name"], stage["depth"], stage["finished"])
+             for stage in profile["stages"]],
+            [("dashboard", 0, False), ("Tempo_plot", 1, True),
+             ("render dashboard", 1, True)]
+        )
+        self.assertGreater(profile["stages"][0]["seconds"], 0)
+
+        stages = self.profiler.to_dict()["stages"]
+        dashboard, tempo_plot, render = stages
+        self.assertTrue(dashboard["finished"])
+        self.assertAlmostEqual(tempo_plot["peak_mb"], 4, delta=0.1)
+        self.assertAlmostEqual(tempo_plot["memory_delta_mb"], 4, delta=0.1)
+        self.assertAlmostEqual(render["memory_delta_mb"], 0, delta=0.1)
+        if hasattr(tracemalloc, "reset_peak"):
+            self.assertAlmostEqual(render["peak_mb"], 2, delta=0.1)
+        self.assertGreaterEqual(dashboard["peak_mb"], 4)
+        self.assertGreaterEqual(self.profiler.to_dict()["peak_mb"], 4)
+        del data
+
+    def test_profile_call_and_save(self):
+        with self.profiler.stage("dashboard"):
+            result, *measurements = profile_call(True, sum, [1, 2, 3])
+            self.profiler.add_stage("playlist_summary", *measurements)
+        self.assertEqual(result, 6)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "profile.json")
+            self.profiler.save(file_path)
+            with open(file_path) as file:
+                profile = json.load(file)
+        self.assertEqual(
+            [(stage["name"], stage["depth"]) for stage in profile["stages"]],
+            [("dashboard", 0), ("playlist_summary", 1)]
+        )
+        self.assertEqual(
+            profile["total_seconds"], profile["stages"][0]["seconds"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,204 @@
+from datetime import datetime, timedelta
+import json
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.spotify_catalog import (
+    FreshnessPolicy, SpotifyCatalog, normalize_name,
+)
+from src.spotipy_utils import get_top_tracks, search_for_artists
+from src.track_catalog import TrackCatalog
+
+ARTIST = {
+    "name": "Tiësto",
+    "uri": "spotify:artist:2o5jDhtHVPhrJdv3cEQ99Z",
+    "popularity": 80,
+    "genres": ["edm", "trance"],
+    "images": [{"url": "large.jpg"}, {"url": "small.jpg"}],
+}
+
+class FakeSpotify():
+    """Counts requests and returns the same top tracks for every artist."""
+
+    def __init__(self):
+        self.num_requests = 0
+
+    def artist_top_tracks(self, artist_uri):
+        self.num_requests += 1
+        return {"tracks": [
+            {
+                "name": f"Song {i}",
+                "uri": f"spotify:track:{artist_uri[:18]}{i:04}",
+                "popularity": 70 - i,
+                "duration_ms": 200_000 + i,
+                "external_ids": {"isrc": f"ISRC{i}"},
+                "artists": [{"name": "Tiësto"}],
+            }
+            for i in range(3)
+        ]}
+
+    def audio_features(self, track_uris):
+        self.num_requests += 1
+        return [
+            {"danceability": 0.5, "energy": 0.8, "tempo": 128.0,
+             "speechiness": 0.05}
+            for _ in track_uris
+        ]
+
+class TestSpotifyCatalog(unittest.TestCase):
+    def setUp(self):
+        self.spotify_catalog = SpotifyCatalog(":memory:")
+
+    def tearDown(self):
+        self.spotify_catalog.close()
+
+    def search(self, artist_names):
+        response = mock.Mock(
+            content=json.dumps({"artists": {"items": [ARTIST]}})
+        )
+        with mock.patch(
+            "src.spotipy_utils.requests.get", return_value=response
+        ) as get, mock.patch("builtins.print"):
+            df_artists = search_for_artists(
+                {}, artist_names, self.spotify_catalog
+            )
+        return df_artists, get.call_count
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("Tiësto"), "tiesto")
+        self.assertEqual(normalize_name("Above & Beyond"), "abovebeyond")
+        self.assertEqual(normalize_name("!!!"), "!!!")
+
+    def test_search_for_artists(self):
+        df_artists, num_requests = self.search(["Tiesto"])
+        self.assertEqual(num_requests, 1)
+        self.assertEqual(df_artists["Artist Genres"][0], ["EDM", "Trance"])
+        self.assertEqual(df_artists["Artist Image url"][0], "small.jpg")
+
+        # Found by the previous search and by the artist's name
+        df_cached_artists, num_requests = self.search(["TIESTO", "Tiësto"])
+        self.assertEqual(num_requests, 0)
+        self.assertTrue(
+            df_cached_artists.iloc[[0]].reset_index(drop=True)
+            .equals(df_artists)
+        )
+
+    def test_freshness_policy(self):
+        self.search(["Tiesto"])
+        later = datetime.now() + timedelta(days=8)
+        self.assertEqual(self.spotify_catalog.find_artists(
+            ["Tiesto"], now=later
+        ), {})
+
+        never_expires = FreshnessPolicy(artist_max_age_days=None)
+        self.assertTrue(never_expires.is_fresh("2000-01-01T00:00:00", None))
+        self.assertFalse(FreshnessPolicy().is_fresh(
+            "2000-01-01T00:00:00", FreshnessPolicy().artist_max_age_days
+        ))
+
+    def test_get_top_tracks(self):
+        df_artists, _ = self.search(["Tiesto"])
+        spot = FakeSpotify()
+        df_songs = get_top_tracks(
+            spot, df_artists, 2, spotify_catalog=self.spotify_catalog
+        )
+        self.assertEqual(spot.num_requests, 2) # Top tracks, then features
+        self.assertEqual(len(df_songs), 2)
+
+        # Top tracks and features are read from the catalog
+        spot = FakeSpotify()
+        df_cached_songs = get_top_tracks(
+            spot, df_artists, 2, spotify_catalog=self.spotify_catalog
+        )
+        self.assertEqual(spot.num_requests, 0)
+        self.assertTrue(df_cached_songs.equals(df_songs))
+
+        # Only the extra track's features are fetched
+        df_more_songs = get_top_tracks(
+            spot, df_artists, 3, spotify_catalog=self.spotify_catalog
+        )
+        self.assertEqual(spot.num_requests, 1)
+        self.assertEqual(len(df_more_songs), 3)
+
+    def test_get_top_tracks_track_catalog(self):
+        df_artists, _ = self.search(["Tiesto"])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            track_catalog = TrackCatalog(temp_dir, writable=True)
+
+            # Tracks stored without features are fetched again
+            spot = FakeSpotify()
+            df_songs = get_top_tracks(spot, df_artists, 2)
+            track_catalog.add_tracks(df_songs.assign(
+                Danceability=np.nan, Energy=np.nan, Tempo=np.nan,
+                Speechiness=np.nan
+            ))
+            df_songs = get_top_tracks(
+                spot, df_artists, 2, track_catalog=track_catalog
+            )
+            self.assertEqual(spot.num_requests, 4) # Features fetched twice
+            self.assertTrue((df_songs["Tempo"] == 128.0).all())
+
+            # Tracks with features are read from the catalog
+            df_cached_songs = get_top_tracks(
+                spot, df_artists, 2, track_catalog=track_catalog
+            )
+            self.assertEqual(spot.num_requests, 5) # Top tracks only
+            self.assertTrue(df_cached_songs.equals(df_songs))
+            del track_catalog # Release memory-mapped files
+
+    def test_missing_features(self):
+        df_artists, _ = self.search(["Tiesto"])
+        spot = FakeSpotify()
+        df_songs = get_top_tracks(
+            spot, df_artists, 2, spotify_catalog=self.spotify_catalog
+        )
+        track_uris = list(df_songs["Song uri"])
+        self.spotify_catalog.upsert_track_features({track_uris[0]: None})
+
+        # Missing features are cached, but expire unlike found features
+        later = datetime.now() + timedelta(days=8)
+        self.assertIsNone(
+            self.spotify_catalog.get_track_features(track_uris)[track_uris[0]]
+        )
+        self.assertEqual(
+            list(self.spotify_catalog.get_track_features(track_uris, later)),
+            [track_uris[1]]
+        )
+
+        # The track catalog fills in features the Spotify catalog is missing
+        with tempfile.TemporaryDirectory() as temp_dir:
+            track_catalog = TrackCatalog(temp_dir, writable=True)
+            track_catalog.add_tracks(df_songs)
+            spot = FakeSpotify()
+            df_cached_songs = get_top_tracks(
+                spot, df_artists, 2, track_catalog=track_catalog,
+                spotify_catalog=self.spotify_catalog
+            )
+            self.assertEqual(spot.num_requests, 0)
+            self.assertTrue(df_cached_songs.equals(df_songs))
+            del track_catalog # Release memory-mapped files
+
+    def test_commit(self):
+        self.search(["Tiesto"])
+        self.assertTrue(self.spotify_catalog.connection.in_transaction)
+        self.spotify_catalog.commit()
+        self.assertFalse(self.spotify_catalog.connection.in_transaction)
+
+    def test_context_manager(self):
+        # Metadata fetched before an error is committed
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = f"{temp_dir}/spotify_catalog.db"
+            with self.assertRaises(KeyboardInterrupt):
+                with SpotifyCatalog(db_path) as self.spotify_catalog:
+                    self.search(["Tiesto"])
+                    raise KeyboardInterrupt # Ex: GUI window closed
+            with SpotifyCatalog(db_path) as spotify_catalog:
+                self.assertIn("Tiesto", spotify_catalog.find_artists(["Tiesto"]))
+            self.spotify_catalog = SpotifyCatalog(":memory:") # For tearDown
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from spotipy.client import SpotifyException
+
+from src.spotipy_utils import (
+    MAX_PLAYLIST_SIZE, create_playlist, create_sharded_playlists,
+    get_primary_genre, split_into_shards,
+)
+
+class FakePlaylistSpotify():
+    """
+    Stores created playlists' songs, failing to add songs to the playlist
+    named fail_playlist_name.
+    """
+
+    def __init__(self, playlists=None, fail_playlist_name=None):
+        self.playlists = {} if playlists is None else playlists # uri -> songs
+        self.fail_playlist_name = fail_playlist_name
+        self.playlist_names = {} # uri -> name
+        self.created_uris = []
+        self.unfollowed_ids = []
+        self.num_add_requests = 0
+
+    def user_playlist_create(self, user, name, public, collaborative,
+                             description):
+        playlist_uri = f"spotify:playlist:{len(self.playlists)}"
+        self.playlists[playlist_uri] = []
+        self.playlist_names[playlist_uri] = name
+        self.created_uris.append(playlist_uri)
+        return {"uri": playlist_uri}
+
+    def playlist_add_items(self, playlist_uri, items):
+        self.num_add_requests += 1
+        if self.playlist_names.get(playlist_uri) == self.fail_playlist_name:
+            raise SpotifyException(500, -1, "Server error")
+        self.playlists[playlist_uri].extend(items)
+        return {"snapshot_id": str(len(self.playlists[playlist_uri]))}
+
+    def current_user_unfollow_playlist(self, playlist_id):
+        self.unfollowed_ids.append(playlist_id)
+
+class TestSpotipyUtils(unittest.TestCase):
+    def setUp(self):
+        self.df1 = pd.read_csv(
+            "output/sample_data/EdcOrlando2023FullSongs.csv"
+        ) # Large df w/ len>1,000
+
+    def assert_shards_cover_songs(self, shards, max_shard_size):
+        self.assertTrue(all(
+            len(df_shard) <= max_shard_size for _, df_shard in shards
+        ))
+        self.assertEqual(
+            sorted(pd.concat([df_shard for _, df_shard in shards]).index),
+            list(self.df1.index)
+        ) # Every song in exactly one shard
+
+    def test_split_into_shards_by_size(self):
+        shards = split_into_shards(self.df1, max_shard_size=500)
+        self.assert_shards_cover_songs(shards, 500)
+        self.assertEqual(
+            [shard_name for shard_name, _ in shards],
+            ["Part 1", "Part 2", "Part 3"]
+        )
+        pd.testing.assert_frame_equal(
+            pd.concat([df_shard for _, df_shard in shards]), self.df1
+        ) # Song order kept
+
+        # A single shard by default
+        shards = split_into_shards(self.df1)
+        self.assertEqual(len(shards), 1)
+        self.assertLessEqual(len(shards[0][1]), MAX_PLAYLIST_SIZE)
+
+    def test_split_into_shards_by_column(self):
+        self.df1["Day"] = (self.df1.index % 3) + 1
+        shards = split_into_shards(self.df1, "Day", max_shard_size=300)
+        self.assert_shards_cover_songs(shards, 300)
+
+        # Each day is a shard, split further by size
+        for shard_name, df_shard in shards:
+            day = shard_name.split(" Part ")[0]
+            self.assertTrue((df_shard["Day"].astype(str) == day).all())
+        self.assertEqual(
+            [shard_name for shard_name, _ in shards],
+            ["1 Part 1", "1 Part 2", "2 Part 1", "2 Part 2", "3 Part 1",
+             "3 Part 2"]
+        )
+
+    def test_split_into_shards_by_genre(self):
+        genres = ["['House']", "['Techno']", "['Trance']", "['Dubstep']"]
+        df_songs = pd.DataFrame({
+            "Song uri": [f"uri{i}" for i in range(100)],
+            "Artist Genres": [genres[0]] * 50 + [genres[1]] * 30
+                + [genres[2]] * 15 + [genres[3]] * 5,
+        })
+        shards = split_into_shards(df_songs, "genre", max_shard_size=60)
+
+        # Largest genre first, with smaller genres filling the gaps
+        self.assertEqual(
+            [shard_name for shard_name, _ in shards],
+            ["House / Dubstep", "Techno / Trance"]
+        )
+        self.assertEqual([len(df_shard) for _, df_shard in shards], [55, 45])
+        for _, df_shard in shards:
+            self.assertLessEqual(len(df_shard), 60)
+
+        # Genres larger than a shard are split by size
+        shards = split_into_shards(df_songs, "genre", max_shard_size=40)
+        self.assertTrue(all(len(df_shard) <= 40 for _, df_shard in shards))
+        self.assertEqual(shards[0][0], "House Part 1")
+        self.assertEqual(sum(len(df_shard) for _, df_shard in shards), 100)
+
+    def test_get_primary_genre(self):
+        self.assertEqual(get_primary_genre(["EDM", "Trance"]), "EDM")
+        self.assertEqual(get_primary_genre("['EDM', 'Trance']"), "EDM")
+        self.assertEqual(get_primary_genre("[]"), "Other")
+        self.assertEqual(get_primary_genre([]), "Other")
+        self.assertEqual(
+            get_primary_genre("[\"children's music\", 'pop']"),
+            "children's music"
+        )
+        self.assertEqual(get_primary_genre(np.array(["EDM"])), "EDM")
+        self.assertEqual(get_primary_genre(np.nan), "Other")
+        self.assertEqual(get_primary_genre(None), "Other")
+        self.assertEqual(get_primary_genre("EDM, Trance"), "Other")
+
+    def create_sharded_playlists(self, spot, **kwargs):
+        with mock.patch("builtins.print"):
+            return create_sharded_playlists(
+                "Festival", spot, self.df1.head(250), max_shard_size=100,
+                max_workers=1, **kwargs
+            )
+
+    def test_create_sharded_playlists(self):
+        spot = FakePlaylistSpotify()
+        playlist_uris = self.create_sharded_playlists(spot)
+        self.assertEqual(playlist_uris, spot.created_uris)
+        self.assertEqual(
+            [spot.playlist_names[uri] for uri in playlist_uris],
+            ["Festival (Part 1)", "Festival (Part 2)", "Festival (Part 3)"]
+        )
+        self.assertEqual(
+            sum((spot.playlists[uri] for uri in playlist_uris), []),
+            self.df1["Song uri"].head(250).tolist()
+        )
+
+    def test_create_sharded_playlists_rollback(self):
+        spot = FakePlaylistSpotify(fail_playlist_name="Festival (Part 2)")
+        with self.assertRaises(RuntimeError):
+            self.create_sharded_playlists(spot, on_failure="rollback")
+
+        # Every playlist created, including finished shards, is unfollowed
+        self.assertEqual(len(spot.created_uris), 3)
+        self.assertEqual(
+            sorted(spot.unfollowed_ids),
+            sorted(uri.split(":")[-1] for uri in spot.created_uris)
+        )
+
+    def test_create_sharded_playlists_resume(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            state_path = os.path.join(temp_dir, "playlist_shards.json")
+            spot = FakePlaylistSpotify(fail_playlist_name="Festival (Part 2)")
+            with self.assertRaises(RuntimeError):
+                self.create_sharded_playlists(
+                    spot, on_failure="resume", state_path=state_path
+                )
+
+            # Created shards are kept, and progress is saved
+            self.assertEqual(spot.unfollowed_ids, [])
+            with open(state_path) as file:
+                state = json.load(file)
+            self.assertEqual(
+                [shard_state["num_added"] for shard_state in state.values()],
+                [100, 0, 50]
+            )
+
+            # Resuming only adds the failed shard's songs, to the same
+            # playlists
+            resumed_spot = FakePlaylistSpotify(spot.playlists)
+            resumed_spot.playlist_names = spot.playlist_names
+            playlist_uris = self.create_sharded_playlists(
+                resumed_spot, on_failure="resume", state_path=state_path
+            )
+            self.assertEqual(playlist_uris, spot.created_uris)
+            self.assertEqual(resumed_spot.created_uris, [])
+            self.assertEqual(resumed_spot.num_add_requests, 1)
+            self.assertEqual(
+                sum((spot.playlists[uri] for uri in playlist_uris), []),
+                self.df1["Song uri"].head(250).tolist()
+            )
+            self.assertFalse(os.path.exists(state_path))
+
+    def test_create_playlist_too_large(self):
+        df_songs = pd.DataFrame({
+            "Song uri": [f"uri{i}" for i in range(MAX_PLAYLIST_SIZE + 1)]
+        })
+        with self.assertRaises(ValueError):
+            # Fails before any request
+            create_playlist("Too Large", None, df_songs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.playlist_io import load_csv
+from src.track_catalog import (
+    INITIAL_CAPACITY, TRACK_COLUMNS, TrackCatalog, fill_missing_features,
+)
+
+class TestTrackCatalog(unittest.TestCase):
+    def setUp(self):
+        self.df1 = load_csv(
+            "output/sample_data/EdcOrlando2023FullSongs.csv"
+        ) # Large df w/ len>1,000
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.track_catalog = TrackCatalog(self.temp_dir.name, writable=True)
+
+    def tearDown(self):
+        del self.track_catalog # Release memory-mapped files
+        self.temp_dir.cleanup()
+
+    def test_add_tracks(self):
+        num_uris = self.df1["Song uri"].nunique()
+        self.assertEqual(self.track_catalog.add_tracks(self.df1), num_uris)
+        self.assertEqual(self.track_catalog.add_tracks(self.df1), 0)
+        self.assertEqual(len(self.track_catalog), num_uris)
+        self.assertGreater(self.track_catalog.capacity, INITIAL_CAPACITY)
+
+        # Known tracks are updated
+        df_updated = self.df1.iloc[:1].assign(Tempo=1.0)
+        self.assertEqual(self.track_catalog.add_tracks(df_updated), 0)
+        self.assertIn(self.df1["Song uri"].iloc[0], self.track_catalog)
+        self.assertEqual(
+            self.track_catalog.get_features(df_updated["Song uri"])["Tempo"][0],
+            1.0
+        )
+
+        # Missing values don't overwrite known features
+        df_partial = self.df1.iloc[:2].drop(columns="Energy").assign(Tempo=np.nan)
+        self.track_catalog.add_tracks(df_partial)
+        df_features = self.track_catalog.get_features(df_partial["Song uri"])
+        self.assertEqual(df_features["Tempo"][0], 1.0)
+        np.testing.assert_allclose(df_features["Tempo"][1], self.df1["Tempo"][1])
+        np.testing.assert_allclose(df_features["Energy"], self.df1["Energy"][:2])
+
+    def test_get_features(self):
+        self.track_catalog.add_tracks(self.df1)
+        uris = list(self.df1["Song uri"]) + ["0000000000000000000000"]
+        df_features = TrackCatalog(self.temp_dir.name).get_features(uris)
+
+        self.assertEqual(list(df_features["Song uri"]), uris)
+        self.assertEqual(list(df_features.columns[1:]), list(TRACK_COLUMNS))
+        for column in TRACK_COLUMNS:
+            np.testing.assert_allclose(
+                df_features[column][:-1], self.df1[column].astype(float)
+            )
+        self.assertTrue(df_features.iloc[-1, 1:].isna().all())
+
+    def test_column(self):
+        self.track_catalog.add_tracks(self.df1)
+        tempos = TrackCatalog(self.temp_dir.name).column("Tempo")
+
+        self.assertIsInstance(tempos, np.memmap) # Not copied
+        self.assertFalse(tempos.flags.writeable)
+        self.assertEqual(len(tempos), len(self.track_catalog))
+
+    def test_read_only(self):
+        with self.assertRaises(FileNotFoundError):
+            TrackCatalog(f"{self.temp_dir.name}/missing")
+        with self.assertRaises(PermissionError):
+            TrackCatalog(self.temp_dir.name).add_tracks(self.df1)
+
+    def test_fill_missing_features(self):
+        self.track_catalog.add_tracks(self.df1)
+        df_missing = self.df1.copy()
+        df_missing.loc[:9, "Energy"] = np.nan
+        df_missing = df_missing.drop(columns="Speechiness")
+
+        df_filled = fill_missing_features(df_missing, self.track_catalog)
+        pd.testing.assert_series_equal(df_filled["Energy"], self.df1["Energy"])
+        np.testing.assert_allclose(
+            df_filled["Speechiness"], self.df1["Speechiness"]
+        )
+        self.assertTrue(df_missing["Energy"][:10].isna().all()) # Not changed
+
+
+if __name__ == "__main__":
+    unittest.main()